@@ -0,0 +1,131 @@
+# 向量库基准测试：对比本地 FAISS HNSW 后端（VECTOR_DB=local）与 Chroma 的写入耗时、QPS 和 recall@k
+#
+# 用法（在 backend 目录下）：
+#   python benchmarks/bench_vector_db.py                       # 默认 20000 条 384 维向量
+#   python benchmarks/bench_vector_db.py --n 100000 --dim 768 --queries 500 --k 10
+#
+# 数据为合成的聚类向量（接近真实 embedding 的分布），真值由 numpy 精确暴力检索得到。
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# 两个后端都写到临时目录，不影响本地 data/ 下的数据
+DATA_DIR = tempfile.mkdtemp(prefix="bench_vector_db_")
+os.environ["DATA_DIR"] = DATA_DIR
+os.environ.setdefault("VECTOR_DB", "chroma")
+
+from open_webui.retrieval.vector.dbs.chroma import ChromaClient
+from open_webui.retrieval.vector.dbs.local import LocalClient
+
+COLLECTION = "bench"
+BATCH_SIZE = 1000
+
+
+def make_corpus(n, dim, queries, clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype("float32")
+
+    def sample(count):
+        labels = rng.integers(0, clusters, size=count)
+        vectors = centers[labels] + 0.5 * rng.normal(size=(count, dim)).astype("float32")
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return sample(n), sample(queries)
+
+
+def ground_truth(corpus, queries, k):
+    # 向量已归一化，内积即余弦相似度
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def insert(client, corpus):
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), BATCH_SIZE):
+        batch = corpus[offset : offset + BATCH_SIZE]
+        client.insert(
+            COLLECTION,
+            [
+                {
+                    "id": str(offset + i),
+                    "text": f"doc {offset + i}",
+                    "vector": vector.tolist(),
+                    "metadata": {"index": offset + i},
+                }
+                for i, vector in enumerate(batch)
+            ],
+        )
+    return time.perf_counter() - start
+
+
+def recall(result_ids, truth, k):
+    hits = sum(
+        len({int(id) for id in ids[:k]} & set(row.tolist()))
+        for ids, row in zip(result_ids, truth)
+    )
+    return hits / (len(truth) * k)
+
+
+def search_single(client, queries, k):
+    ids = []
+    start = time.perf_counter()
+    for query in queries:
+        result = client.search(COLLECTION, [query.tolist()], k)
+        ids.append(result.ids[0])
+    return ids, time.perf_counter() - start
+
+
+def search_batched(client, queries, k):
+    start = time.perf_counter()
+    result = client.search(COLLECTION, [query.tolist() for query in queries], k)
+    return result.ids, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量库基准测试")
+    parser.add_argument("--n", type=int, default=20000, help="向量条数")
+    parser.add_argument("--dim", type=int, default=384, help="向量维度")
+    parser.add_argument("--queries", type=int, default=200, help="查询条数")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=100)
+    args = parser.parse_args()
+
+    corpus, queries = make_corpus(args.n, args.dim, args.queries, args.clusters)
+    truth = ground_truth(corpus, queries, args.k)
+    print(f"{args.n} 条 {args.dim} 维向量，{args.queries} 条查询，k={args.k}")
+    print(f"数据目录: {DATA_DIR}\n")
+
+    print(
+        f"{'backend':<8} {'insert s':>9} {'single QPS':>11} {'batch QPS':>10} "
+        f"{'recall@k':>9}"
+    )
+    for name, client in (("chroma", ChromaClient()), ("local", LocalClient())):
+        if client.has_collection(COLLECTION):
+            client.delete_collection(COLLECTION)
+
+        insert_time = insert(client, corpus)
+        single_ids, single_time = search_single(client, queries, args.k)
+        batch_ids, batch_time = search_batched(client, queries, args.k)
+
+        # 单条与批量查询的结果应一致，这里取单条查询的召回率
+        print(
+            f"{name:<8} {insert_time:>9.2f} {len(queries) / single_time:>11.1f} "
+            f"{len(queries) / batch_time:>10.1f} {recall(single_ids, truth, args.k):>9.3f}"
+        )
+        if abs(recall(batch_ids, truth, args.k) - recall(single_ids, truth, args.k)) > 0.01:
+            print(f"⚠️ {name} 批量查询与单条查询的召回率不一致")
+
+        client.delete_collection(COLLECTION)
+
+    print("\n✅ 完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -1943,6 +1943,29 @@ else:
     except Exception:
         PGVECTOR_POOL_RECYCLE = 3600
 
+# "hnsw" or "ivfflat"
+PGVECTOR_INDEX_METHOD = os.environ.get("PGVECTOR_INDEX_METHOD", "hnsw").lower()
+PGVECTOR_HNSW_M = int(os.environ.get("PGVECTOR_HNSW_M", "16"))
+PGVECTOR_HNSW_EF_CONSTRUCTION = int(
+    os.environ.get("PGVECTOR_HNSW_EF_CONSTRUCTION", "64")
+)
+PGVECTOR_HNSW_EF_SEARCH = int(os.environ.get("PGVECTOR_HNSW_EF_SEARCH", "100"))
+# Needs pgvector >= 0.8.0: "off", "relaxed_order" or "strict_order"
+PGVECTOR_HNSW_ITERATIVE_SCAN = os.environ.get(
+    "PGVECTOR_HNSW_ITERATIVE_SCAN", "relaxed_order"
+).lower()
+# 0 sizes the lists from the row count when the index is built
+PGVECTOR_IVFFLAT_LISTS = int(os.environ.get("PGVECTOR_IVFFLAT_LISTS", "0"))
+PGVECTOR_IVFFLAT_PROBES = int(os.environ.get("PGVECTOR_IVFFLAT_PROBES", "10"))
+# Collections up to this many rows are searched exactly instead of through the ANN index
+PGVECTOR_EXACT_SEARCH_MAX_ROWS = int(
+    os.environ.get("PGVECTOR_EXACT_SEARCH_MAX_ROWS", "20000")
+)
+# Collections reaching this many rows get their own partial ANN index, 0 disables
+PGVECTOR_COLLECTION_INDEX_MIN_ROWS = int(
+    os.environ.get("PGVECTOR_COLLECTION_INDEX_MIN_ROWS", "50000")
+)
+
 # Pinecone
 PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", None)
 PINECONE_ENVIRONMENT = os.environ.get("PINECONE_ENVIRONMENT", None)
@@ -1951,6 +1974,19 @@ PINECONE_DIMENSION = int(os.getenv("PINECONE_DIMENSION", 1536))  # or 3072, 1024
 PINECONE_METRIC = os.getenv("PINECONE_METRIC", "cosine")
 PINECONE_CLOUD = os.getenv("PINECONE_CLOUD", "aws")  # or "gcp" or "azure"
 
+# Local (embedded FAISS HNSW segments, single node)
+LOCAL_VECTOR_DB_PATH = os.environ.get(
+    "LOCAL_VECTOR_DB_PATH", f"{DATA_DIR}/vector_db_local"
+)
+LOCAL_VECTOR_DB_HNSW_M = int(os.environ.get("LOCAL_VECTOR_DB_HNSW_M", "32"))
+LOCAL_VECTOR_DB_HNSW_EF_CONSTRUCTION = int(
+    os.environ.get("LOCAL_VECTOR_DB_HNSW_EF_CONSTRUCTION", "200")
+)
+LOCAL_VECTOR_DB_HNSW_EF_SEARCH = int(
+    os.environ.get("LOCAL_VECTOR_DB_HNSW_EF_SEARCH", "128")
+)
+LOCAL_VECTOR_DB_MAX_SEGMENTS = int(os.environ.get("LOCAL_VECTOR_DB_MAX_SEGMENTS", "8"))
+
 ####################################
 # Information Retrieval (RAG)
 ####################################
@@ -341,6 +341,73 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Pending per-message updates kept before they are folded into the chat document
+CHAT_MESSAGE_DELTA_COMPACT_THRESHOLD = os.environ.get(
+    "CHAT_MESSAGE_DELTA_COMPACT_THRESHOLD", "32"
+)
+
+try:
+    CHAT_MESSAGE_DELTA_COMPACT_THRESHOLD = int(CHAT_MESSAGE_DELTA_COMPACT_THRESHOLD)
+except ValueError:
+    CHAT_MESSAGE_DELTA_COMPACT_THRESHOLD = 32
+
+# Coalesce message updates issued while streaming and write them in the background
+ENABLE_CHAT_WRITE_BUFFER = (
+    os.environ.get("ENABLE_CHAT_WRITE_BUFFER", "True").lower() == "true"
+)
+
+CHAT_WRITE_BUFFER_FLUSH_INTERVAL = os.environ.get(
+    "CHAT_WRITE_BUFFER_FLUSH_INTERVAL", "1.0"
+)
+
+try:
+    CHAT_WRITE_BUFFER_FLUSH_INTERVAL = float(CHAT_WRITE_BUFFER_FLUSH_INTERVAL)
+except ValueError:
+    CHAT_WRITE_BUFFER_FLUSH_INTERVAL = 1.0
+
+CHAT_WRITE_BUFFER_MAX_PENDING = os.environ.get("CHAT_WRITE_BUFFER_MAX_PENDING", "64")
+
+try:
+    CHAT_WRITE_BUFFER_MAX_PENDING = int(CHAT_WRITE_BUFFER_MAX_PENDING)
+except ValueError:
+    CHAT_WRITE_BUFFER_MAX_PENDING = 64
+
+# In-process cache of user records and group memberships read on every request,
+# a TTL of 0 disables it
+USER_CACHE_TTL = os.environ.get("USER_CACHE_TTL", "10")
+
+try:
+    USER_CACHE_TTL = float(USER_CACHE_TTL)
+except ValueError:
+    USER_CACHE_TTL = 10.0
+
+USER_CACHE_MAX_SIZE = os.environ.get("USER_CACHE_MAX_SIZE", "10000")
+
+try:
+    USER_CACHE_MAX_SIZE = int(USER_CACHE_MAX_SIZE)
+except ValueError:
+    USER_CACHE_MAX_SIZE = 10000
+
+# Worker threads per shared executor pool, e.g. "retrieval=16,audio=2". Pools
+# not listed keep their defaults (see utils/executors.py)
+EXECUTOR_POOL_SIZES = {}
+for pool_size in os.environ.get("EXECUTOR_POOL_SIZES", "").split(","):
+    if not pool_size.strip():
+        continue
+    try:
+        pool_name, workers = pool_size.split("=", 1)
+        EXECUTOR_POOL_SIZES[pool_name.strip()] = max(1, int(workers))
+    except ValueError:
+        log.warning(f"Invalid EXECUTOR_POOL_SIZES entry: {pool_size}")
+
+# Tasks allowed to wait per worker thread before submitters block
+EXECUTOR_QUEUE_FACTOR = os.environ.get("EXECUTOR_QUEUE_FACTOR", "4")
+
+try:
+    EXECUTOR_QUEUE_FACTOR = int(EXECUTOR_QUEUE_FACTOR)
+except ValueError:
+    EXECUTOR_QUEUE_FACTOR = 4
+
 ####################################
 # REDIS
 ####################################
@@ -512,6 +579,36 @@ AIOHTTP_CLIENT_SESSION_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_SSL", "True").lower() == "true"
 )
 
+# Connection pools kept for the app lifetime, one per upstream base URL
+AIOHTTP_POOL_LIMIT = os.environ.get("AIOHTTP_POOL_LIMIT", "100")
+
+try:
+    AIOHTTP_POOL_LIMIT = int(AIOHTTP_POOL_LIMIT)
+except ValueError:
+    AIOHTTP_POOL_LIMIT = 100
+
+# Max concurrent connections to a single upstream host (0 = unlimited)
+AIOHTTP_POOL_LIMIT_PER_HOST = os.environ.get("AIOHTTP_POOL_LIMIT_PER_HOST", "0")
+
+try:
+    AIOHTTP_POOL_LIMIT_PER_HOST = int(AIOHTTP_POOL_LIMIT_PER_HOST)
+except ValueError:
+    AIOHTTP_POOL_LIMIT_PER_HOST = 0
+
+AIOHTTP_POOL_KEEPALIVE_TIMEOUT = os.environ.get("AIOHTTP_POOL_KEEPALIVE_TIMEOUT", "30")
+
+try:
+    AIOHTTP_POOL_KEEPALIVE_TIMEOUT = float(AIOHTTP_POOL_KEEPALIVE_TIMEOUT)
+except ValueError:
+    AIOHTTP_POOL_KEEPALIVE_TIMEOUT = 30.0
+
+AIOHTTP_POOL_DNS_CACHE_TTL = os.environ.get("AIOHTTP_POOL_DNS_CACHE_TTL", "300")
+
+try:
+    AIOHTTP_POOL_DNS_CACHE_TTL = int(AIOHTTP_POOL_DNS_CACHE_TTL)
+except ValueError:
+    AIOHTTP_POOL_DNS_CACHE_TTL = 300
+
 AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = os.environ.get(
     "AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST",
     os.environ.get("AIOHTTP_CLIENT_TIMEOUT_OPENAI_MODEL_LIST", "10"),
@@ -570,6 +667,33 @@ else:
         SENTENCE_TRANSFORMERS_MODEL_KWARGS = None
 
 
+# Shared embedding service: max texts per forward pass, max queued encode calls
+# before callers block, and how long to wait for concurrent calls to coalesce
+SENTENCE_TRANSFORMERS_BATCH_SIZE = os.environ.get(
+    "SENTENCE_TRANSFORMERS_BATCH_SIZE", "32"
+)
+try:
+    SENTENCE_TRANSFORMERS_BATCH_SIZE = int(SENTENCE_TRANSFORMERS_BATCH_SIZE)
+except ValueError:
+    SENTENCE_TRANSFORMERS_BATCH_SIZE = 32
+
+SENTENCE_TRANSFORMERS_QUEUE_SIZE = os.environ.get(
+    "SENTENCE_TRANSFORMERS_QUEUE_SIZE", "1024"
+)
+try:
+    SENTENCE_TRANSFORMERS_QUEUE_SIZE = int(SENTENCE_TRANSFORMERS_QUEUE_SIZE)
+except ValueError:
+    SENTENCE_TRANSFORMERS_QUEUE_SIZE = 1024
+
+SENTENCE_TRANSFORMERS_COALESCE_WAIT_MS = os.environ.get(
+    "SENTENCE_TRANSFORMERS_COALESCE_WAIT_MS", "5"
+)
+try:
+    SENTENCE_TRANSFORMERS_COALESCE_WAIT_MS = int(SENTENCE_TRANSFORMERS_COALESCE_WAIT_MS)
+except ValueError:
+    SENTENCE_TRANSFORMERS_COALESCE_WAIT_MS = 5
+
+
 SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND = os.environ.get(
     "SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND", ""
 )
@@ -590,6 +714,83 @@ else:
     except Exception:
         SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS = None
 
+####################################
+# EMBEDDING CACHE
+####################################
+
+# Persistent content-addressed cache of document chunk embeddings
+RAG_EMBEDDING_CACHE_ENABLED = (
+    os.environ.get("RAG_EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+)
+
+RAG_EMBEDDING_CACHE_PATH = os.environ.get(
+    "RAG_EMBEDDING_CACHE_PATH", f"{DATA_DIR}/cache/embeddings.sqlite"
+)
+
+RAG_EMBEDDING_CACHE_MAX_ENTRIES = os.environ.get(
+    "RAG_EMBEDDING_CACHE_MAX_ENTRIES", "500000"
+)
+try:
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES = int(RAG_EMBEDDING_CACHE_MAX_ENTRIES)
+except ValueError:
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES = 500000
+
+# In-memory LRU cache of query embeddings, optionally shared through Redis
+RAG_QUERY_EMBEDDING_CACHE_ENABLED = (
+    os.environ.get("RAG_QUERY_EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+)
+
+RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES = os.environ.get(
+    "RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES", "10000"
+)
+try:
+    RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES = int(RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES)
+except ValueError:
+    RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 10000
+
+RAG_QUERY_EMBEDDING_CACHE_TTL = os.environ.get("RAG_QUERY_EMBEDDING_CACHE_TTL", "3600")
+try:
+    RAG_QUERY_EMBEDDING_CACHE_TTL = int(RAG_QUERY_EMBEDDING_CACHE_TTL)
+except ValueError:
+    RAG_QUERY_EMBEDDING_CACHE_TTL = 3600
+
+RAG_QUERY_EMBEDDING_CACHE_REDIS = (
+    os.environ.get("RAG_QUERY_EMBEDDING_CACHE_REDIS", "False").lower() == "true"
+)
+
+####################################
+# BM25 INDEX
+####################################
+
+# Incrementally maintained keyword index used by hybrid search. It is local to
+# this node; disable it when several nodes write to the same vector DB.
+ENABLE_RAG_BM25_INDEX = (
+    os.environ.get("ENABLE_RAG_BM25_INDEX", "True").lower() == "true"
+)
+
+RAG_BM25_INDEX_PATH = os.environ.get(
+    "RAG_BM25_INDEX_PATH", f"{DATA_DIR}/cache/bm25.sqlite"
+)
+
+# Memory budget (MB) for collection snapshots reused by hybrid search and full
+# context retrieval, 0 disables the cache
+RAG_COLLECTION_CACHE_MAX_SIZE = os.environ.get("RAG_COLLECTION_CACHE_MAX_SIZE", "256")
+
+try:
+    RAG_COLLECTION_CACHE_MAX_SIZE = int(RAG_COLLECTION_CACHE_MAX_SIZE)
+except ValueError:
+    RAG_COLLECTION_CACHE_MAX_SIZE = 256
+
+# Max age (seconds) of a collection snapshot. Writes drop snapshots right away
+# on this worker and, with Redis, on the others; without Redis other workers
+# only see a write once their snapshot expires. 0 disables the cache
+RAG_COLLECTION_CACHE_TTL = os.environ.get("RAG_COLLECTION_CACHE_TTL", "60")
+
+try:
+    RAG_COLLECTION_CACHE_TTL = float(RAG_COLLECTION_CACHE_TTL)
+except ValueError:
+    RAG_COLLECTION_CACHE_TTL = 60.0
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -99,6 +99,7 @@ from open_webui.internal.db import Session, engine
 
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
+from open_webui.models.groups import Groups
 from open_webui.models.users import UserModel, Users
 from open_webui.models.chats import Chats
 
@@ -452,7 +453,10 @@ from open_webui.utils.plugin import install_tool_and_function_dependencies
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
-from open_webui.utils.question_generator import generate_question # @CDK: 添加方法引用
+from open_webui.utils.chat_buffer import CHAT_WRITE_BUFFER
+from open_webui.utils.http_pool import HTTP_SESSION_POOL
+from open_webui.utils.executors import get_executors_stats, shutdown_executors
+from open_webui.utils.question_generator import generate_question, stream_questions # @CDK: 添加方法引用
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -566,6 +570,10 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    await CHAT_WRITE_BUFFER.flush()
+    await HTTP_SESSION_POOL.close()
+    shutdown_executors()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -1240,6 +1248,10 @@ async def get_models(
     request: Request, refresh: bool = False, user=Depends(get_verified_user)
 ):
     def get_filtered_models(models, user):
+        # Resolve the user's groups and the model records once for the whole list
+        user_group_ids = Groups.get_group_ids_by_member_id(user.id)
+        model_infos = {model.id: model for model in Models.get_all_models()}
+
         filtered_models = []
         for model in models:
             if model.get("arena"):
@@ -1249,14 +1261,18 @@ async def get_models(
                     access_control=model.get("info", {})
                     .get("meta", {})
                     .get("access_control", {}),
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
+            model_info = model_infos.get(model["id"])
             if model_info:
                 if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
+                    user.id,
+                    type="read",
+                    access_control=model_info.access_control,
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
 
@@ -1536,10 +1552,24 @@ async def generate_question_api(request: Request, user=Depends(get_verified_user
     data["user_id"] = user.id
     print(f"user_id: {user.id}, kb_id: {data['kb_id']}")
     
-    result = generate_question(data)
+    result = await generate_question(data)
     # print(result)
     return result
 
+# 流式出题：以 SSE 逐题推送，每道题生成完毕即可展示
+@app.post("/api/generate-question/stream")
+async def generate_question_stream_api(request: Request, user=Depends(get_verified_user)):
+    data = await request.json()
+    data.setdefault("kb_id", None)
+    data["user_id"] = user.id
+    print(f"user_id: {user.id}, kb_id: {data['kb_id']} (stream)")
+
+    async def event_stream():
+        async for event in stream_questions(data):
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 ##################################
 #
 # Config Endpoints
@@ -1747,6 +1777,12 @@ async def get_current_usage(user=Depends(get_verified_user)):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@app.get("/api/executors")
+async def get_executors(user=Depends(get_admin_user)):
+    """Queue depth, wait time and throughput of the shared worker pools."""
+    return {"executors": get_executors_stats()}
+
+
 ############################
 # OAuth Login & Callback
 ############################
@@ -0,0 +1,34 @@
+"""Add message and message_reaction indexes
+
+Revision ID: a7d3f5b9c1e4
+Revises: f2c4e6a8b0d1
+Create Date: 2025-08-03 03:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "a7d3f5b9c1e4"
+down_revision = "f2c4e6a8b0d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "message_channel_id_parent_id_created_at_idx",
+        "message",
+        ["channel_id", "parent_id", "created_at"],
+    )
+    op.create_index(
+        "message_parent_id_created_at_idx", "message", ["parent_id", "created_at"]
+    )
+    op.create_index(
+        "message_reaction_message_id_idx", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("message_reaction_message_id_idx", table_name="message_reaction")
+    op.drop_index("message_parent_id_created_at_idx", table_name="message")
+    op.drop_index("message_channel_id_parent_id_created_at_idx", table_name="message")
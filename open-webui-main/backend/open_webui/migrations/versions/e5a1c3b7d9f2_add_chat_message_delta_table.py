@@ -0,0 +1,34 @@
+"""Add chat_message_delta table
+
+Revision ID: e5a1c3b7d9f2
+Revises: d31026856c01
+Create Date: 2025-08-01 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e5a1c3b7d9f2"
+down_revision = "d31026856c01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "chat_message_delta",
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("message_id", sa.Text(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("chat_id", "message_id"),
+    )
+    op.create_index(
+        "chat_message_delta_chat_id_idx", "chat_message_delta", ["chat_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("chat_message_delta_chat_id_idx", table_name="chat_message_delta")
+    op.drop_table("chat_message_delta")
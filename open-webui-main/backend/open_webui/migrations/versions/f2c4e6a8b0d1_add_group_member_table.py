@@ -0,0 +1,59 @@
+"""Add group_member table
+
+Revision ID: f2c4e6a8b0d1
+Revises: e5a1c3b7d9f2
+Create Date: 2025-08-02 03:00:00.000000
+
+"""
+
+import json
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column, select
+
+
+revision = "f2c4e6a8b0d1"
+down_revision = "e5a1c3b7d9f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    print("Creating group_member table")
+    group_member_table = op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    print("Migrating group members from group.user_ids")
+    group_table = table(
+        "group",
+        column("id", sa.Text()),
+        column("user_ids", sa.JSON()),
+    )
+
+    now = int(time.time())
+    rows = []
+    for group in op.get_bind().execute(
+        select(group_table.c.id, group_table.c.user_ids)
+    ):
+        user_ids = group.user_ids
+        if isinstance(user_ids, str):
+            user_ids = json.loads(user_ids or "[]")
+
+        for user_id in dict.fromkeys(user_ids or []):
+            rows.append({"group_id": group.id, "user_id": user_id, "created_at": now})
+
+    if rows:
+        op.bulk_insert(group_member_table, rows)
+
+
+def downgrade():
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
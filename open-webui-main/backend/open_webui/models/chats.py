@@ -6,10 +6,10 @@ from typing import Optional
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import SRC_LOG_LEVELS, CHAT_MESSAGE_DELTA_COMPACT_THRESHOLD
 
-from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 from sqlalchemy.sql.expression import bindparam
@@ -41,6 +41,26 @@ class Chat(Base):
     folder_id = Column(Text, nullable=True)
 
 
+class ChatMessageDelta(Base):
+    """
+    Pending message updates that have not been folded into `Chat.chat` yet.
+
+    Streaming writes only touch the row of the message being updated, so their
+    cost no longer depends on the size of the chat. Rows are merged into the
+    chat document on compaction (end of a response, a full chat update, or
+    when too many are pending) and applied on the fly when a chat is read.
+    """
+
+    __tablename__ = "chat_message_delta"
+
+    chat_id = Column(Text, primary_key=True)
+    message_id = Column(Text, primary_key=True)
+    data = Column(JSON)
+    updated_at = Column(BigInteger)  # nanoseconds, orders deltas within a chat
+
+    __table_args__ = (Index("chat_message_delta_chat_id_idx", "chat_id"),)
+
+
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -59,6 +79,10 @@ class ChatModel(BaseModel):
     meta: dict = {}
     folder_id: Optional[str] = None
 
+    # Newest message delta applied to `chat` when it was read, passed back to
+    # `update_chat_by_id` so deltas written after the read are kept
+    deltas_until: Optional[int] = Field(default=None, exclude=True)
+
 
 ####################
 # Forms
@@ -170,17 +194,29 @@ class ChatTable:
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
 
-    def update_chat_by_id(self, id: str, chat: dict) -> Optional[ChatModel]:
+    def update_chat_by_id(
+        self, id: str, chat: dict, deltas_until: Optional[int] = None
+    ) -> Optional[ChatModel]:
+        """
+        Replace the chat document. Pass the `deltas_until` of the chat the
+        document was built from: the deltas it already contains are dropped,
+        those written after that read stay pending and keep applying on top.
+        """
         try:
             with get_db() as db:
                 chat_item = db.get(Chat, id)
                 chat_item.chat = chat
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
+                if deltas_until:
+                    db.query(ChatMessageDelta).filter(
+                        ChatMessageDelta.chat_id == id,
+                        ChatMessageDelta.updated_at <= deltas_until,
+                    ).delete()
                 db.commit()
                 db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                return self._with_message_deltas(db, [chat_item])[0]
         except Exception:
             return None
 
@@ -189,10 +225,11 @@ class ChatTable:
         if chat is None:
             return None
 
+        deltas_until = chat.deltas_until
         chat = chat.chat
         chat["title"] = title
 
-        return self.update_chat_by_id(id, chat)
+        return self.update_chat_by_id(id, chat, deltas_until)
 
     def update_chat_tags_by_id(
         self, id: str, tags: list[str], user
@@ -237,32 +274,135 @@ class ChatTable:
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
+    def _apply_message_deltas(self, chat: dict, deltas: list) -> dict:
+        history = chat.get("history", {})
+        messages = history.get("messages", {})
+
+        for delta in sorted(deltas, key=lambda delta: delta.updated_at):
+            messages[delta.message_id] = {
+                **messages.get(delta.message_id, {}),
+                **delta.data,
+            }
+            history["currentId"] = delta.message_id
+
+        history["messages"] = messages
+        chat["history"] = history
+        return chat
+
+    def _with_message_deltas(self, db, chats: list) -> list[ChatModel]:
+        chat_ids = [chat.id for chat in chats]
+        deltas_by_chat_id = {}
+        if chat_ids:
+            for delta in db.query(ChatMessageDelta).filter(
+                ChatMessageDelta.chat_id.in_(chat_ids)
+            ):
+                deltas_by_chat_id.setdefault(delta.chat_id, []).append(delta)
+
+        result = []
+        for chat in chats:
+            chat_model = ChatModel.model_validate(chat)
+            deltas = deltas_by_chat_id.get(chat.id, [])
+            if deltas:
+                chat_model.chat = self._apply_message_deltas(
+                    json.loads(json.dumps(chat_model.chat)), deltas
+                )
+            chat_model.deltas_until = max(
+                (delta.updated_at for delta in deltas), default=0
+            )
+            result.append(chat_model)
+        return result
+
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
+    ) -> bool:
         # Sanitize message content for null characters before upserting
         if isinstance(message.get("content"), str):
             message["content"] = message["content"].replace("\x00", "")
 
-        chat = chat.chat
-        history = chat.get("history", {})
+        try:
+            with get_db() as db:
+                if not db.query(exists().where(Chat.id == id)).scalar():
+                    return False
+
+                # Only this message's pending row is rewritten, not the whole chat
+                delta = db.get(ChatMessageDelta, (id, message_id))
+                if delta is None:
+                    db.add(
+                        ChatMessageDelta(
+                            chat_id=id,
+                            message_id=message_id,
+                            data=message,
+                            updated_at=time.time_ns(),
+                        )
+                    )
+                else:
+                    delta.data = {**delta.data, **message}
+                    delta.updated_at = time.time_ns()
+                db.query(Chat).filter_by(id=id).update(
+                    {"updated_at": int(time.time())}
+                )
+                db.commit()
 
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
+                pending = (
+                    db.query(func.count(ChatMessageDelta.message_id))
+                    .filter_by(chat_id=id)
+                    .scalar()
+                )
+        except Exception as e:
+            log.exception(f"Error upserting message {message_id} of chat {id}: {e}")
+            return False
 
-        history["currentId"] = message_id
+        if pending > CHAT_MESSAGE_DELTA_COMPACT_THRESHOLD:
+            self.compact_message_deltas(id)
+        return True
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+    def append_content_to_message_by_id_and_message_id(
+        self, id: str, message_id: str, content: str
+    ) -> bool:
+        """Append to a message's content, reading the chat only if no delta is pending."""
+        with get_db() as db:
+            delta = db.get(ChatMessageDelta, (id, message_id))
+            current = delta.data.get("content") if delta is not None else None
+
+        if current is None:
+            message = self.get_message_by_id_and_message_id(id, message_id)
+            if not message:
+                return False
+            current = message.get("content", "")
+
+        return self.upsert_message_to_chat_by_id_and_message_id(
+            id, message_id, {"content": current + content}
+        )
+
+    def compact_message_deltas(self, id: str) -> bool:
+        """Fold pending message deltas into the chat document."""
+        try:
+            with get_db() as db:
+                deltas = db.query(ChatMessageDelta).filter_by(chat_id=id).all()
+                if not deltas:
+                    return True
+
+                chat_item = db.get(Chat, id)
+                if chat_item is None:
+                    db.query(ChatMessageDelta).filter_by(chat_id=id).delete()
+                    db.commit()
+                    return False
+
+                chat_item.chat = self._apply_message_deltas(
+                    json.loads(json.dumps(chat_item.chat)), deltas
+                )
+                # Only drop the deltas that were folded, newer writes stay pending
+                for delta in deltas:
+                    db.query(ChatMessageDelta).filter_by(
+                        chat_id=id,
+                        message_id=delta.message_id,
+                        updated_at=delta.updated_at,
+                    ).delete()
+                db.commit()
+                return True
+        except Exception as e:
+            log.exception(f"Error compacting message deltas of chat {id}: {e}")
+            return False
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
@@ -271,18 +411,19 @@ class ChatTable:
         if chat is None:
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
+        message = chat.chat.get("history", {}).get("messages", {}).get(message_id)
+        if message is None:
+            return chat
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        # Written as a delta of this message, like streamed content
+        status_history = message.get("statusHistory", []) + [status]
+        self.upsert_message_to_chat_by_id_and_message_id(
+            id, message_id, {"statusHistory": status_history}
+        )
+        return self.get_chat_by_id(id)
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
+        self.compact_message_deltas(chat_id)
         with get_db() as db:
             # Get the existing chat to share
             chat = db.get(Chat, chat_id)
@@ -315,6 +456,7 @@ class ChatTable:
             return shared_chat if (shared_result and result) else None
 
     def update_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
+        self.compact_message_deltas(chat_id)
         try:
             with get_db() as db:
                 chat = db.get(Chat, chat_id)
@@ -355,7 +497,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._with_message_deltas(db, [chat])[0]
         except Exception:
             return None
 
@@ -367,7 +509,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._with_message_deltas(db, [chat])[0]
         except Exception:
             return None
 
@@ -379,7 +521,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._with_message_deltas(db, [chat])[0]
         except Exception:
             return None
 
@@ -427,7 +569,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_chat_list_by_user_id(
         self,
@@ -466,7 +608,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -517,13 +659,13 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_chat_by_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._with_message_deltas(db, [chat])[0]
         except Exception:
             return None
 
@@ -545,7 +687,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._with_message_deltas(db, [chat])[0]
         except Exception:
             return None
 
@@ -555,8 +697,9 @@ class ChatTable:
                 db.query(Chat)
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
+                .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -564,8 +707,9 @@ class ChatTable:
                 db.query(Chat)
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
+                .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -573,8 +717,9 @@ class ChatTable:
                 db.query(Chat)
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
+                .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -582,8 +727,9 @@ class ChatTable:
                 db.query(Chat)
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
+                .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -626,6 +772,16 @@ class ChatTable:
 
             query = query.order_by(Chat.updated_at.desc())
 
+            # Streamed content not compacted into the chat yet
+            delta_content_clause = text(
+                "EXISTS ("
+                "    SELECT 1 "
+                "    FROM chat_message_delta AS delta "
+                "    WHERE delta.chat_id = Chat.id "
+                "    AND LOWER(delta.data->>'content') LIKE '%' || :content_key || '%'"
+                ")"
+            )
+
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
             if dialect_name == "sqlite":
@@ -640,7 +796,9 @@ class ChatTable:
                 sqlite_content_clause = text(sqlite_content_sql)
                 query = query.filter(
                     or_(
-                        Chat.title.ilike(bindparam("title_key")), sqlite_content_clause
+                        Chat.title.ilike(bindparam("title_key")),
+                        sqlite_content_clause,
+                        delta_content_clause,
                     ).params(title_key=f"%{search_text}%", content_key=search_text)
                 )
 
@@ -688,6 +846,7 @@ class ChatTable:
                     or_(
                         Chat.title.ilike(bindparam("title_key")),
                         postgres_content_clause,
+                        delta_content_clause,
                     ).params(title_key=f"%{search_text}%", content_key=search_text)
                 )
 
@@ -731,7 +890,7 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str
@@ -744,7 +903,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -759,7 +918,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -772,7 +931,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._with_message_deltas(db, [chat])[0]
         except Exception:
             return None
 
@@ -811,7 +970,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_message_deltas(db, all_chats)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -832,7 +991,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._with_message_deltas(db, [chat])[0]
         except Exception:
             return None
 
@@ -909,6 +1068,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 db.query(Chat).filter_by(id=id).delete()
+                db.query(ChatMessageDelta).filter_by(chat_id=id).delete()
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -918,7 +1078,8 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                if db.query(Chat).filter_by(id=id, user_id=user_id).delete():
+                    db.query(ChatMessageDelta).filter_by(chat_id=id).delete()
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -5,18 +5,25 @@ from typing import Optional
 import uuid
 
 from open_webui.internal.db import Base, get_db
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import SRC_LOG_LEVELS, USER_CACHE_TTL, USER_CACHE_MAX_SIZE
+from open_webui.utils.ttl_cache import TTLCache
 
 from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, Text, JSON, Index
 
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
+# Groups of a user, read by every access control check. Group writes are rare
+# and may change any member's groups or permissions, so they clear it entirely.
+GROUP_MEMBERSHIP_CACHE = TTLCache(
+    "group_memberships", USER_CACHE_TTL, USER_CACHE_MAX_SIZE
+)
+
 ####################
 # UserGroup DB Schema
 ####################
@@ -41,6 +48,24 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    """
+    Group memberships, one row per (group, user).
+
+    Kept in sync with `Group.user_ids`, which stays the member list returned by
+    the API, so "groups of a user" is an indexed lookup instead of a LIKE scan
+    over every group's JSON.
+    """
+
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, primary_key=True)
+    user_id = Column(Text, primary_key=True)
+    created_at = Column(BigInteger)
+
+    __table_args__ = (Index("group_member_user_id_idx", "user_id"),)
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -92,6 +117,40 @@ class GroupUpdateForm(GroupForm, UserIdsForm):
 
 
 class GroupTable:
+    @staticmethod
+    def _add_members(db, group_id: str, user_ids: list[str]):
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return
+
+        existing = {
+            row.user_id
+            for row in db.query(GroupMember.user_id).filter(
+                GroupMember.group_id == group_id, GroupMember.user_id.in_(user_ids)
+            )
+        }
+        now = int(time.time())
+        db.add_all(
+            GroupMember(group_id=group_id, user_id=user_id, created_at=now)
+            for user_id in user_ids
+            if user_id not in existing
+        )
+
+    @staticmethod
+    def _remove_members(db, group_id: str, user_ids: list[str]):
+        if not user_ids:
+            return
+
+        db.query(GroupMember).filter(
+            GroupMember.group_id == group_id, GroupMember.user_id.in_(user_ids)
+        ).delete(synchronize_session=False)
+
+    def _set_members(self, db, group_id: str, user_ids: list[str]):
+        db.query(GroupMember).filter_by(group_id=group_id).delete(
+            synchronize_session=False
+        )
+        self._add_members(db, group_id, user_ids)
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -109,8 +168,10 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._set_members(db, group.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
+                GROUP_MEMBERSHIP_CACHE.clear()
                 if result:
                     return GroupModel.model_validate(result)
                 else:
@@ -127,20 +188,53 @@ class GroupTable:
             ]
 
     def get_groups_by_member_id(self, user_id: str) -> list[GroupModel]:
+        groups = GROUP_MEMBERSHIP_CACHE.get(user_id)
+        if groups is None:
+            groups = self._get_groups_by_member_id(user_id)
+            GROUP_MEMBERSHIP_CACHE.set(user_id, groups)
+        return groups
+
+    def _get_groups_by_member_id(self, user_id: str) -> list[GroupModel]:
+        # Uncached, used by writes that store the member lists back
         with get_db() as db:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> set[str]:
+        return {group.id for group in self.get_groups_by_member_id(user_id)}
+
+    def get_group_ids_by_member_ids(self, user_ids: list[str]) -> dict[str, list[str]]:
+        """Group ids of each of the given users, in a single query."""
+        group_ids = {user_id: [] for user_id in user_ids}
+        if not user_ids:
+            return group_ids
+
+        with get_db() as db:
+            for row in db.query(GroupMember.group_id, GroupMember.user_id).filter(
+                GroupMember.user_id.in_(user_ids)
+            ):
+                group_ids[row.user_id].append(row.group_id)
+        return group_ids
+
+    def get_member_ids_by_group_ids(self, group_ids: list[str]) -> list[str]:
+        """Distinct ids of the users belonging to any of the given groups."""
+        if not group_ids:
+            return []
+
+        with get_db() as db:
+            return [
+                row.user_id
+                for row in db.query(GroupMember.user_id)
+                .filter(GroupMember.group_id.in_(group_ids))
+                .distinct()
+            ]
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -167,7 +261,10 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_members(db, id, form_data.user_ids)
                 db.commit()
+                GROUP_MEMBERSHIP_CACHE.clear()
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -177,7 +274,9 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
+                GROUP_MEMBERSHIP_CACHE.clear()
                 return True
         except Exception:
             return False
@@ -186,7 +285,9 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
+                GROUP_MEMBERSHIP_CACHE.clear()
 
                 return True
             except Exception:
@@ -195,7 +296,7 @@ class GroupTable:
     def remove_user_from_all_groups(self, user_id: str) -> bool:
         with get_db() as db:
             try:
-                groups = self.get_groups_by_member_id(user_id)
+                groups = self._get_groups_by_member_id(user_id)
 
                 for group in groups:
                     group.user_ids.remove(user_id)
@@ -207,6 +308,10 @@ class GroupTable:
                     )
                     db.commit()
 
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+
+                GROUP_MEMBERSHIP_CACHE.clear()
                 return True
             except Exception:
                 return False
@@ -241,6 +346,9 @@ class GroupTable:
                     except Exception as e:
                         log.exception(e)
                         continue
+
+            if new_groups:
+                GROUP_MEMBERSHIP_CACHE.clear()
             return new_groups
 
     def sync_groups_by_group_names(self, user_id: str, group_names: list[str]) -> bool:
@@ -250,7 +358,7 @@ class GroupTable:
                 group_ids = [group.id for group in groups]
 
                 # Remove user from groups not in the new list
-                existing_groups = self.get_groups_by_member_id(user_id)
+                existing_groups = self._get_groups_by_member_id(user_id)
 
                 for group in existing_groups:
                     if group.id not in group_ids:
@@ -261,6 +369,7 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        self._remove_members(db, group.id, [user_id])
 
                 # Add user to new groups
                 for group in groups:
@@ -272,8 +381,10 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        self._add_members(db, group.id, [user_id])
 
                 db.commit()
+                GROUP_MEMBERSHIP_CACHE.clear()
                 return True
             except Exception as e:
                 log.exception(e)
@@ -294,10 +405,12 @@ class GroupTable:
                 for user_id in user_ids:
                     if user_id not in group.user_ids:
                         group.user_ids.append(user_id)
+                self._add_members(db, id, user_ids)
 
                 group.updated_at = int(time.time())
                 db.commit()
                 db.refresh(group)
+                GROUP_MEMBERSHIP_CACHE.clear()
                 return GroupModel.model_validate(group)
         except Exception as e:
             log.exception(e)
@@ -318,10 +431,12 @@ class GroupTable:
                 for user_id in user_ids:
                     if user_id in group.user_ids:
                         group.user_ids.remove(user_id)
+                self._remove_members(db, id, user_ids)
 
                 group.updated_at = int(time.time())
                 db.commit()
                 db.refresh(group)
+                GROUP_MEMBERSHIP_CACHE.clear()
                 return GroupModel.model_validate(group)
         except Exception as e:
             log.exception(e)
@@ -14,7 +14,7 @@ from open_webui.models.users import Users, UserResponse
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import filter_accessible
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -126,34 +126,68 @@ class KnowledgeTable:
             except Exception:
                 return None
 
-    def get_knowledge_bases(self) -> list[KnowledgeUserModel]:
-        with get_db() as db:
-            knowledge_bases = []
-            for knowledge in (
-                db.query(Knowledge).order_by(Knowledge.updated_at.desc()).all()
-            ):
-                user = Users.get_user_by_id(knowledge.user_id)
-                knowledge_bases.append(
-                    KnowledgeUserModel.model_validate(
-                        {
-                            **KnowledgeModel.model_validate(knowledge).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
-                    )
-                )
-            return knowledge_bases
-
-    def get_knowledge_bases_by_user_id(
-        self, user_id: str, permission: str = "write"
+    def _with_users(
+        self, knowledge_bases: list[KnowledgeModel]
     ) -> list[KnowledgeUserModel]:
-        knowledge_bases = self.get_knowledge_bases()
+        # Owners of the whole page in one query
+        users = {
+            user.id: user
+            for user in Users.get_users_by_user_ids(
+                list({knowledge_base.user_id for knowledge_base in knowledge_bases})
+            )
+        }
         return [
-            knowledge_base
+            KnowledgeUserModel.model_validate(
+                {
+                    **knowledge_base.model_dump(),
+                    "user": (
+                        users[knowledge_base.user_id].model_dump()
+                        if knowledge_base.user_id in users
+                        else None
+                    ),
+                }
+            )
             for knowledge_base in knowledge_bases
-            if knowledge_base.user_id == user_id
-            or has_access(user_id, permission, knowledge_base.access_control)
         ]
 
+    def get_knowledge_bases(
+        self, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[KnowledgeUserModel]:
+        with get_db() as db:
+            query = db.query(Knowledge).order_by(Knowledge.updated_at.desc())
+            if skip:
+                query = query.offset(skip)
+            if limit:
+                query = query.limit(limit)
+
+            knowledge_bases = [
+                KnowledgeModel.model_validate(knowledge) for knowledge in query.all()
+            ]
+        return self._with_users(knowledge_bases)
+
+    def get_knowledge_bases_by_user_id(
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[KnowledgeUserModel]:
+        with get_db() as db:
+            knowledge_bases = [
+                KnowledgeModel.model_validate(knowledge)
+                for knowledge in db.query(Knowledge)
+                .order_by(Knowledge.updated_at.desc())
+                .all()
+            ]
+
+        # Access control lives in JSON, so it is filtered here before paginating
+        knowledge_bases = filter_accessible(user_id, knowledge_bases, permission)
+        if skip:
+            knowledge_bases = knowledge_bases[skip:]
+        if limit:
+            knowledge_bases = knowledge_bases[:limit]
+        return self._with_users(knowledge_bases)
+
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
         try:
             with get_db() as db:
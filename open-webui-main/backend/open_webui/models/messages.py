@@ -8,7 +8,7 @@ from open_webui.models.tags import TagModel, Tag, Tags
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -25,6 +25,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("message_reaction_message_id_idx", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -52,6 +54,17 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        # Channel pages and thread pages, newest first
+        Index(
+            "message_channel_id_parent_id_created_at_idx",
+            "channel_id",
+            "parent_id",
+            "created_at",
+        ),
+        Index("message_parent_id_created_at_idx", "parent_id", "created_at"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -94,6 +107,16 @@ class MessageResponse(MessageModel):
     reactions: list[Reactions]
 
 
+def _before_cursor(before: int, before_id: Optional[str] = None):
+    """Keyset filter for messages older than (before, before_id)."""
+    if before_id is None:
+        return Message.created_at < before
+    return or_(
+        Message.created_at < before,
+        and_(Message.created_at == before, Message.id < before_id),
+    )
+
+
 class MessageTable:
     def insert_new_message(
         self, form_data: MessageForm, channel_id: str, user_id: str
@@ -128,17 +151,50 @@ class MessageTable:
             if not message:
                 return None
 
-            reactions = self.get_reactions_by_message_id(id)
-            replies = self.get_replies_by_message_id(id)
-
-            return MessageResponse(
+            return self.get_message_responses([MessageModel.model_validate(message)])[0]
+
+    def get_message_responses(
+        self, messages: list[MessageModel], with_replies: bool = True
+    ) -> list[MessageResponse]:
+        """
+        Attach reply counts and reactions to a page of messages with one
+        aggregate query each, instead of loading every reply and reaction per
+        message.
+        """
+        ids = [message.id for message in messages]
+        reply_stats = self.get_reply_stats_by_message_ids(ids) if with_replies else {}
+        reactions = self.get_reactions_by_message_ids(ids)
+
+        return [
+            MessageResponse(
                 **{
-                    **MessageModel.model_validate(message).model_dump(),
-                    "latest_reply_at": replies[0].created_at if replies else None,
-                    "reply_count": len(replies),
-                    "reactions": reactions,
+                    **message.model_dump(),
+                    "reply_count": reply_stats.get(message.id, (0, None))[0],
+                    "latest_reply_at": reply_stats.get(message.id, (0, None))[1],
+                    "reactions": reactions.get(message.id, []),
                 }
             )
+            for message in messages
+        ]
+
+    def get_reply_stats_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, tuple[int, Optional[int]]]:
+        """Reply count and latest reply time of each message."""
+        if not ids:
+            return {}
+
+        with get_db() as db:
+            return {
+                parent_id: (reply_count, latest_reply_at)
+                for parent_id, reply_count, latest_reply_at in db.query(
+                    Message.parent_id,
+                    func.count(Message.id),
+                    func.max(Message.created_at),
+                )
+                .filter(Message.parent_id.in_(ids))
+                .group_by(Message.parent_id)
+            }
 
     def get_replies_by_message_id(self, id: str) -> list[MessageModel]:
         with get_db() as db:
@@ -158,21 +214,41 @@ class MessageTable:
             ]
 
     def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[int] = None,
+        before_id: Optional[str] = None,
     ) -> list[MessageModel]:
+        """
+        Newest messages first. `before`/`before_id` (the created_at and id of
+        the oldest message already loaded) page by key instead of offset, which
+        stays cheap deep into a channel and does not shift when new messages
+        arrive. The id breaks ties between messages created in the same ns.
+        """
         with get_db() as db:
+            query = db.query(Message).filter_by(channel_id=channel_id, parent_id=None)
+            if before is not None:
+                query = query.filter(_before_cursor(before, before_id))
+            else:
+                query = query.offset(skip)
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
+                query.order_by(Message.created_at.desc(), Message.id.desc())
                 .limit(limit)
                 .all()
             )
             return [MessageModel.model_validate(message) for message in all_messages]
 
     def get_messages_by_parent_id(
-        self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        parent_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[int] = None,
+        before_id: Optional[str] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
             message = db.get(Message, parent_id)
@@ -180,11 +256,16 @@ class MessageTable:
             if not message:
                 return []
 
+            query = db.query(Message).filter_by(
+                channel_id=channel_id, parent_id=parent_id
+            )
+            if before is not None:
+                query = query.filter(_before_cursor(before, before_id))
+            else:
+                query = query.offset(skip)
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=parent_id)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
+                query.order_by(Message.created_at.desc(), Message.id.desc())
                 .limit(limit)
                 .all()
             )
@@ -227,21 +308,41 @@ class MessageTable:
             return MessageReactionModel.model_validate(result) if result else None
 
     def get_reactions_by_message_id(self, id: str) -> list[Reactions]:
+        return self.get_reactions_by_message_ids([id]).get(id, [])
+
+    def get_reactions_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        """Reactions of each message, grouped by name."""
+        if not ids:
+            return {}
+
         with get_db() as db:
-            all_reactions = db.query(MessageReaction).filter_by(message_id=id).all()
+            all_reactions = (
+                db.query(MessageReaction)
+                .filter(MessageReaction.message_id.in_(ids))
+                .order_by(MessageReaction.created_at)
+                .all()
+            )
 
             reactions = {}
             for reaction in all_reactions:
-                if reaction.name not in reactions:
-                    reactions[reaction.name] = {
+                message_reactions = reactions.setdefault(reaction.message_id, {})
+                if reaction.name not in message_reactions:
+                    message_reactions[reaction.name] = {
                         "name": reaction.name,
                         "user_ids": [],
                         "count": 0,
                     }
-                reactions[reaction.name]["user_ids"].append(reaction.user_id)
-                reactions[reaction.name]["count"] += 1
-
-            return [Reactions(**reaction) for reaction in reactions.values()]
+                message_reactions[reaction.name]["user_ids"].append(reaction.user_id)
+                message_reactions[reaction.name]["count"] += 1
+
+            return {
+                message_id: [
+                    Reactions(**reaction) for reaction in message_reactions.values()
+                ]
+                for message_id, message_reactions in reactions.items()
+            }
 
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
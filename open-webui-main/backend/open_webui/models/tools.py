@@ -8,7 +8,7 @@ from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import filter_accessible
 
 
 log = logging.getLogger(__name__)
@@ -162,12 +162,7 @@ class ToolsTable:
     ) -> list[ToolUserModel]:
         tools = self.get_tools()
 
-        return [
-            tool
-            for tool in tools
-            if tool.user_id == user_id
-            or has_access(user_id, permission, tool.access_control)
-        ]
+        return filter_accessible(user_id, tools, permission)
 
     def get_tool_valves_by_id(self, id: str) -> Optional[dict]:
         try:
@@ -2,6 +2,8 @@ import time
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.env import USER_CACHE_TTL, USER_CACHE_MAX_SIZE
+from open_webui.utils.ttl_cache import TTLCache
 
 
 from open_webui.models.chats import Chats
@@ -17,6 +19,9 @@ from sqlalchemy import or_
 # User DB Schema
 ####################
 
+# Users looked up by id, mostly by get_current_user on every request
+USER_CACHE = TTLCache("users", USER_CACHE_TTL, USER_CACHE_MAX_SIZE)
+
 
 class User(Base):
     __tablename__ = "user"
@@ -148,13 +153,20 @@ class UsersTable:
                 return None
 
     def get_user_by_id(self, id: str) -> Optional[UserModel]:
+        user = USER_CACHE.get(id)
+        if user is not None:
+            return user
+
         try:
             with get_db() as db:
                 user = db.query(User).filter_by(id=id).first()
-                return UserModel.model_validate(user)
+                user = UserModel.model_validate(user)
         except Exception:
             return None
 
+        USER_CACHE.set(id, user)
+        return user
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -287,6 +299,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                USER_CACHE.delete(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -301,6 +314,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                USER_CACHE.delete(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -316,10 +330,16 @@ class UsersTable:
                 db.commit()
 
                 user = db.query(User).filter_by(id=id).first()
-                return UserModel.model_validate(user)
+                user = UserModel.model_validate(user)
         except Exception:
             return None
 
+        # Runs on every request, so it is not broadcast: other workers serve
+        # the previous last_active_at until their entry expires (USER_CACHE_TTL).
+        # Keeping the TTL means other changes still reach this worker on expiry.
+        USER_CACHE.replace(id, user)
+        return user
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -327,6 +347,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                USER_CACHE.delete(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -338,6 +359,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                USER_CACHE.delete(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -357,6 +379,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                USER_CACHE.delete(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -375,6 +398,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                USER_CACHE.delete(id)
 
                 return True
             else:
@@ -387,6 +411,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                USER_CACHE.delete(id)
                 return True if result == 1 else False
         except Exception:
             return False
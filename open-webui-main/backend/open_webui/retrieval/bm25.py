@@ -0,0 +1,424 @@
+import heapq
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    ENABLE_RAG_BM25_INDEX,
+    RAG_BM25_INDEX_PATH,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Okapi BM25 parameters, same defaults as rank_bm25 (used by BM25Retriever).
+# Scores use Lucene's non-negative IDF, log(1 + (N - df + 0.5) / (df + 0.5)),
+# rather than BM25Okapi's epsilon-floored log((N - df + 0.5) / (df + 0.5)): the
+# floor needs the average IDF over the whole vocabulary on every query. Scores
+# therefore differ from BM25Retriever, mostly for terms found in over half the
+# documents, while repeated query terms are counted the same way.
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Stay below SQLite's bound parameter limit
+ID_BATCH_SIZE = 500
+
+
+def tokenize(text: str) -> list[str]:
+    # Matches BM25Retriever's default preprocessing so rankings stay comparable
+    return text.split()
+
+
+class BM25Index:
+    """
+    Incrementally maintained inverted index per vector DB collection.
+
+    Postings live in a local SQLite file next to the other caches, so a hybrid
+    query only reads the postings of its own terms instead of pulling the whole
+    collection and rebuilding BM25 in memory. The index is derived data: a
+    collection without an entry is backfilled from the vector DB on first use.
+
+    Every write bumps the collection's generation, including inserts skipped
+    because the collection is not indexed yet, so a backfill built from a read
+    that raced with a write is discarded instead of missing those documents.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bm25_collection (
+                collection TEXT PRIMARY KEY,
+                doc_count INTEGER NOT NULL,
+                total_length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bm25_doc (
+                collection TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                PRIMARY KEY (collection, doc_id)
+            );
+            CREATE TABLE IF NOT EXISTS bm25_posting (
+                collection TEXT NOT NULL,
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (collection, term, doc_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_bm25_posting_doc
+                ON bm25_posting (collection, doc_id);
+            CREATE TABLE IF NOT EXISTS bm25_generation (
+                collection TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def has_collection(self, collection_name: str) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM bm25_collection WHERE collection = ?",
+                    (collection_name,),
+                ).fetchone()
+                is not None
+            )
+
+    def generation(self, collection_name: str) -> int:
+        """Read before fetching the documents passed to `build`."""
+        with self._lock:
+            return self._generation(collection_name)
+
+    def _generation(self, collection_name: str) -> int:
+        row = self._conn.execute(
+            "SELECT generation FROM bm25_generation WHERE collection = ?",
+            (collection_name,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, collection_name: str):
+        self._conn.execute(
+            "INSERT INTO bm25_generation (collection, generation) VALUES (?, 1) "
+            "ON CONFLICT(collection) DO UPDATE SET generation = generation + 1",
+            (collection_name,),
+        )
+
+    def _remove(self, collection_name: str, ids: list[str]):
+        """Remove documents with their postings and statistics."""
+        removed_docs = 0
+        removed_length = 0
+        for start in range(0, len(ids), ID_BATCH_SIZE):
+            batch = ids[start : start + ID_BATCH_SIZE]
+            where = f"collection = ? AND doc_id IN ({','.join('?' * len(batch))})"
+            params = [collection_name, *batch]
+            count, length = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM bm25_doc WHERE {where}",
+                params,
+            ).fetchone()
+            if not count:
+                continue
+            removed_docs += count
+            removed_length += length
+            self._conn.execute(f"DELETE FROM bm25_posting WHERE {where}", params)
+            self._conn.execute(f"DELETE FROM bm25_doc WHERE {where}", params)
+
+        if removed_docs:
+            self._conn.execute(
+                "UPDATE bm25_collection SET doc_count = doc_count - ?, "
+                "total_length = total_length - ? WHERE collection = ?",
+                (removed_docs, removed_length, collection_name),
+            )
+
+    def _add(self, collection_name: str, items: list[dict]):
+        # Last one wins for ids repeated in the batch; ids already indexed are
+        # replaced, so their old postings and statistics are removed first
+        items = list({str(item["id"]): item for item in items}.values())
+        self._remove(collection_name, [str(item["id"]) for item in items])
+
+        docs = []
+        postings = []
+        total_length = 0
+        for item in items:
+            terms = tokenize(item["text"])
+            total_length += len(terms)
+            docs.append(
+                (
+                    collection_name,
+                    str(item["id"]),
+                    len(terms),
+                    item["text"],
+                    json.dumps(item.get("metadata") or {}, default=str),
+                )
+            )
+            postings.extend(
+                (collection_name, term, str(item["id"]), tf)
+                for term, tf in Counter(terms).items()
+            )
+
+        self._conn.executemany(
+            "INSERT INTO bm25_doc "
+            "(collection, doc_id, length, text, metadata) VALUES (?, ?, ?, ?, ?)",
+            docs,
+        )
+        self._conn.executemany(
+            "INSERT INTO bm25_posting "
+            "(collection, term, doc_id, tf) VALUES (?, ?, ?, ?)",
+            postings,
+        )
+        self._conn.execute(
+            "INSERT INTO bm25_collection (collection, doc_count, total_length) "
+            "VALUES (?, ?, ?) ON CONFLICT(collection) DO UPDATE SET "
+            "doc_count = doc_count + excluded.doc_count, "
+            "total_length = total_length + excluded.total_length",
+            (collection_name, len(docs), total_length),
+        )
+
+    def build(
+        self,
+        collection_name: str,
+        ids: list,
+        documents: list,
+        metadatas: list,
+        generation: Optional[int] = None,
+    ) -> bool:
+        """
+        (Re)build a collection's index from a full vector DB `get` result.
+        Skipped if `generation` (read before the `get`) is no longer current.
+        """
+        with self._lock, self._conn:
+            # Check and build in one write transaction, other workers share the file
+            self._conn.execute("BEGIN IMMEDIATE")
+            if generation is not None and generation != self._generation(
+                collection_name
+            ):
+                log.debug(f"Skipped BM25 index build for {collection_name}")
+                return False
+
+            self._drop(collection_name)
+            self._add(
+                collection_name,
+                [
+                    {"id": id, "text": text or "", "metadata": metadata}
+                    for id, text, metadata in zip(ids, documents, metadatas)
+                ],
+            )
+            self._bump(collection_name)
+        log.debug(f"Built BM25 index for {collection_name} ({len(ids)} docs)")
+        return True
+
+    def insert(self, collection_name: str, items: list[dict], create: bool = False):
+        """
+        Add newly inserted vector DB items. Only applied when the collection is
+        already indexed (or `create` is set for a brand new collection), since a
+        partial index would silently drop older documents from keyword search.
+        """
+        with self._lock, self._conn:
+            self._bump(collection_name)
+            exists = (
+                self._conn.execute(
+                    "SELECT 1 FROM bm25_collection WHERE collection = ?",
+                    (collection_name,),
+                ).fetchone()
+                is not None
+            )
+            if not exists and not create:
+                return
+            self._add(collection_name, items)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        with self._lock, self._conn:
+            self._bump(collection_name)
+            if ids is None and filter:
+                try:
+                    where = " AND ".join(
+                        "json_extract(metadata, ?) = ?" for _ in filter.keys()
+                    )
+                    params = [collection_name]
+                    for key, value in filter.items():
+                        params.extend([f"$.{key}", value])
+                    ids = [
+                        row[0]
+                        for row in self._conn.execute(
+                            f"SELECT doc_id FROM bm25_doc WHERE collection = ? AND {where}",
+                            params,
+                        )
+                    ]
+                except sqlite3.Error as e:
+                    # Cannot resolve the filter locally, rebuild on next query
+                    log.warning(f"Dropping BM25 index for {collection_name}: {e}")
+                    self._drop(collection_name)
+                    return
+
+            if not ids:
+                return
+
+            self._remove(collection_name, list(dict.fromkeys(str(id) for id in ids)))
+
+    def _drop(self, collection_name: str):
+        for table in ("bm25_posting", "bm25_doc", "bm25_collection"):
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE collection = ?", (collection_name,)
+            )
+
+    def drop(self, collection_name: str):
+        with self._lock, self._conn:
+            self._drop(collection_name)
+            self._bump(collection_name)
+
+    def reset(self):
+        with self._lock, self._conn:
+            for table in ("bm25_posting", "bm25_doc", "bm25_collection"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("UPDATE bm25_generation SET generation = generation + 1")
+
+    def search(
+        self,
+        collection_name: str,
+        query: str,
+        k: int,
+        id_key: Optional[str] = None,
+    ) -> list[Document]:
+        """Top `k` documents, with their id under `id_key` in the metadata if set."""
+        # Repeated query terms add up, as in BM25Okapi.get_scores
+        query_terms = Counter(tokenize(query))
+        terms = list(query_terms)
+        if not terms or k <= 0:
+            return []
+
+        with self._lock:
+            stats = self._conn.execute(
+                "SELECT doc_count, total_length FROM bm25_collection WHERE collection = ?",
+                (collection_name,),
+            ).fetchone()
+            if not stats or stats[0] == 0:
+                return []
+            doc_count, total_length = stats
+            avg_length = total_length / doc_count
+
+            placeholders = ",".join("?" * len(terms))
+            postings = self._conn.execute(
+                "SELECT p.term, p.doc_id, p.tf, d.length "
+                "FROM bm25_posting p JOIN bm25_doc d "
+                "ON d.collection = p.collection AND d.doc_id = p.doc_id "
+                f"WHERE p.collection = ? AND p.term IN ({placeholders})",
+                [collection_name, *terms],
+            ).fetchall()
+
+            document_frequency = Counter(term for term, _, _, _ in postings)
+            scores: dict[str, float] = {}
+            for term, doc_id, tf, length in postings:
+                df = document_frequency[term]
+                idf = math.log((doc_count - df + 0.5) / (df + 0.5) + 1)
+                scores[doc_id] = scores.get(doc_id, 0.0) + query_terms[term] * idf * (
+                    tf
+                    * (BM25_K1 + 1)
+                    / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                )
+
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            documents = []
+            for doc_id, _ in top:
+                row = self._conn.execute(
+                    "SELECT text, metadata FROM bm25_doc WHERE collection = ? AND doc_id = ?",
+                    (collection_name, doc_id),
+                ).fetchone()
+                if row:
+                    metadata = json.loads(row[1])
+                    if id_key:
+                        metadata[id_key] = doc_id
+                    documents.append(Document(page_content=row[0], metadata=metadata))
+            return documents
+
+
+class BM25IndexRetriever(BaseRetriever):
+    index: Any
+    collection_name: str
+    k: int = 4
+    id_key: Optional[str] = None
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return self.index.search(
+            self.collection_name, query, self.k, id_key=self.id_key
+        )
+
+
+BM25_INDEX = BM25Index(RAG_BM25_INDEX_PATH) if ENABLE_RAG_BM25_INDEX else None
+
+
+####################################
+# Vector DB write hooks
+#
+# The index is derived data, so failures are logged and the collection is
+# dropped (to be rebuilt on the next hybrid query) instead of failing the write.
+####################################
+
+
+def bm25_index_insert(collection_name: str, items: list[dict], create: bool = False):
+    if BM25_INDEX is None:
+        return
+    try:
+        BM25_INDEX.insert(collection_name, items, create=create)
+    except Exception as e:
+        log.exception(f"Error updating BM25 index for {collection_name}: {e}")
+        bm25_index_drop(collection_name)
+
+
+def bm25_index_delete(
+    collection_name: str,
+    ids: Optional[list[str]] = None,
+    filter: Optional[dict] = None,
+):
+    if BM25_INDEX is None:
+        return
+    try:
+        BM25_INDEX.delete(collection_name, ids=ids, filter=filter)
+    except Exception as e:
+        log.exception(f"Error updating BM25 index for {collection_name}: {e}")
+        bm25_index_drop(collection_name)
+
+
+def bm25_index_drop(collection_name: str):
+    if BM25_INDEX is None:
+        return
+    try:
+        BM25_INDEX.drop(collection_name)
+    except Exception as e:
+        log.exception(f"Error dropping BM25 index for {collection_name}: {e}")
+
+
+def bm25_index_reset():
+    if BM25_INDEX is None:
+        return
+    try:
+        BM25_INDEX.reset()
+    except Exception as e:
+        log.exception(f"Error resetting BM25 index: {e}")
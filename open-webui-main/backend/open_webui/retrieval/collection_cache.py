@@ -0,0 +1,161 @@
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.retrieval.vector.main import GetResult
+from open_webui.utils.ttl_cache import publish_invalidation, register_cache
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    RAG_COLLECTION_CACHE_MAX_SIZE,
+    RAG_COLLECTION_CACHE_TTL,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Rough per-item overhead of the tuples and dicts holding a snapshot
+_ITEM_OVERHEAD = 200
+
+
+class CollectionSnapshot:
+    """Read-only copy of a collection's ids, texts and metadata."""
+
+    __slots__ = ("ids", "documents", "metadatas", "size", "expires_at")
+
+    def __init__(self, result: GetResult, ttl: float):
+        self.ids = tuple(result.ids[0])
+        self.documents = tuple(result.documents[0])
+        self.metadatas = tuple(dict(metadata or {}) for metadata in result.metadatas[0])
+        self.size = sum(
+            sys.getsizeof(id) + sys.getsizeof(text or "") + len(str(metadata))
+            for id, text, metadata in zip(self.ids, self.documents, self.metadatas)
+        ) + _ITEM_OVERHEAD * len(self.ids)
+        self.expires_at = time.monotonic() + ttl
+
+    def to_get_result(self) -> GetResult:
+        # Fresh metadata dicts, retrievers annotate them with scores in place
+        return GetResult.model_construct(
+            ids=[list(self.ids)],
+            documents=[list(self.documents)],
+            metadatas=[[dict(metadata) for metadata in self.metadatas]],
+        )
+
+
+class CollectionSnapshotCache:
+    """
+    LRU cache of full collection reads (`VECTOR_DB_CLIENT.get`) within a memory
+    budget, so hybrid search does not pull and deserialize every document of a
+    collection on each query.
+
+    Entries are dropped by the vector DB write hooks (see `delete`) and the drop
+    is broadcast to the other workers. A read racing with an invalidation is
+    returned but not cached, so a snapshot never outlives a write on this
+    worker. Writes made by other workers are only broadcast through Redis, so
+    entries also expire after `ttl` seconds.
+    """
+
+    name = "collection_snapshots"
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CollectionSnapshot] = OrderedDict()
+        self._size = 0
+        # Bumped on every invalidation, reads started before it are not stored
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        register_cache(self.name, self)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def get(
+        self, collection_name: str, fetch: Callable[[], Optional[GetResult]]
+    ) -> Optional[GetResult]:
+        if not self.enabled:
+            return fetch()
+
+        with self._lock:
+            snapshot = self._entries.get(collection_name)
+            if snapshot is not None and snapshot.expires_at <= time.monotonic():
+                del self._entries[collection_name]
+                self._size -= snapshot.size
+                self._stats["expired"] += 1
+                snapshot = None
+            if snapshot is not None:
+                self._entries.move_to_end(collection_name)
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+            generation = self._generation
+
+        if snapshot is not None:
+            return snapshot.to_get_result()
+
+        result = fetch()
+        if result is None or not result.ids:
+            return result
+
+        snapshot = CollectionSnapshot(result, self.ttl)
+        with self._lock:
+            if generation != self._generation or snapshot.size > self.max_bytes:
+                return result
+
+            previous = self._entries.pop(collection_name, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[collection_name] = snapshot
+            self._size += snapshot.size
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self._stats["evictions"] += 1
+
+        return result
+
+    def delete(self, *collection_names, broadcast: bool = True):
+        with self._lock:
+            self._generation += 1
+            for collection_name in collection_names:
+                snapshot = self._entries.pop(collection_name, None)
+                if snapshot is not None:
+                    self._size -= snapshot.size
+        if broadcast:
+            publish_invalidation(self.name, list(collection_names))
+
+    def clear(self, broadcast: bool = True):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size = 0
+        if broadcast:
+            publish_invalidation(self.name, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+            size = self._size
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "size": size,
+            "max_size": self.max_bytes,
+            "ttl": self.ttl,
+            **stats,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+COLLECTION_CACHE = CollectionSnapshotCache(
+    RAG_COLLECTION_CACHE_MAX_SIZE * 1024 * 1024, RAG_COLLECTION_CACHE_TTL
+)
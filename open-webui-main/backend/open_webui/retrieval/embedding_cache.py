@@ -0,0 +1,351 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    RAG_EMBEDDING_CACHE_ENABLED,
+    RAG_EMBEDDING_CACHE_PATH,
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+    RAG_QUERY_EMBEDDING_CACHE_ENABLED,
+    RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+    RAG_QUERY_EMBEDDING_CACHE_TTL,
+    RAG_QUERY_EMBEDDING_CACHE_REDIS,
+    REDIS_URL,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of document embeddings.
+
+    Entries are keyed by (engine, model, prefix, sha256(text)) so the same chunk
+    uploaded to several knowledge bases, or re-embedded by a reindex, is only
+    sent to the embedding engine once. Vectors are stored as float32 blobs in
+    SQLite; when the entry count passes `max_entries` the least recently used
+    entries are evicted down to 90% of the limit.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_access INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_access "
+            "ON embedding_cache (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(engine: str, model: str, prefix: Optional[str], text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{engine}:{model}:{prefix or ''}:{digest}"
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+
+        result = {}
+        now = int(time.time())
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(unique_keys), 500):
+                batch = unique_keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})",
+                    batch,
+                ):
+                    result[key] = np.frombuffer(blob, dtype="float32").tolist()
+
+            if result:
+                self._conn.executemany(
+                    "UPDATE embedding_cache SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in result],
+                )
+                self._conn.commit()
+
+            self.hits += sum(1 for key in keys if key in result)
+            self.misses += sum(1 for key in keys if key not in result)
+        return result
+
+    def put_many(self, entries: dict[str, list[float]]):
+        if not entries:
+            return
+
+        now = int(time.time())
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, vector, last_access) "
+                "VALUES (?, ?, ?)",
+                [
+                    (key, np.asarray(vector, dtype="float32").tobytes(), now)
+                    for key, vector in entries.items()
+                ],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        if count <= self.max_entries:
+            return
+
+        excess = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embedding_cache WHERE key IN ("
+            "SELECT key FROM embedding_cache ORDER BY last_access LIMIT ?)",
+            (excess,),
+        )
+        log.debug(f"Evicted {excess} entries from embedding cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM embedding_cache"
+            ).fetchone()[0]
+            requests = self.hits + self.misses
+            return {
+                "entries": count,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(RAG_EMBEDDING_CACHE_PATH, RAG_EMBEDDING_CACHE_MAX_ENTRIES)
+    if RAG_EMBEDDING_CACHE_ENABLED
+    else None
+)
+
+
+def embed_with_cache(
+    texts: list[str],
+    embed: Callable[[list[str]], list[list[float]]],
+    engine: str,
+    model: str,
+    prefix: Optional[str] = None,
+) -> list[list[float]]:
+    """Embed texts, reusing cached vectors and only sending misses to `embed`."""
+    if EMBEDDING_CACHE is None or not texts:
+        return embed(texts)
+
+    keys = [EmbeddingCache.make_key(engine, model, prefix, text) for text in texts]
+    cached = EMBEDDING_CACHE.get_many(keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+
+    if missing:
+        vectors = embed(list(missing.values()))
+        computed = dict(zip(missing.keys(), vectors))
+        EMBEDDING_CACHE.put_many(computed)
+        cached.update(computed)
+
+    log.debug(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits")
+    return [cached[key] for key in keys]
+
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU + TTL cache of query embeddings.
+
+    Queries are short and repeat a lot (the same question asked by many users,
+    the same generated search queries across turns), while each miss costs a
+    model forward pass or a remote embedding call. Entries share the key format
+    of the document cache. With `redis` set, misses are looked up in and
+    written to Redis as well, so workers share their entries.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, redis=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis = redis
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _redis_key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:query_embedding:{key}"
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        result = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                result[key] = entry[1]
+
+        missing = [key for key in dict.fromkeys(keys) if key not in result]
+        if missing and self.redis is not None:
+            try:
+                values = self.redis.mget([self._redis_key(key) for key in missing])
+                shared = {key: value for key, value in zip(missing, values) if value}
+                self._put_local(shared)
+                result.update(shared)
+                with self._lock:
+                    self.redis_hits += len(shared)
+            except Exception as e:
+                log.warning(f"Error reading query embeddings from Redis: {e}")
+
+        with self._lock:
+            self.hits += sum(1 for key in keys if key in result)
+            self.misses += sum(1 for key in keys if key not in result)
+        return result
+
+    def _put_local(self, entries: dict[str, bytes]):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, blob in entries.items():
+                self._entries[key] = (expires_at, blob)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put_many(self, entries: dict[str, bytes]):
+        if not entries:
+            return
+
+        self._put_local(entries)
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                for key, blob in entries.items():
+                    pipe.set(self._redis_key(key), blob, ex=self.ttl)
+                pipe.execute()
+            except Exception as e:
+                log.warning(f"Error writing query embeddings to Redis: {e}")
+
+    def embed(
+        self,
+        query: Union[str, list[str]],
+        embed: Callable[[list[str]], list[list[float]]],
+        engine: str,
+        model: str,
+        prefix: Optional[str] = None,
+    ):
+        """Drop-in for an embedding function call on one query or a list."""
+        single = isinstance(query, str)
+        texts = [query] if single else list(query)
+        if not texts:
+            return embed(texts)
+
+        keys = [EmbeddingCache.make_key(engine, model, prefix, text) for text in texts]
+        cached = self.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = embed(list(missing.values()))
+            computed = {
+                key: np.asarray(vector, dtype="float32").tobytes()
+                for key, vector in zip(missing.keys(), vectors)
+            }
+            self.put_many(computed)
+            cached.update(computed)
+
+        vectors = [np.frombuffer(cached[key], dtype="float32").tolist() for key in keys]
+        return vectors[0] if single else vectors
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "redis": self.redis is not None,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+def _get_query_cache_redis():
+    if not (RAG_QUERY_EMBEDDING_CACHE_REDIS and REDIS_URL):
+        return None
+
+    from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+    # Vectors are stored as raw float32 bytes
+    return get_redis_connection(
+        redis_url=REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+        async_mode=False,
+        decode_responses=False,
+    )
+
+
+QUERY_EMBEDDING_CACHE = (
+    QueryEmbeddingCache(
+        RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+        RAG_QUERY_EMBEDDING_CACHE_TTL,
+        redis=_get_query_cache_redis(),
+    )
+    if RAG_QUERY_EMBEDDING_CACHE_ENABLED
+    else None
+)
+
+
+def embed_query_with_cache(
+    query: Union[str, list[str]],
+    embed: Callable[[list[str]], list[list[float]]],
+    engine: str,
+    model: str,
+    prefix: Optional[str] = None,
+):
+    """Embed one query (or a list of them), reusing recent query embeddings."""
+    if QUERY_EMBEDDING_CACHE is None:
+        result = embed([query] if isinstance(query, str) else query)
+        return result[0] if isinstance(query, str) else result
+    return QUERY_EMBEDDING_CACHE.embed(query, embed, engine, model, prefix)
@@ -0,0 +1,282 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Union
+
+import numpy as np
+
+from open_webui.retrieval.embedding_cache import (
+    embed_with_cache,
+    embed_query_with_cache,
+)
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    DEVICE_TYPE,
+    SENTENCE_TRANSFORMERS_BACKEND,
+    SENTENCE_TRANSFORMERS_MODEL_KWARGS,
+    SENTENCE_TRANSFORMERS_BATCH_SIZE,
+    SENTENCE_TRANSFORMERS_QUEUE_SIZE,
+    SENTENCE_TRANSFORMERS_COALESCE_WAIT_MS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class _EncodeRequest:
+    def __init__(self, texts: list[str], prompt: Optional[str], normalize: bool):
+        self.texts = texts
+        self.prompt = prompt
+        self.normalize = normalize
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingService:
+    """
+    Process-wide wrapper around a SentenceTransformer model.
+
+    Concurrent encode calls are placed on a bounded queue and a single worker
+    thread coalesces them into one forward pass per (prompt, normalize) group,
+    so many small query embeddings share a batch instead of contending for the
+    model. `encode` mirrors SentenceTransformer.encode, so the service can be
+    used anywhere the raw model was (e.g. app.state.ef).
+    """
+
+    def __init__(
+        self,
+        model,
+        model_name: str,
+        batch_size: int = SENTENCE_TRANSFORMERS_BATCH_SIZE,
+        queue_size: int = SENTENCE_TRANSFORMERS_QUEUE_SIZE,
+        coalesce_wait_ms: int = SENTENCE_TRANSFORMERS_COALESCE_WAIT_MS,
+    ):
+        self.model = model
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.coalesce_wait = coalesce_wait_ms / 1000
+
+        self._queue: queue.Queue[_EncodeRequest] = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "texts": 0,
+            "batches": 0,
+            "batched_texts": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+            "queue_wait_total": 0.0,
+        }
+
+        self._worker = threading.Thread(
+            target=self._run, name=f"embedding-service-{model_name}", daemon=True
+        )
+        self._worker.start()
+
+    def __getattr__(self, name):
+        # Expose the underlying model's attributes (e.g. get_sentence_embedding_dimension)
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def encode(
+        self,
+        sentences: Union[str, list[str]],
+        prompt: Optional[str] = None,
+        normalize_embeddings: bool = False,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype="float32")
+
+        start = time.perf_counter()
+        request = _EncodeRequest(texts, prompt, normalize_embeddings)
+        # Blocks when the queue is full, applying back-pressure to callers
+        self._queue.put(request)
+        embeddings = request.future.result()
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self._stats["calls"] += 1
+            self._stats["texts"] += len(texts)
+            self._stats["latency_total"] += elapsed
+            self._stats["latency_max"] = max(self._stats["latency_max"], elapsed)
+
+        return embeddings[0] if single else embeddings
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        calls = stats["calls"] or 1
+        batches = stats["batches"] or 1
+        return {
+            "model": self.model_name,
+            "batch_size": self.batch_size,
+            "queue_depth": self._queue.qsize(),
+            "calls": stats["calls"],
+            "texts": stats["texts"],
+            "batches": stats["batches"],
+            "avg_batch_size": stats["batched_texts"] / batches,
+            "avg_latency": stats["latency_total"] / calls,
+            "max_latency": stats["latency_max"],
+            "avg_queue_wait": stats["queue_wait_total"] / calls,
+        }
+
+    def _collect(self, requests: list[_EncodeRequest]):
+        requests.append(self._queue.get())
+        pending = len(requests[0].texts)
+        deadline = time.perf_counter() + self.coalesce_wait
+
+        while pending < self.batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            requests.append(request)
+            pending += len(request.texts)
+
+    def _run(self):
+        while True:
+            requests: list[_EncodeRequest] = []
+            try:
+                self._collect(requests)
+                self._process(requests)
+            except Exception as e:
+                # Keep the worker alive, callers waiting on this batch get the error
+                log.exception(f"Error in embedding service worker: {e}")
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _process(self, requests: list[_EncodeRequest]):
+        started = time.perf_counter()
+
+        groups: dict[tuple, list[_EncodeRequest]] = {}
+        for request in requests:
+            groups.setdefault((request.prompt, request.normalize), []).append(request)
+
+        for (prompt, normalize), group in groups.items():
+            texts = [text for request in group for text in request.texts]
+            try:
+                embeddings = self.model.encode(
+                    texts,
+                    batch_size=self.batch_size,
+                    normalize_embeddings=normalize,
+                    **({"prompt": prompt} if prompt else {}),
+                )
+                embeddings = np.asarray(embeddings)
+            except Exception as e:
+                log.exception(f"Error encoding batch of {len(texts)} texts: {e}")
+                for request in group:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in group:
+                count = len(request.texts)
+                request.future.set_result(embeddings[offset : offset + count])
+                offset += count
+
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["batched_texts"] += len(texts)
+                self._stats["queue_wait_total"] += sum(
+                    started - request.enqueued_at for request in group
+                )
+
+
+class LangchainEmbeddings:
+    """
+    Minimal langchain `Embeddings` adapter over the shared service, resolved
+    lazily so importing a router does not load a model.
+    """
+
+    def __init__(self, model_name: str, normalize: bool = True):
+        self.model_name = model_name
+        self.normalize = normalize
+
+    @property
+    def service(self) -> EmbeddingService:
+        service = get_embedding_service(self.model_name)
+        if service is None:
+            raise RuntimeError(f"Embedding model {self.model_name} is not available")
+        return service
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return embed_with_cache(
+            texts,
+            lambda batch: self.service.encode(
+                batch, normalize_embeddings=self.normalize
+            ).tolist(),
+            engine="",
+            model=_normalize_model_name(self.model_name),
+            # Keep normalized vectors apart from the raw ones cached by get_ef users
+            prefix="normalized" if self.normalize else None,
+        )
+
+    def embed_query(self, text: str) -> list[float]:
+        return embed_query_with_cache(
+            text,
+            lambda texts: self.service.encode(
+                texts, normalize_embeddings=self.normalize
+            ).tolist(),
+            engine="",
+            model=_normalize_model_name(self.model_name),
+            prefix="normalized" if self.normalize else None,
+        )
+
+
+_services: dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def _normalize_model_name(model_name: str) -> str:
+    # "all-MiniLM-L6-v2" and "sentence-transformers/all-MiniLM-L6-v2" are the same model
+    if "/" not in model_name and "\\" not in model_name:
+        return f"sentence-transformers/{model_name}"
+    return model_name
+
+
+def get_embedding_service(
+    model_name: str,
+    auto_update: bool = False,
+    trust_remote_code: bool = False,
+) -> Optional[EmbeddingService]:
+    """Return the process-wide service for a model, loading it once on first use."""
+    from open_webui.retrieval.utils import get_model_path
+
+    key = _normalize_model_name(model_name)
+    with _services_lock:
+        service = _services.get(key)
+        if service is not None:
+            return service
+
+        from sentence_transformers import SentenceTransformer
+
+        try:
+            model = SentenceTransformer(
+                get_model_path(model_name, auto_update),
+                device=DEVICE_TYPE,
+                trust_remote_code=trust_remote_code,
+                backend=SENTENCE_TRANSFORMERS_BACKEND,
+                model_kwargs=SENTENCE_TRANSFORMERS_MODEL_KWARGS,
+            )
+        except Exception as e:
+            log.debug(f"Error loading SentenceTransformer: {e}")
+            return None
+
+        service = EmbeddingService(model, key)
+        _services[key] = service
+        log.info(f"Loaded shared embedding model: {key}")
+        return service
+
+
+def get_embedding_services_stats() -> list[dict]:
+    with _services_lock:
+        return [service.stats() for service in _services.values()]
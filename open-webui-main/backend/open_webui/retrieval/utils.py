@@ -2,9 +2,9 @@ import logging
 import os
 from typing import Optional, Union
 
+import numpy as np
 import requests
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
 import time
 
 from urllib.parse import quote
@@ -22,7 +22,11 @@ from open_webui.models.knowledge import Knowledges
 from open_webui.models.notes import Notes
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.bm25 import BM25_INDEX, BM25IndexRetriever
+from open_webui.retrieval.collection_cache import COLLECTION_CACHE
+from open_webui.retrieval.embedding_cache import embed_query_with_cache
 from open_webui.utils.access_control import has_access
+from open_webui.utils.executors import get_executor
 
 
 from open_webui.env import (
@@ -46,6 +50,11 @@ from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.retrievers import BaseRetriever
 
 
+# Metadata key carrying a chunk's vector DB id through the hybrid retrievers, so
+# RerankCompressor can score with the stored vector. Removed from its results.
+VECTOR_ID_KEY = "_vector_id"
+
+
 class VectorSearchRetriever(BaseRetriever):
     collection_name: Any
     embedding_function: Any
@@ -71,7 +80,7 @@ class VectorSearchRetriever(BaseRetriever):
         for idx in range(len(ids)):
             results.append(
                 Document(
-                    metadata=metadatas[idx],
+                    metadata={**(metadatas[idx] or {}), VECTOR_ID_KEY: ids[idx]},
                     page_content=documents[idx],
                 )
             )
@@ -98,10 +107,37 @@ def query_doc(
         raise e
 
 
+def query_docs(
+    collection_name: str,
+    query_embeddings: list[list[float]],
+    k: int,
+    user: UserModel = None,
+):
+    """Like query_doc, with all query embeddings in one search (a row per query)."""
+    try:
+        log.debug(f"query_docs:doc {collection_name} ({len(query_embeddings)} queries)")
+        result = VECTOR_DB_CLIENT.search(
+            collection_name=collection_name,
+            vectors=query_embeddings,
+            limit=k,
+        )
+
+        if result:
+            log.info(f"query_docs:result {result.ids} {result.metadatas}")
+
+        return result
+    except Exception as e:
+        log.exception(f"Error querying doc {collection_name} with limit {k}: {e}")
+        raise e
+
+
 def get_doc(collection_name: str, user: UserModel = None):
     try:
         log.debug(f"get_doc:doc {collection_name}")
-        result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        result = COLLECTION_CACHE.get(
+            collection_name,
+            lambda: VECTOR_DB_CLIENT.get(collection_name=collection_name),
+        )
 
         if result:
             log.info(f"query_doc:result {result.ids} {result.metadatas}")
@@ -114,7 +150,7 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
+    collection_result: Optional[GetResult],
     query: str,
     embedding_function,
     k: int,
@@ -125,11 +161,25 @@ def query_doc_with_hybrid_search(
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+        if collection_result is None:
+            # Collection is covered by the persistent keyword index
+            bm25_retriever = BM25IndexRetriever(
+                index=BM25_INDEX,
+                collection_name=collection_name,
+                k=k,
+                id_key=VECTOR_ID_KEY,
+            )
+        else:
+            bm25_retriever = BM25Retriever.from_texts(
+                texts=collection_result.documents[0],
+                metadatas=[
+                    {**(metadata or {}), VECTOR_ID_KEY: id}
+                    for id, metadata in zip(
+                        collection_result.ids[0], collection_result.metadatas[0]
+                    )
+                ],
+            )
+            bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -152,6 +202,7 @@ def query_doc_with_hybrid_search(
             )
 
         compressor = RerankCompressor(
+            collection_name=collection_name,
             embedding_function=embedding_function,
             top_n=k_reranker,
             reranking_function=reranking_function,
@@ -218,23 +269,23 @@ def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
     combined = dict()  # To store documents with unique document hashes
 
     for data in query_results:
-        distances = data["distances"][0]
-        documents = data["documents"][0]
-        metadatas = data["metadatas"][0]
-
-        for distance, document, metadata in zip(distances, documents, metadatas):
-            if isinstance(document, str):
-                doc_hash = hashlib.sha256(
-                    document.encode()
-                ).hexdigest()  # Compute a hash for uniqueness
-
-                if doc_hash not in combined.keys():
-                    combined[doc_hash] = (distance, document, metadata)
-                    continue  # if doc is new, no further comparison is needed
-
-                # if doc is alredy in, but new distance is better, update
-                if distance > combined[doc_hash][0]:
-                    combined[doc_hash] = (distance, document, metadata)
+        # Batched searches return a row per query vector
+        for distances, documents, metadatas in zip(
+            data["distances"], data["documents"], data["metadatas"]
+        ):
+            for distance, document, metadata in zip(distances, documents, metadatas):
+                if isinstance(document, str):
+                    doc_hash = hashlib.sha256(
+                        document.encode()
+                    ).hexdigest()  # Compute a hash for uniqueness
+
+                    if doc_hash not in combined.keys():
+                        combined[doc_hash] = (distance, document, metadata)
+                        continue  # if doc is new, no further comparison is needed
+
+                    # if doc is alredy in, but new distance is better, update
+                    if distance > combined[doc_hash][0]:
+                        combined[doc_hash] = (distance, document, metadata)
 
     combined = list(combined.values())
     # Sort the list based on distances
@@ -279,13 +330,13 @@ def query_collection(
     results = []
     error = False
 
-    def process_query_collection(collection_name, query_embedding):
+    def process_query_collection(collection_name, query_embeddings):
         try:
             if collection_name:
-                result = query_doc(
+                result = query_docs(
                     collection_name=collection_name,
                     k=k,
-                    query_embedding=query_embedding,
+                    query_embeddings=query_embeddings,
                 )
                 if result is not None:
                     return result.model_dump(), None
@@ -300,15 +351,13 @@ def query_collection(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    # One batched search per collection with all query embeddings
+    executor = get_executor("vector_search")
+    future_results = [
+        executor.submit(process_query_collection, collection_name, query_embeddings)
+        for collection_name in collection_names
+    ]
+    task_results = [future.result() for future in future_results]
 
     for result, err in task_results:
         if err is not None:
@@ -322,6 +371,32 @@ def query_collection(
     return merge_and_sort_query_results(results, k=k)
 
 
+def backfill_bm25_index(collection_name: str) -> tuple[Optional[GetResult], bool]:
+    """
+    Index a collection for keyword search, returning the collection read and
+    whether the index now covers it. Built from a fresh read rather than a
+    cached snapshot, and skipped if a write lands between the read and the
+    build, so documents written meanwhile are never left out of the index.
+    """
+    generation = BM25_INDEX.generation(collection_name)
+    result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+    if not result or not result.ids:
+        return result, False
+
+    try:
+        indexed = BM25_INDEX.build(
+            collection_name,
+            result.ids[0],
+            result.documents[0],
+            result.metadatas[0],
+            generation=generation,
+        )
+    except Exception as e:
+        log.exception(f"Error building BM25 index for {collection_name}: {e}")
+        indexed = False
+    return result, indexed
+
+
 def query_collection_with_hybrid_search(
     collection_names: list[str],
     queries: list[str],
@@ -337,13 +412,29 @@ def query_collection_with_hybrid_search(
     # Fetch collection data once per collection sequentially
     # Avoid fetching the same data multiple times later
     collection_results = {}
+    indexed_collections = set()
     for collection_name in collection_names:
+        if BM25_INDEX is not None and BM25_INDEX.has_collection(collection_name):
+            # Keyword index is maintained incrementally, no need to pull the collection
+            collection_results[collection_name] = None
+            indexed_collections.add(collection_name)
+            continue
+
         try:
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
+            if BM25_INDEX is not None:
+                # Backfill so later queries skip pulling the whole collection
+                result, indexed = backfill_bm25_index(collection_name)
+                collection_results[collection_name] = None if indexed else result
+                if indexed:
+                    indexed_collections.add(collection_name)
+                continue
+
+            collection_results[collection_name] = COLLECTION_CACHE.get(
+                collection_name,
+                lambda: VECTOR_DB_CLIENT.get(collection_name=collection_name),
             )
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
@@ -376,13 +467,13 @@ def query_collection_with_hybrid_search(
     tasks = [
         (cn, q)
         for cn in collection_names
-        if collection_results[cn] is not None
+        if collection_results[cn] is not None or cn in indexed_collections
         for q in queries
     ]
 
-    with ThreadPoolExecutor() as executor:
-        future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
-        task_results = [future.result() for future in future_results]
+    executor = get_executor("vector_search")
+    future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
+    task_results = [future.result() for future in future_results]
 
     for result, err in task_results:
         if err is not None:
@@ -406,6 +497,42 @@ def get_embedding_function(
     key,
     embedding_batch_size,
     azure_api_version=None,
+    query_cache: bool = True,
+):
+    """
+    With `query_cache` (the default) calls go through the in-memory query
+    embedding cache. Document ingestion disables it, its chunks are cached
+    persistently by `embed_with_cache` instead.
+    """
+    embed = _get_embedding_function(
+        embedding_engine,
+        embedding_model,
+        embedding_function,
+        url,
+        key,
+        embedding_batch_size,
+        azure_api_version,
+    )
+    if not query_cache:
+        return embed
+
+    return lambda query, prefix=None, user=None: embed_query_with_cache(
+        query,
+        lambda texts: embed(texts, prefix=prefix, user=user),
+        engine=embedding_engine,
+        model=embedding_model,
+        prefix=prefix,
+    )
+
+
+def _get_embedding_function(
+    embedding_engine,
+    embedding_model,
+    embedding_function,
+    url,
+    key,
+    embedding_batch_size,
+    azure_api_version=None,
 ):
     if embedding_engine == "":
         return lambda query, prefix=None, user=None: embedding_function.encode(
@@ -425,15 +552,22 @@ def get_embedding_function(
 
         def generate_multiple(query, prefix, user, func):
             if isinstance(query, list):
+                batches = [
+                    query[i : i + embedding_batch_size]
+                    for i in range(0, len(query), embedding_batch_size)
+                ]
+                if len(batches) == 1:
+                    return func(batches[0], prefix=prefix, user=user)
+
+                # Send the batches concurrently, bounded by the embedding pool
+                executor = get_executor("embedding")
+                futures = [
+                    executor.submit(func, batch, prefix=prefix, user=user)
+                    for batch in batches
+                ]
                 embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
-                        )
-                    )
+                for future in futures:
+                    embeddings.extend(future.result())
                 return embeddings
             else:
                 return func(query, prefix, user)
@@ -925,6 +1059,7 @@ from langchain_core.documents import BaseDocumentCompressor, Document
 
 
 class RerankCompressor(BaseDocumentCompressor):
+    collection_name: Optional[str] = None
     embedding_function: Any
     top_n: int
     reranking_function: Any
@@ -947,13 +1082,7 @@ class RerankCompressor(BaseDocumentCompressor):
                 [(query, doc.page_content) for doc in documents]
             )
         else:
-            from sentence_transformers import util
-
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
-            )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = self.similarity_scores(documents, query)
 
         docs_with_scores = list(
             zip(documents, scores.tolist() if not isinstance(scores, list) else scores)
@@ -966,7 +1095,11 @@ class RerankCompressor(BaseDocumentCompressor):
         result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
         final_results = []
         for doc, doc_score in result[: self.top_n]:
-            metadata = doc.metadata
+            metadata = {
+                key: value
+                for key, value in doc.metadata.items()
+                if key != VECTOR_ID_KEY
+            }
             metadata["score"] = doc_score
             doc = Document(
                 page_content=doc.page_content,
@@ -974,3 +1107,54 @@ class RerankCompressor(BaseDocumentCompressor):
             )
             final_results.append(doc)
         return final_results
+
+    def similarity_scores(self, documents: Sequence[Document], query: str) -> list:
+        """
+        Cosine similarity of the query to each document. Documents are scored
+        with the vectors stored at ingestion, fetched in one batch by the id
+        carried under VECTOR_ID_KEY; only those without one are embedded again.
+        """
+        if not documents:
+            return []
+
+        query_embedding = np.asarray(
+            self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX),
+            dtype=np.float32,
+        ).reshape(-1)
+        dimension = query_embedding.shape[0]
+
+        vectors = [None] * len(documents)
+        ids = [doc.metadata.get(VECTOR_ID_KEY) for doc in documents]
+        if self.collection_name and any(ids):
+            try:
+                stored = VECTOR_DB_CLIENT.get_vectors(
+                    self.collection_name, list({id for id in ids if id})
+                )
+            except Exception as e:
+                log.warning(f"Error fetching stored vectors, re-embedding: {e}")
+                stored = {}
+
+            for idx, id in enumerate(ids):
+                vector = stored.get(id)
+                # Some backends zero pad vectors to a fixed length; any other
+                # size is from a different embedding model
+                if (
+                    vector is not None
+                    and len(vector) >= dimension
+                    and not any(vector[dimension:])
+                ):
+                    vectors[idx] = vector[:dimension]
+
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+        if missing:
+            log.debug(f"Embedding {len(missing)}/{len(documents)} documents to score")
+            embeddings = self.embedding_function(
+                [documents[idx].page_content for idx in missing],
+                RAG_EMBEDDING_CONTENT_PREFIX,
+            )
+            for idx, embedding in zip(missing, embeddings):
+                vectors[idx] = embedding
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_embedding)
+        return (matrix @ query_embedding / np.maximum(norms, 1e-12)).tolist()
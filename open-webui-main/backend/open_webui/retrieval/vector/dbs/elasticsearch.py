@@ -1,5 +1,6 @@
 from elasticsearch import Elasticsearch, BadRequestError
 from typing import Optional
+import logging
 import ssl
 from elasticsearch.helpers import bulk, scan
 from open_webui.retrieval.vector.main import (
@@ -18,6 +19,10 @@ from open_webui.config import (
     ELASTICSEARCH_INDEX_PREFIX,
     SSL_ASSERT_FINGERPRINT,
 )
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class ElasticsearchClient(VectorDBBase):
@@ -153,29 +158,50 @@ class ElasticsearchClient(VectorDBBase):
     def search(
         self, collection_name: str, vectors: list[list[float]], limit: int
     ) -> Optional[SearchResult]:
-        query = {
-            "size": limit,
-            "_source": ["text", "metadata"],
-            "query": {
-                "script_score": {
+        searches = []
+        for vector in vectors:
+            searches.append({})
+            searches.append(
+                {
+                    "size": limit,
+                    "_source": ["text", "metadata"],
                     "query": {
-                        "bool": {"filter": [{"term": {"collection": collection_name}}]}
-                    },
-                    "script": {
-                        "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
-                        "params": {
-                            "vector": vectors[0]
-                        },  # Assuming single query vector
+                        "script_score": {
+                            "query": {
+                                "bool": {
+                                    "filter": [
+                                        {"term": {"collection": collection_name}}
+                                    ]
+                                }
+                            },
+                            "script": {
+                                "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
+                                "params": {"vector": vector},
+                            },
+                        }
                     },
                 }
-            },
-        }
+            )
 
-        result = self.client.search(
-            index=self._get_index_name(len(vectors[0])), body=query
+        # One request for all query vectors
+        result = self.client.msearch(
+            index=self._get_index_name(len(vectors[0])), body=searches
         )
 
-        return self._result_to_search_result(result)
+        ids, distances, documents, metadatas = [], [], [], []
+        for response in result["responses"]:
+            if "error" in response:
+                log.error(f"Error searching {collection_name}: {response['error']}")
+                response = {"hits": {"hits": []}}
+            search_result = self._result_to_search_result(response)
+            ids.extend(search_result.ids)
+            distances.extend(search_result.distances)
+            documents.extend(search_result.documents)
+            metadatas.extend(search_result.metadatas)
+
+        return SearchResult(
+            ids=ids, distances=distances, documents=documents, metadatas=metadatas
+        )
 
     # Status: only tested halfwat
     def query(
@@ -229,6 +255,29 @@ class ElasticsearchClient(VectorDBBase):
 
         return self._scan_result_to_get_result(results)
 
+    def get_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> dict[str, list[float]]:
+        query = {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"term": {"collection": collection_name}},
+                        {"ids": {"values": ids}},
+                    ]
+                }
+            },
+            "_source": ["vector"],
+        }
+        result = self.client.search(
+            index=f"{self.index_prefix}*", body=query, size=len(ids)
+        )
+        return {
+            hit["_id"]: hit["_source"]["vector"]
+            for hit in result["hits"]["hits"]
+            if hit["_source"].get("vector")
+        }
+
     # Status: works
     def insert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
@@ -0,0 +1,634 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+import faiss
+import numpy as np
+
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
+from open_webui.config import (
+    LOCAL_VECTOR_DB_PATH,
+    LOCAL_VECTOR_DB_HNSW_M,
+    LOCAL_VECTOR_DB_HNSW_EF_CONSTRUCTION,
+    LOCAL_VECTOR_DB_HNSW_EF_SEARCH,
+    LOCAL_VECTOR_DB_MAX_SEGMENTS,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.executors import get_executor
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Compact a collection once deleted vectors make up this share of its segments
+TOMBSTONE_RATIO = 0.2
+# Uncommitted segment files older than this (seconds) are left over from a crash
+ORPHAN_AGE = 600
+# Stay below SQLite's bound parameter limit
+ID_BATCH_SIZE = 500
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.array(vectors, dtype="float32", ndmin=2, order="C")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _batches(values: List, size: int = ID_BATCH_SIZE) -> Iterable[List]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+class LocalClient(VectorDBBase):
+    """
+    Embedded vector store for single-node deployments, no server required.
+
+    Each collection is a set of immutable FAISS HNSW segments (inner product
+    over normalized vectors, i.e. cosine), one per write, memory mapped where
+    the index type allows it. Texts, metadata and the (segment, position) of
+    every vector live in one SQLite database, which is the source of truth: a
+    segment file is only used once its row is committed, and files left behind
+    by a crash are removed on startup. Deleted items are removed from SQLite and
+    skipped at search time; a collection is compacted into a single segment in
+    the background when it has too many segments or too many deleted vectors.
+    Indexes are built and written before taking the client lock, which only
+    covers SQLite and the swap of loaded segments, so searches keep running
+    during large writes and compactions.
+    """
+
+    def __init__(self):
+        self.path = LOCAL_VECTOR_DB_PATH
+        self.segment_path = os.path.join(self.path, "segments")
+        os.makedirs(self.segment_path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # collection -> segment id -> FAISS index
+        self._segments: Dict[str, Dict[str, Any]] = {}
+        # Collections with a compaction scheduled or running
+        self._compacting = set()
+
+        self._conn = sqlite3.connect(
+            os.path.join(self.path, "local.sqlite"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS collection (
+                name TEXT PRIMARY KEY,
+                dimension INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segment (
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (collection, id)
+            );
+            CREATE TABLE IF NOT EXISTS item (
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                segment_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                text TEXT,
+                metadata TEXT NOT NULL,
+                PRIMARY KEY (collection, id)
+            );
+            CREATE INDEX IF NOT EXISTS item_segment_idx
+                ON item (collection, segment_id, position);
+            """
+        )
+        self._conn.commit()
+        self._remove_orphans()
+
+    ####################################
+    # Segment files
+    ####################################
+
+    def _collection_dir(self, collection_name: str) -> str:
+        # Collection names are not always valid file names
+        digest = hashlib.sha256(collection_name.encode()).hexdigest()[:32]
+        return os.path.join(self.segment_path, digest)
+
+    def _segment_file(self, collection_name: str, segment_id: str) -> str:
+        return os.path.join(
+            self._collection_dir(collection_name), f"{segment_id}.faiss"
+        )
+
+    @staticmethod
+    def _build_index(vectors: np.ndarray):
+        index = faiss.IndexHNSWFlat(
+            vectors.shape[1], LOCAL_VECTOR_DB_HNSW_M, faiss.METRIC_INNER_PRODUCT
+        )
+        index.hnsw.efConstruction = LOCAL_VECTOR_DB_HNSW_EF_CONSTRUCTION
+        index.add(vectors)
+        return index
+
+    @staticmethod
+    def _write_index(path: str, index):
+        # Written aside and renamed, so a segment file is either complete or absent
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_index(path: str):
+        try:
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except Exception:
+            return faiss.read_index(path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError as e:
+            # Still mapped by another process on some platforms, retried on startup
+            log.debug(f"Could not remove segment file {path}: {e}")
+
+    def _remove_orphans(self):
+        with self._lock:
+            committed = {
+                self._segment_file(collection_name, segment_id)
+                for collection_name, segment_id in self._conn.execute(
+                    "SELECT collection, id FROM segment"
+                )
+            }
+
+        now = time.time()
+        for directory, _, filenames in os.walk(self.segment_path):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    # Recent files may belong to a write in progress in another worker
+                    if path in committed or now - os.path.getmtime(path) < ORPHAN_AGE:
+                        continue
+                except OSError:
+                    continue
+                log.info(f"Removing uncommitted segment file {path}")
+                self._remove_file(path)
+
+    def _load_segments(self, collection_name: str) -> Dict[str, Tuple[Any, int]]:
+        """
+        Committed segments of a collection with their deleted counts. Segments
+        written or compacted away by other workers are picked up here.
+        """
+        with self._lock:
+            committed = dict(
+                self._conn.execute(
+                    "SELECT id, deleted FROM segment WHERE collection = ?",
+                    (collection_name,),
+                ).fetchall()
+            )
+            segments = self._segments.setdefault(collection_name, {})
+            for segment_id in list(segments):
+                if segment_id not in committed:
+                    del segments[segment_id]
+            for segment_id in committed.keys() - segments.keys():
+                segments[segment_id] = self._read_index(
+                    self._segment_file(collection_name, segment_id)
+                )
+            return {
+                segment_id: (index, committed[segment_id])
+                for segment_id, index in segments.items()
+            }
+
+    ####################################
+    # Items
+    ####################################
+
+    @staticmethod
+    def _filter_clause(filter: Optional[Dict]) -> Tuple[str, List]:
+        if not filter:
+            return "1", []
+        params = []
+        for key, value in filter.items():
+            params.extend([f'$."{key}"', value])
+        return " AND ".join("json_extract(metadata, ?) = ?" for _ in filter), params
+
+    def _delete_where(self, collection_name: str, clause: str, params: List) -> int:
+        # Runs inside the caller's transaction
+        counts = self._conn.execute(
+            f"SELECT segment_id, COUNT(*) FROM item WHERE collection = ? AND {clause} "
+            "GROUP BY segment_id",
+            [collection_name, *params],
+        ).fetchall()
+        if not counts:
+            return 0
+
+        self._conn.execute(
+            f"DELETE FROM item WHERE collection = ? AND {clause}",
+            [collection_name, *params],
+        )
+        self._conn.executemany(
+            "UPDATE segment SET deleted = deleted + ? WHERE collection = ? AND id = ?",
+            [(count, collection_name, segment_id) for segment_id, count in counts],
+        )
+        return sum(count for _, count in counts)
+
+    def _delete_ids(self, collection_name: str, ids: List[str]) -> int:
+        deleted = 0
+        for batch in _batches(ids):
+            deleted += self._delete_where(
+                collection_name, f"id IN ({','.join('?' * len(batch))})", batch
+            )
+        return deleted
+
+    def _write(self, collection_name: str, items: List[VectorItem]):
+        if not items:
+            return
+
+        # Last write wins for ids repeated within the batch
+        latest = {str(item["id"]): item for item in items}
+        items = list(latest.values())
+        vectors = _normalize([item["vector"] for item in items])
+        dimension = vectors.shape[1]
+
+        # Build and write the segment without holding the lock
+        segment_id = uuid4().hex
+        path = self._segment_file(collection_name, segment_id)
+        self._write_index(path, self._build_index(vectors))
+        try:
+            index = self._read_index(path)
+        except Exception:
+            self._remove_file(path)
+            raise
+
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    row = self._conn.execute(
+                        "SELECT dimension FROM collection WHERE name = ?",
+                        (collection_name,),
+                    ).fetchone()
+                    if row is not None and row[0] != dimension:
+                        raise ValueError(
+                            f"Collection {collection_name} holds {row[0]}-dimensional "
+                            f"vectors, got {dimension}"
+                        )
+
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO collection (name, dimension) VALUES (?, ?)",
+                        (collection_name, dimension),
+                    )
+                    # Replaced items become tombstones in their old segment
+                    self._delete_ids(collection_name, list(latest.keys()))
+                    self._conn.executemany(
+                        "INSERT INTO item "
+                        "(collection, id, segment_id, position, text, metadata) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                collection_name,
+                                str(item["id"]),
+                                segment_id,
+                                position,
+                                item["text"],
+                                json.dumps(item["metadata"] or {}, default=str),
+                            )
+                            for position, item in enumerate(items)
+                        ],
+                    )
+                    self._conn.execute(
+                        "INSERT INTO segment (collection, id, size) VALUES (?, ?, ?)",
+                        (collection_name, segment_id, len(items)),
+                    )
+            except Exception:
+                self._remove_file(path)
+                raise
+
+            self._segments.setdefault(collection_name, {})[segment_id] = index
+        self._maybe_compact(collection_name)
+
+    def _get_items(
+        self, collection_name: str, keys: Iterable[Tuple[str, int]]
+    ) -> Dict[Tuple[str, int], Tuple[str, str, dict]]:
+        """Items at the given (segment, position) keys, deleted ones are left out."""
+        positions_by_segment: Dict[str, List[int]] = {}
+        for segment_id, position in keys:
+            positions_by_segment.setdefault(segment_id, []).append(position)
+
+        items = {}
+        with self._lock:
+            for segment_id, positions in positions_by_segment.items():
+                for batch in _batches(positions):
+                    rows = self._conn.execute(
+                        "SELECT position, id, text, metadata FROM item "
+                        "WHERE collection = ? AND segment_id = ? "
+                        f"AND position IN ({','.join('?' * len(batch))})",
+                        [collection_name, segment_id, *batch],
+                    )
+                    for position, id, text, metadata in rows:
+                        items[(segment_id, position)] = (id, text, json.loads(metadata))
+        return items
+
+    ####################################
+    # Compaction
+    ####################################
+
+    def _maybe_compact(self, collection_name: str) -> Optional[Future]:
+        """Schedule a background compaction if the collection needs one."""
+        with self._lock:
+            if collection_name in self._compacting:
+                return None
+            segments = self._conn.execute(
+                "SELECT id, size, deleted FROM segment WHERE collection = ?",
+                (collection_name,),
+            ).fetchall()
+            size = sum(row[1] for row in segments)
+            deleted = sum(row[2] for row in segments)
+            if not (
+                len(segments) > LOCAL_VECTOR_DB_MAX_SEGMENTS
+                or (deleted and deleted > size * TOMBSTONE_RATIO)
+            ):
+                return None
+            self._compacting.add(collection_name)
+
+        # Never waits for a slot; a skipped compaction is retried on the next write
+        future = get_executor("file_processing").try_submit(
+            self._compact_in_background, collection_name
+        )
+        if future is None:
+            with self._lock:
+                self._compacting.discard(collection_name)
+        return future
+
+    def _compact_in_background(self, collection_name: str):
+        try:
+            self._compact(collection_name)
+        except Exception as e:
+            log.exception(f"Error compacting {collection_name}: {e}")
+        finally:
+            with self._lock:
+                self._compacting.discard(collection_name)
+
+    def _compact(self, collection_name: str):
+        """
+        Merge the current segments of a collection into one, dropping deleted
+        vectors. Segments written meanwhile are left as they are, and items
+        deleted or replaced meanwhile become tombstones in the new segment.
+        """
+        with self._lock:
+            segments = self._load_segments(collection_name)
+            if not segments:
+                return
+            rows = self._conn.execute(
+                "SELECT id, segment_id, position FROM item WHERE collection = ? "
+                f"AND segment_id IN ({','.join('?' * len(segments))}) "
+                "ORDER BY segment_id, position",
+                [collection_name, *segments.keys()],
+            ).fetchall()
+
+        # Segments are immutable, so vectors are read and the new index built
+        # without holding the lock
+        vectors = []
+        positions_by_segment: Dict[str, List[int]] = {}
+        for _, segment_id, position in rows:
+            positions_by_segment.setdefault(segment_id, []).append(position)
+        for segment_id, positions in positions_by_segment.items():
+            index = segments[segment_id][0]
+            vectors.append(index.reconstruct_n(0, index.ntotal)[positions])
+
+        segment_id = uuid4().hex
+        path = self._segment_file(collection_name, segment_id)
+        index = None
+        if rows:
+            self._write_index(path, self._build_index(np.vstack(vectors)))
+            index = self._read_index(path)
+
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    current = {
+                        row[0]
+                        for row in self._conn.execute(
+                            "SELECT id FROM segment WHERE collection = ?",
+                            (collection_name,),
+                        )
+                    }
+                    if not segments.keys() <= current:
+                        # Compacted or dropped by another worker meanwhile
+                        raise RuntimeError("collection changed during compaction")
+
+                    moved = self._conn.executemany(
+                        "UPDATE item SET segment_id = ?, position = ? "
+                        "WHERE collection = ? AND id = ? AND segment_id = ?",
+                        [
+                            (segment_id, position, collection_name, id, old_segment_id)
+                            for position, (id, old_segment_id, _) in enumerate(rows)
+                        ],
+                    ).rowcount
+                    self._conn.executemany(
+                        "DELETE FROM segment WHERE collection = ? AND id = ?",
+                        [(collection_name, old_id) for old_id in segments],
+                    )
+                    if rows:
+                        self._conn.execute(
+                            "INSERT INTO segment (collection, id, size, deleted) "
+                            "VALUES (?, ?, ?, ?)",
+                            (collection_name, segment_id, len(rows), len(rows) - moved),
+                        )
+            except Exception as e:
+                log.warning(f"Skipped compaction of {collection_name}: {e}")
+                if rows:
+                    self._remove_file(path)
+                return
+
+            loaded = self._segments.setdefault(collection_name, {})
+            for old_segment_id in segments:
+                loaded.pop(old_segment_id, None)
+            if rows:
+                loaded[segment_id] = index
+
+        for old_segment_id in segments:
+            self._remove_file(self._segment_file(collection_name, old_segment_id))
+        log.debug(
+            f"Compacted {len(segments)} segments of {collection_name} "
+            f"into one with {len(rows)} vectors"
+        )
+
+    ####################################
+    # VectorDBBase
+    ####################################
+
+    def has_collection(self, collection_name: str) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM collection WHERE name = ?", (collection_name,)
+                ).fetchone()
+                is not None
+            )
+
+    def delete_collection(self, collection_name: str):
+        with self._lock:
+            with self._conn:
+                for table, column in (
+                    ("item", "collection"),
+                    ("segment", "collection"),
+                    ("collection", "name"),
+                ):
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE {column} = ?", (collection_name,)
+                    )
+            self._segments.pop(collection_name, None)
+            shutil.rmtree(self._collection_dir(collection_name), ignore_errors=True)
+
+    def insert(self, collection_name: str, items: List[VectorItem]):
+        self._write(collection_name, items)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]):
+        self._write(collection_name, items)
+
+    def search(
+        self, collection_name: str, vectors: List[List[float | int]], limit: int
+    ) -> Optional[SearchResult]:
+        if not vectors:
+            return None
+
+        segments = self._load_segments(collection_name)
+        if not segments:
+            return None
+
+        queries = _normalize(vectors)
+        if limit is None or limit <= 0:
+            limit = sum(index.ntotal for index, _ in segments.values())
+
+        candidates = [[] for _ in range(len(queries))]
+        for segment_id, (index, deleted) in segments.items():
+            if index.d != queries.shape[1]:
+                raise ValueError(
+                    f"Collection {collection_name} holds {index.d}-dimensional "
+                    f"vectors, got {queries.shape[1]}"
+                )
+            # Over-fetch to make up for deleted vectors still in the segment
+            k = min(index.ntotal, limit + deleted)
+            if k <= 0:
+                continue
+            scores, positions = index.search(
+                queries,
+                k,
+                params=faiss.SearchParametersHNSW(
+                    efSearch=max(LOCAL_VECTOR_DB_HNSW_EF_SEARCH, k)
+                ),
+            )
+            for qid in range(len(queries)):
+                candidates[qid].extend(
+                    (float(score), segment_id, int(position))
+                    for score, position in zip(scores[qid], positions[qid])
+                    if position >= 0
+                )
+
+        items = self._get_items(
+            collection_name,
+            {
+                (segment_id, position)
+                for row in candidates
+                for _, segment_id, position in row
+            },
+        )
+
+        ids, distances, documents, metadatas = [], [], [], []
+        for row in candidates:
+            row.sort(key=lambda candidate: candidate[0], reverse=True)
+            hits = [
+                (score, items[(segment_id, position)])
+                for score, segment_id, position in row
+                if (segment_id, position) in items
+            ][:limit]
+
+            ids.append([item[0] for _, item in hits])
+            # cosine similarity is [-1, 1], normalize to [0, 1]
+            distances.append([(score + 1.0) / 2.0 for score, _ in hits])
+            documents.append([item[1] for _, item in hits])
+            metadatas.append([item[2] for _, item in hits])
+
+        return SearchResult(
+            ids=ids, distances=distances, documents=documents, metadatas=metadatas
+        )
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not self.has_collection(collection_name):
+            return None
+
+        clause, params = self._filter_clause(filter)
+        sql = f"SELECT id, text, metadata FROM item WHERE collection = ? AND {clause} ORDER BY rowid"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            rows = self._conn.execute(sql, [collection_name, *params]).fetchall()
+
+        return GetResult(
+            ids=[[row[0] for row in rows]],
+            documents=[[row[1] for row in rows]],
+            metadatas=[[json.loads(row[2]) for row in rows]],
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self.query(collection_name, filter={})
+
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        segments = self._load_segments(collection_name)
+        if not segments:
+            return {}
+
+        with self._lock:
+            rows = []
+            for batch in _batches(ids):
+                rows.extend(
+                    self._conn.execute(
+                        "SELECT id, segment_id, position FROM item WHERE collection = ? "
+                        f"AND id IN ({','.join('?' * len(batch))})",
+                        [collection_name, *batch],
+                    )
+                )
+
+        return {
+            id: segments[segment_id][0].reconstruct(position).tolist()
+            for id, segment_id, position in rows
+            if segment_id in segments
+        }
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ):
+        with self._lock:
+            with self._conn:
+                if ids:
+                    self._delete_ids(collection_name, [str(id) for id in ids])
+                elif filter:
+                    clause, params = self._filter_clause(filter)
+                    self._delete_where(collection_name, clause, params)
+        self._maybe_compact(collection_name)
+
+    def reset(self):
+        with self._lock:
+            with self._conn:
+                for table in ("item", "segment", "collection"):
+                    self._conn.execute(f"DELETE FROM {table}")
+            self._segments.clear()
+            shutil.rmtree(self.segment_path, ignore_errors=True)
+            os.makedirs(self.segment_path, exist_ok=True)
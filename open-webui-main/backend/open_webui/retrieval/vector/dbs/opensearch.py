@@ -118,28 +118,54 @@ class OpenSearchClient(VectorDBBase):
             if not self.has_collection(collection_name):
                 return None
 
-            query = {
-                "size": limit,
-                "_source": ["text", "metadata"],
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
+            searches = []
+            for vector in vectors:
+                searches.append({})
+                searches.append(
+                    {
+                        "size": limit,
+                        "_source": ["text", "metadata"],
+                        "query": {
+                            "script_score": {
+                                "query": {"match_all": {}},
+                                "script": {
+                                    "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                                    "params": {
+                                        "field": "vector",
+                                        "query_value": vector,
+                                    },
+                                },
+                            }
                         },
                     }
-                },
-            }
+                )
 
-            result = self.client.search(
-                index=self._get_index_name(collection_name), body=query
+            # One request for all query vectors
+            result = self.client.msearch(
+                index=self._get_index_name(collection_name), body=searches
             )
 
-            return self._result_to_search_result(result)
+            ids, distances, documents, metadatas = [], [], [], []
+            for response in result["responses"]:
+                search_result = (
+                    self._result_to_search_result(response)
+                    if "error" not in response
+                    else None
+                )
+                if search_result is None:
+                    ids.append([])
+                    distances.append([])
+                    documents.append([])
+                    metadatas.append([])
+                    continue
+                ids.extend(search_result.ids)
+                distances.extend(search_result.distances)
+                documents.extend(search_result.documents)
+                metadatas.extend(search_result.metadatas)
+
+            return SearchResult(
+                ids=ids, distances=distances, documents=documents, metadatas=metadatas
+            )
 
         except Exception as e:
             return None
@@ -186,6 +212,22 @@ class OpenSearchClient(VectorDBBase):
         )
         return self._result_to_get_result(result)
 
+    def get_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> dict[str, list[float]]:
+        if not self.has_collection(collection_name):
+            return {}
+
+        query = {"query": {"ids": {"values": ids}}, "_source": ["vector"]}
+        result = self.client.search(
+            index=self._get_index_name(collection_name), body=query, size=len(ids)
+        )
+        return {
+            hit["_id"]: hit["_source"]["vector"]
+            for hit in result["hits"]["hits"]
+            if hit["_source"].get("vector")
+        }
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
             collection_name=collection_name, dimension=len(items[0]["vector"])
@@ -1,6 +1,11 @@
 from typing import Optional, List, Dict, Any
+import hashlib
 import logging
 import json
+import math
+import re
+import threading
+import time
 from sqlalchemy import (
     func,
     literal,
@@ -41,7 +46,17 @@ from open_webui.config import (
     PGVECTOR_POOL_MAX_OVERFLOW,
     PGVECTOR_POOL_TIMEOUT,
     PGVECTOR_POOL_RECYCLE,
+    PGVECTOR_INDEX_METHOD,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_EF_SEARCH,
+    PGVECTOR_HNSW_ITERATIVE_SCAN,
+    PGVECTOR_IVFFLAT_LISTS,
+    PGVECTOR_IVFFLAT_PROBES,
+    PGVECTOR_EXACT_SEARCH_MAX_ROWS,
+    PGVECTOR_COLLECTION_INDEX_MIN_ROWS,
 )
+from open_webui.utils.executors import get_executor
 
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -51,6 +66,14 @@ Base = declarative_base()
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+VECTOR_INDEX_NAME = "idx_document_chunk_vector"
+# Partial indexes of large collections, suffixed with a hash of the collection name
+COLLECTION_INDEX_PREFIX = "idx_document_chunk_vector_c_"
+# Collection sizes used to plan searches are re-counted after this many seconds
+COLLECTION_SIZE_TTL = 60
+# pgvector caps hnsw.ef_search at 1000
+MAX_EF_SEARCH = 1000
+
 
 def pgcrypto_encrypt(val, key):
     return func.pgp_sym_encrypt(val, literal(key))
@@ -107,9 +130,33 @@ class PgvectorClient(VectorDBBase):
             )
             self.session = scoped_session(SessionLocal)
 
+        # Online index builds run outside of a transaction, on their own connection
+        self.engine = self.session.get_bind()
+
+        # collection -> (row count capped above the largest threshold, counted at)
+        self._collection_sizes: Dict[str, tuple] = {}
+        self._sizes_lock = threading.Lock()
+        # Index builds started by this worker, keyed by index name
+        self._index_builds: Dict[str, Dict[str, Any]] = {}
+        self._builds_lock = threading.Lock()
+
         try:
+            if PGVECTOR_INDEX_METHOD not in ("hnsw", "ivfflat"):
+                raise ValueError(
+                    f"Unsupported PGVECTOR_INDEX_METHOD '{PGVECTOR_INDEX_METHOD}', "
+                    "expected 'hnsw' or 'ivfflat'."
+                )
+
             # Ensure the pgvector extension is available
             self.session.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
+            version = self.session.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar()
+            self.pgvector_version = version
+            # Iterative index scans keep filtered ANN searches from coming up short
+            version = tuple(int(part) for part in re.findall(r"\d+", version or ""))
+            supported = version[:2] >= (0, 8)
+            self.iterative_scan = supported and PGVECTOR_HNSW_ITERATIVE_SCAN != "off"
 
             if PGVECTOR_PGCRYPTO:
                 # Ensure the pgcrypto extension is available for encryption
@@ -129,13 +176,18 @@ class PgvectorClient(VectorDBBase):
             connection = self.session.connection()
             Base.metadata.create_all(bind=connection)
 
-            # Create an index on the vector column if it doesn't exist
-            self.session.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
-                    "ON document_chunk USING ivfflat (vector vector_cosine_ops) WITH (lists = 100);"
+            # Create an index on the vector column if it doesn't exist. An index
+            # built with another method is kept until rebuilt, as rebuilding a
+            # large table at startup would block every worker.
+            method = self._get_index_method(VECTOR_INDEX_NAME)
+            if method is None:
+                self.session.execute(text(self._vector_index_sql(VECTOR_INDEX_NAME)))
+            elif method != PGVECTOR_INDEX_METHOD:
+                log.warning(
+                    f"{VECTOR_INDEX_NAME} uses {method} but PGVECTOR_INDEX_METHOD is "
+                    f"{PGVECTOR_INDEX_METHOD}, rebuild it through "
+                    "POST /api/v1/retrieval/vector/index/rebuild"
                 )
-            )
             self.session.execute(
                 text(
                     "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
@@ -184,6 +236,301 @@ class PgvectorClient(VectorDBBase):
                 "The 'vector' column does not exist in the 'document_chunk' table."
             )
 
+    ####################################
+    # Index management
+    ####################################
+
+    @staticmethod
+    def _collection_index_name(collection_name: str) -> str:
+        # Collection names are not valid identifiers and may exceed 63 characters
+        digest = hashlib.sha256(collection_name.encode()).hexdigest()[:16]
+        return f"{COLLECTION_INDEX_PREFIX}{digest}"
+
+    @staticmethod
+    def _collection_predicate(collection_name: str) -> str:
+        # DDL cannot take bound parameters, quote the name as a string literal
+        return "collection_name = '{}'".format(collection_name.replace("'", "''"))
+
+    def _vector_index_sql(
+        self,
+        name: str,
+        predicate: Optional[str] = None,
+        concurrently: bool = False,
+        rows: int = 0,
+    ) -> str:
+        if PGVECTOR_INDEX_METHOD == "hnsw":
+            options = (
+                f"m = {PGVECTOR_HNSW_M}, "
+                f"ef_construction = {PGVECTOR_HNSW_EF_CONSTRUCTION}"
+            )
+        else:
+            # pgvector recommends rows / 1000 lists up to 1M rows, sqrt(rows) above
+            lists = PGVECTOR_IVFFLAT_LISTS or max(
+                10, rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows))
+            )
+            options = f"lists = {lists}"
+
+        return (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+            f"{name} ON document_chunk USING {PGVECTOR_INDEX_METHOD} "
+            f"(vector vector_cosine_ops) WITH ({options})"
+            + (f" WHERE {predicate}" if predicate else "")
+        )
+
+    def _get_index_method(self, name: str) -> Optional[str]:
+        return self.session.execute(
+            text(
+                "SELECT am.amname FROM pg_class c "
+                "JOIN pg_am am ON am.oid = c.relam WHERE c.relname = :name"
+            ),
+            {"name": name},
+        ).scalar()
+
+    def _is_index_valid(self, connection, name: str) -> Optional[bool]:
+        """None if the index does not exist, False if a concurrent build of it failed."""
+        return connection.execute(
+            text(
+                "SELECT i.indisvalid FROM pg_class c "
+                "JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"
+            ),
+            {"name": name},
+        ).scalar()
+
+    def _is_index_building(self, connection, name: str) -> bool:
+        # Concurrent builds report the index being created from PostgreSQL 12
+        return (
+            connection.execute(
+                text(
+                    "SELECT 1 FROM pg_stat_progress_create_index p "
+                    "JOIN pg_class c ON c.oid = p.index_relid WHERE c.relname = :name"
+                ),
+                {"name": name},
+            ).scalar()
+            is not None
+        )
+
+    def _build_index(self, name: str, predicate: Optional[str] = None) -> bool:
+        """
+        Build (or rebuild) a vector index without blocking writes: the new index
+        is built concurrently under a temporary name, then swapped in. Returns
+        False without building when another worker is already building it.
+        """
+        tmp_name = f"{name}_new"
+        started = time.time()
+
+        with self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            # One build per index across all workers. The lock is held by this
+            # session, so it is also released if the worker dies mid-build.
+            if not connection.execute(
+                text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": name}
+            ).scalar():
+                log.info(f"Vector index {name} is being built by another worker")
+                return False
+
+            try:
+                if self._is_index_valid(connection, tmp_name) is not None:
+                    if self._is_index_building(connection, tmp_name):
+                        log.info(f"Vector index {tmp_name} is still being built")
+                        return False
+                    # Left over from an interrupted build
+                    connection.execute(
+                        text(f"DROP INDEX CONCURRENTLY IF EXISTS {tmp_name}")
+                    )
+
+                rows = 0
+                if PGVECTOR_INDEX_METHOD == "ivfflat" and not PGVECTOR_IVFFLAT_LISTS:
+                    rows = connection.execute(
+                        text(
+                            "SELECT count(*) FROM document_chunk"
+                            + (f" WHERE {predicate}" if predicate else "")
+                        )
+                    ).scalar()
+                connection.execute(
+                    text(self._vector_index_sql(tmp_name, predicate, True, rows))
+                )
+
+                with self.engine.begin() as swap:
+                    # The swap briefly locks the table, give up rather than queue
+                    # writes behind it
+                    swap.execute(text("SET LOCAL lock_timeout = '10s'"))
+                    swap.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                    swap.execute(text(f"ALTER INDEX {tmp_name} RENAME TO {name}"))
+            finally:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": name}
+                )
+
+        log.info(f"Built vector index {name} in {time.time() - started:.1f}s")
+        return True
+
+    def _run_index_build(self, name: str, predicate: Optional[str] = None):
+        try:
+            if self._build_index(name, predicate):
+                status = {"status": "done", "error": None}
+            else:
+                status = {"status": "skipped", "error": None}
+        except Exception as e:
+            log.exception(f"Error building vector index {name}: {e}")
+            status = {"status": "failed", "error": str(e)}
+        with self._builds_lock:
+            self._index_builds[name].update(status, finished_at=int(time.time()))
+
+    def rebuild_index(self, collection_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start an online build of the shared vector index, or of the partial
+        index of `collection_name`, with the configured method and parameters.
+        Builds run one at a time in the background; returns the build status.
+        Never waits: when the build queue is full the build is rejected, and a
+        build already running in another worker is skipped.
+        """
+        if collection_name:
+            name = self._collection_index_name(collection_name)
+            predicate = self._collection_predicate(collection_name)
+        else:
+            name, predicate = VECTOR_INDEX_NAME, None
+
+        with self._builds_lock:
+            build = self._index_builds.get(name)
+            if build and build["status"] in ("queued", "running"):
+                return dict(build)
+            build = {
+                "index": name,
+                "collection_name": collection_name,
+                "status": "queued",
+                "error": None,
+                "started_at": int(time.time()),
+                "finished_at": None,
+            }
+            self._index_builds[name] = build
+
+        def run():
+            with self._builds_lock:
+                build["status"] = "running"
+            self._run_index_build(name, predicate)
+
+        if get_executor("vector_index").try_submit(run) is None:
+            with self._builds_lock:
+                build.update(
+                    status="rejected",
+                    error="Index build queue is full, try again later",
+                    finished_at=int(time.time()),
+                )
+                # Retried by the next insert or rebuild request
+                if self._index_builds.get(name) is build:
+                    del self._index_builds[name]
+        return dict(build)
+
+    def _maybe_index_collection(self, collection_name: str) -> None:
+        # Large collections get a partial index: a global ANN scan filtered to
+        # one collection is slow and can miss most of its rows
+        if not PGVECTOR_COLLECTION_INDEX_MIN_ROWS:
+            return
+        if self._collection_size(collection_name) < PGVECTOR_COLLECTION_INDEX_MIN_ROWS:
+            return
+
+        name = self._collection_index_name(collection_name)
+        with self._builds_lock:
+            if name in self._index_builds:
+                return
+        if self._get_index_method(name) is None:
+            log.info(f"Creating vector index for collection '{collection_name}'")
+            self.rebuild_index(collection_name)
+
+    def get_index_status(self) -> Dict[str, Any]:
+        indexes = self.session.execute(
+            text(
+                "SELECT c.relname AS name, am.amname AS method, i.indisvalid AS valid, "
+                "pg_relation_size(c.oid) AS size, "
+                "pg_get_expr(i.indpred, i.indrelid) AS predicate "
+                "FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid "
+                "JOIN pg_am am ON am.oid = c.relam "
+                "WHERE i.indrelid = 'document_chunk'::regclass "
+                "AND am.amname IN ('hnsw', 'ivfflat') ORDER BY c.relname"
+            )
+        ).all()
+        self.session.commit()
+
+        with self._builds_lock:
+            builds = [dict(build) for build in self._index_builds.values()]
+
+        return {
+            "pgvector_version": self.pgvector_version,
+            "method": PGVECTOR_INDEX_METHOD,
+            "hnsw": {
+                "m": PGVECTOR_HNSW_M,
+                "ef_construction": PGVECTOR_HNSW_EF_CONSTRUCTION,
+                "ef_search": PGVECTOR_HNSW_EF_SEARCH,
+            },
+            "ivfflat": {
+                "lists": PGVECTOR_IVFFLAT_LISTS,
+                "probes": PGVECTOR_IVFFLAT_PROBES,
+            },
+            "iterative_scan": (
+                PGVECTOR_HNSW_ITERATIVE_SCAN if self.iterative_scan else "off"
+            ),
+            "exact_search_max_rows": PGVECTOR_EXACT_SEARCH_MAX_ROWS,
+            "collection_index_min_rows": PGVECTOR_COLLECTION_INDEX_MIN_ROWS,
+            "indexes": [dict(row._mapping) for row in indexes],
+            "builds": builds,
+        }
+
+    ####################################
+    # Search planning
+    ####################################
+
+    def _collection_size(self, collection_name: str) -> int:
+        """Row count of a collection, only counted up to the largest threshold."""
+        now = time.monotonic()
+        with self._sizes_lock:
+            cached = self._collection_sizes.get(collection_name)
+        if cached is not None and now - cached[1] < COLLECTION_SIZE_TTL:
+            return cached[0]
+
+        cap = (
+            max(PGVECTOR_EXACT_SEARCH_MAX_ROWS, PGVECTOR_COLLECTION_INDEX_MIN_ROWS) + 1
+        )
+        rows = (
+            select(literal(1))
+            .where(DocumentChunk.collection_name == collection_name)
+            .limit(cap)
+            .subquery()
+        )
+        size = self.session.execute(select(func.count()).select_from(rows)).scalar()
+
+        with self._sizes_lock:
+            self._collection_sizes[collection_name] = (size, now)
+        return size
+
+    def _forget_collection_size(self, collection_name: str) -> None:
+        with self._sizes_lock:
+            self._collection_sizes.pop(collection_name, None)
+
+    def _apply_search_settings(self, collection_name: str, limit: Optional[int]):
+        """Transaction-local planner and index settings for one search."""
+        settings = {}
+        if self._collection_size(collection_name) <= PGVECTOR_EXACT_SEARCH_MAX_ROWS:
+            # Scanning a small collection's rows through the collection_name
+            # index is exact and cheaper than walking the shared ANN index
+            settings["enable_indexscan"] = "off"
+        else:
+            settings["hnsw.ef_search"] = str(
+                min(MAX_EF_SEARCH, max(PGVECTOR_HNSW_EF_SEARCH, limit or 0))
+            )
+            settings["ivfflat.probes"] = str(PGVECTOR_IVFFLAT_PROBES)
+            if self.iterative_scan:
+                settings["hnsw.iterative_scan"] = PGVECTOR_HNSW_ITERATIVE_SCAN
+                # ivfflat only supports relaxed ordering
+                settings["ivfflat.iterative_scan"] = "relaxed_order"
+
+        for name, value in settings.items():
+            self.session.execute(
+                text("SELECT set_config(:name, :value, true)"),
+                {"name": name, "value": value},
+            )
+
     def adjust_vector_length(self, vector: List[float]) -> List[float]:
         # Adjust vector to have length VECTOR_LENGTH
         current_length = len(vector)
@@ -248,6 +595,9 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during insert: {e}")
             raise
 
+        self._forget_collection_size(collection_name)
+        self._maybe_index_collection(collection_name)
+
     def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
             if PGVECTOR_PGCRYPTO:
@@ -314,6 +664,9 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during upsert: {e}")
             raise
 
+        self._forget_collection_size(collection_name)
+        self._maybe_index_collection(collection_name)
+
     def search(
         self,
         collection_name: str,
@@ -391,8 +744,11 @@ class PgvectorClient(VectorDBBase):
                 .order_by(query_vectors.c.qid, subq.c.distance)
             )
 
+            self._apply_search_settings(collection_name, limit)
             result_proxy = self.session.execute(stmt)
             results = result_proxy.all()
+            # Ends the transaction, resetting the settings above
+            self.session.commit()
 
             ids = [[] for _ in range(num_queries)]
             distances = [[] for _ in range(num_queries)]
@@ -420,6 +776,7 @@ class PgvectorClient(VectorDBBase):
                 ids=ids, distances=distances, documents=documents, metadatas=metadatas
             )
         except Exception as e:
+            self.session.rollback()
             log.exception(f"Error during search: {e}")
             return None
 
@@ -523,6 +880,24 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during get: {e}")
             return None
 
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        try:
+            stmt = select(DocumentChunk.id, DocumentChunk.vector).where(
+                DocumentChunk.collection_name == collection_name,
+                DocumentChunk.id.in_(ids),
+            )
+            results = self.session.execute(stmt).all()
+            # Vectors are zero padded to VECTOR_LENGTH
+            return {
+                row.id: list(row.vector) for row in results if row.vector is not None
+            }
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during get_vectors: {e}")
+            return {}
+
     def delete(
         self,
         collection_name: str,
@@ -594,4 +969,19 @@ class PgvectorClient(VectorDBBase):
 
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
+        self._forget_collection_size(collection_name)
+
+        name = self._collection_index_name(collection_name)
+        try:
+            if self._get_index_method(name) is not None:
+                with self.engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT"
+                ) as connection:
+                    connection.execute(
+                        text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                    )
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            log.warning(f"Error dropping vector index {name}: {e}")
         log.info(f"Collection '{collection_name}' deleted.")
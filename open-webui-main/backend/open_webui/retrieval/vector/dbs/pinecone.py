@@ -406,42 +406,41 @@ class PineconeClient(VectorDBBase):
             limit = NO_LIMIT
 
         try:
-            # Search using the first vector (assuming this is the intended behavior)
-            query_vector = vectors[0]
-
-            # Perform the search
-            query_response = self.index.query(
-                vector=query_vector,
-                top_k=limit,
-                include_metadata=True,
-                filter={"collection_name": collection_name_with_prefix},
+            # Pinecone queries take a single vector, run them concurrently
+            query_responses = list(
+                self._executor.map(
+                    lambda query_vector: self.index.query(
+                        vector=query_vector,
+                        top_k=limit,
+                        include_metadata=True,
+                        filter={"collection_name": collection_name_with_prefix},
+                    ),
+                    vectors,
+                )
             )
 
-            matches = getattr(query_response, "matches", []) or []
-            if not matches:
-                # Return empty result if no matches
-                return SearchResult(
-                    ids=[[]],
-                    documents=[[]],
-                    metadatas=[[]],
-                    distances=[[]],
+            ids, documents, metadatas, distances = [], [], [], []
+            for query_response in query_responses:
+                matches = getattr(query_response, "matches", []) or []
+
+                # Convert to GetResult format
+                get_result = self._result_to_get_result(matches)
+                ids.extend(get_result.ids)
+                documents.extend(get_result.documents)
+                metadatas.extend(get_result.metadatas)
+
+                # Calculate normalized distances based on metric
+                distances.append(
+                    [
+                        self._normalize_distance(getattr(match, "score", 0.0))
+                        for match in matches
+                    ]
                 )
 
-            # Convert to GetResult format
-            get_result = self._result_to_get_result(matches)
-
-            # Calculate normalized distances based on metric
-            distances = [
-                [
-                    self._normalize_distance(getattr(match, "score", 0.0))
-                    for match in matches
-                ]
-            ]
-
             return SearchResult(
-                ids=get_result.ids,
-                documents=get_result.documents,
-                metadatas=get_result.metadatas,
+                ids=ids,
+                documents=documents,
+                metadatas=metadatas,
                 distances=distances,
             )
         except Exception as e:
@@ -508,6 +507,28 @@ class PineconeClient(VectorDBBase):
             log.error(f"Error getting collection '{collection_name}': {e}")
             return None
 
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        """Fetch the stored vectors of the given ids."""
+        collection_name_with_prefix = self._get_collection_name_with_prefix(
+            collection_name
+        )
+
+        try:
+            response = self.index.fetch(ids=ids)
+            vectors = getattr(response, "vectors", {}) or {}
+            return {
+                id: list(vector.values)
+                for id, vector in vectors.items()
+                if vector.values
+                and (vector.metadata or {}).get("collection_name")
+                == collection_name_with_prefix
+            }
+        except Exception as e:
+            log.error(f"Error fetching vectors from '{collection_name}': {e}")
+            return {}
+
     def delete(
         self,
         collection_name: str,
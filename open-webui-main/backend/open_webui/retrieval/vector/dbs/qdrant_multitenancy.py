@@ -90,6 +90,18 @@ class QdrantClient(VectorDBBase):
             metadatas.append(payload["metadata"])
         return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
 
+    def _responses_to_search_result(self, responses) -> SearchResult:
+        ids, documents, metadatas, distances = [], [], [], []
+        for response in responses:
+            get_result = self._result_to_get_result(response.points)
+            ids.extend(get_result.ids)
+            documents.extend(get_result.documents)
+            metadatas.extend(get_result.metadatas)
+            distances.append([(point.score + 1.0) / 2.0 for point in response.points])
+        return SearchResult(
+            ids=ids, documents=documents, metadatas=metadatas, distances=distances
+        )
+
     def _get_collection_and_tenant_id(self, collection_name: str) -> Tuple[str, str]:
         """
         Maps the traditional collection name to multi-tenant collection and tenant ID.
@@ -247,19 +259,19 @@ class QdrantClient(VectorDBBase):
             return None
 
         tenant_filter = _tenant_filter(tenant_id)
-        query_response = self.client.query_points(
+        responses = self.client.query_batch_points(
             collection_name=mt_collection,
-            query=vectors[0],
-            limit=limit,
-            query_filter=models.Filter(must=[tenant_filter]),
-        )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            requests=[
+                models.QueryRequest(
+                    query=vector,
+                    limit=limit,
+                    filter=models.Filter(must=[tenant_filter]),
+                    with_payload=True,
+                )
+                for vector in vectors
+            ],
         )
+        return self._responses_to_search_result(responses)
 
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
@@ -303,6 +315,29 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points.points)
 
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        """
+        Get the stored vectors of points by id with tenant isolation.
+        """
+        if not self.client:
+            return {}
+        mt_collection, tenant_id = self._get_collection_and_tenant_id(collection_name)
+        if not self.client.collection_exists(collection_name=mt_collection):
+            return {}
+        points = self.client.retrieve(
+            collection_name=mt_collection,
+            ids=ids,
+            with_payload=[TENANT_ID_FIELD],
+            with_vectors=True,
+        )
+        return {
+            str(point.id): point.vector
+            for point in points
+            if point.vector and (point.payload or {}).get(TENANT_ID_FIELD) == tenant_id
+        }
+
     def upsert(self, collection_name: str, items: List[VectorItem]):
         """
         Upsert items with tenant ID.
@@ -48,6 +48,10 @@ class Vector:
                 from open_webui.retrieval.vector.dbs.chroma import ChromaClient
 
                 return ChromaClient()
+            case VectorType.LOCAL:
+                from open_webui.retrieval.vector.dbs.local import LocalClient
+
+                return LocalClient()
             case _:
                 raise ValueError(f"Unsupported vector type: {vector_type}")
 
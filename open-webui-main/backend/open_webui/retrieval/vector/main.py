@@ -55,7 +55,10 @@ class VectorDBBase(ABC):
     def search(
         self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
     ) -> Optional[SearchResult]:
-        """Search for similar vectors in a collection."""
+        """
+        Search for similar vectors in a collection. Every query vector gets its
+        own row in the result, in the order given.
+        """
         pass
 
     @abstractmethod
@@ -70,6 +73,15 @@ class VectorDBBase(ABC):
         """Retrieve all vectors from a collection."""
         pass
 
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        """
+        Return the stored vectors of the given ids, ids that are not found are
+        left out. Backends that cannot return vectors return an empty dict.
+        """
+        return {}
+
     @abstractmethod
     def delete(
         self,
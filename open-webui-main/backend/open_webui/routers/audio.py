@@ -7,7 +7,6 @@ from functools import lru_cache
 from pathlib import Path
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
-from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from fnmatch import fnmatch
@@ -34,6 +33,7 @@ from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.executors import get_executor
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
@@ -826,21 +826,21 @@ def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None
 
     results = []
     try:
-        with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
-            for future in futures:
-                try:
-                    results.append(future.result())
-                except Exception as transcribe_exc:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Error transcribing chunk: {transcribe_exc}",
-                    )
+        executor = get_executor("audio")
+        # Submit tasks for each chunk_path
+        futures = [
+            executor.submit(transcription_handler, request, chunk_path, metadata)
+            for chunk_path in chunk_paths
+        ]
+        # Gather results as they complete
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as transcribe_exc:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error transcribing chunk: {transcribe_exc}",
+                )
     finally:
         # Clean up only the temporary chunks, never the original file
         for chunk_path in chunk_paths:
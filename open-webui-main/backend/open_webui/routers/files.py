@@ -22,6 +22,8 @@ from fastapi.responses import FileResponse, StreamingResponse
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import bm25_index_drop, bm25_index_reset
+from open_webui.retrieval.collection_cache import COLLECTION_CACHE
 
 from open_webui.models.users import Users
 from open_webui.models.files import (
@@ -288,6 +290,8 @@ async def delete_all_files(user=Depends(get_admin_user)):
         try:
             Storage.delete_all_files()
             VECTOR_DB_CLIENT.reset()
+            bm25_index_reset()
+            COLLECTION_CACHE.clear()
         except Exception as e:
             log.exception(e)
             log.error("Error deleting files")
@@ -611,6 +615,8 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
             try:
                 Storage.delete_file(file.path)
                 VECTOR_DB_CLIENT.delete(collection_name=f"file-{id}")
+                bm25_index_drop(f"file-{id}")
+                COLLECTION_CACHE.delete(f"file-{id}")
             except Exception as e:
                 log.exception(e)
                 log.error("Error deleting files")
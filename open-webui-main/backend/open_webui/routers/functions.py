@@ -17,6 +17,7 @@ from open_webui.utils.plugin import (
     replace_imports,
     get_function_module_from_cache,
 )
+from open_webui.utils.models import invalidate_models
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -139,7 +140,9 @@ class SyncFunctionsForm(FunctionForm):
 async def sync_functions(
     request: Request, form_data: SyncFunctionsForm, user=Depends(get_admin_user)
 ):
-    return Functions.sync_functions(user.id, form_data.functions)
+    functions = Functions.sync_functions(user.id, form_data.functions)
+    invalidate_models()
+    return functions
 
 
 ############################
@@ -178,6 +181,7 @@ async def create_new_function(
             function_cache_dir.mkdir(parents=True, exist_ok=True)
 
             if function:
+                invalidate_models()
                 return function
             else:
                 raise HTTPException(
@@ -229,6 +233,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            invalidate_models()
             return function
         else:
             raise HTTPException(
@@ -256,6 +261,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            invalidate_models()
             return function
         else:
             raise HTTPException(
@@ -294,6 +300,7 @@ async def update_function_by_id(
         function = Functions.update_function_by_id(id, updated)
 
         if function:
+            invalidate_models()
             return function
         else:
             raise HTTPException(
@@ -323,6 +330,7 @@ async def delete_function_by_id(
         FUNCTIONS = request.app.state.FUNCTIONS
         if id in FUNCTIONS:
             del FUNCTIONS[id]
+        invalidate_models()
 
     return result
 
@@ -399,6 +407,8 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                # Pipes may expose different models depending on their valves
+                invalidate_models()
                 return valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function values by id {id}: {e}")
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 import logging
 
 from open_webui.models.knowledge import (
@@ -11,6 +11,8 @@ from open_webui.models.knowledge import (
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import bm25_index_delete, bm25_index_drop
+from open_webui.retrieval.collection_cache import COLLECTION_CACHE
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -38,43 +40,61 @@ router = APIRouter()
 ############################
 
 
-@router.get("/", response_model=list[KnowledgeUserResponse])
-async def get_knowledge(user=Depends(get_verified_user)):
-    knowledge_bases = []
-
-    if user.role == "admin":
-        knowledge_bases = Knowledges.get_knowledge_bases()
-    else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "read")
+def remove_missing_knowledge_files(missing_file_ids: dict[str, set[str]]):
+    """Drop ids of deleted files from the knowledge bases that still list them."""
+    for id, file_ids in missing_file_ids.items():
+        try:
+            knowledge = Knowledges.get_knowledge_by_id(id=id)
+            if not knowledge or not knowledge.data:
+                continue
+
+            data = knowledge.data
+            data["file_ids"] = [
+                file_id
+                for file_id in data.get("file_ids", [])
+                if file_id not in file_ids
+            ]
+            Knowledges.update_knowledge_data_by_id(id=id, data=data)
+        except Exception as e:
+            log.exception(f"Error removing missing files from knowledge {id}: {e}")
+
+
+def get_knowledge_with_files(
+    knowledge_bases: list, background_tasks: BackgroundTasks
+) -> list[KnowledgeUserResponse]:
+    # File metadata of every listed knowledge base in one query
+    files_by_id = {
+        file.id: file
+        for file in Files.get_file_metadatas_by_ids(
+            list(
+                {
+                    file_id
+                    for knowledge_base in knowledge_bases
+                    if knowledge_base.data
+                    for file_id in knowledge_base.data.get("file_ids", [])
+                }
+            )
+        )
+    }
 
-    # Get files for each knowledge base
     knowledge_with_files = []
+    missing_file_ids = {}
     for knowledge_base in knowledge_bases:
         files = []
         if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
-            )
-
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
-                )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
-
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
-
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
-
-                    files = Files.get_file_metadatas_by_ids(file_ids)
+            file_ids = knowledge_base.data.get("file_ids", [])
+            files = [
+                files_by_id[file_id] for file_id in file_ids if file_id in files_by_id
+            ]
+            files.sort(key=lambda file: file.updated_at, reverse=True)
+
+            # Files deleted since they were added are cleaned up after responding
+            missing = set(file_ids) - set(files_by_id)
+            if missing:
+                missing_file_ids[knowledge_base.id] = missing
+                knowledge_base.data["file_ids"] = [
+                    file_id for file_id in file_ids if file_id not in missing
+                ]
 
         knowledge_with_files.append(
             KnowledgeUserResponse(
@@ -83,54 +103,44 @@ async def get_knowledge(user=Depends(get_verified_user)):
             )
         )
 
+    if missing_file_ids:
+        background_tasks.add_task(remove_missing_knowledge_files, missing_file_ids)
+
     return knowledge_with_files
 
 
-@router.get("/list", response_model=list[KnowledgeUserResponse])
-async def get_knowledge_list(user=Depends(get_verified_user)):
-    knowledge_bases = []
-
+@router.get("/", response_model=list[KnowledgeUserResponse])
+async def get_knowledge(
+    background_tasks: BackgroundTasks,
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     if user.role == "admin":
-        knowledge_bases = Knowledges.get_knowledge_bases()
+        knowledge_bases = Knowledges.get_knowledge_bases(skip=skip, limit=limit)
     else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "write")
-
-    # Get files for each knowledge base
-    knowledge_with_files = []
-    for knowledge_base in knowledge_bases:
-        files = []
-        if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
-            )
-
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
-                )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "read", skip=skip, limit=limit
+        )
 
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
+    return get_knowledge_with_files(knowledge_bases, background_tasks)
 
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
 
-                    files = Files.get_file_metadatas_by_ids(file_ids)
-
-        knowledge_with_files.append(
-            KnowledgeUserResponse(
-                **knowledge_base.model_dump(),
-                files=files,
-            )
+@router.get("/list", response_model=list[KnowledgeUserResponse])
+async def get_knowledge_list(
+    background_tasks: BackgroundTasks,
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
+    if user.role == "admin":
+        knowledge_bases = Knowledges.get_knowledge_bases(skip=skip, limit=limit)
+    else:
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "write", skip=skip, limit=limit
         )
-    return knowledge_with_files
+
+    return get_knowledge_with_files(knowledge_bases, background_tasks)
 
 
 ############################
@@ -203,6 +213,8 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=knowledge_base.id
                     )
+                    bm25_index_drop(knowledge_base.id)
+                    COLLECTION_CACHE.delete(knowledge_base.id)
             except Exception as e:
                 log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
                 continue  # Skip, don't raise
@@ -451,6 +463,8 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    bm25_index_delete(knowledge.id, filter={"file_id": form_data.file_id})
+    COLLECTION_CACHE.delete(knowledge.id)
 
     # Add content to the vector database
     try:
@@ -522,6 +536,8 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        bm25_index_delete(knowledge.id, filter={"file_id": form_data.file_id})
+        COLLECTION_CACHE.delete(knowledge.id)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -532,6 +548,8 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+            bm25_index_drop(file_collection)
+            COLLECTION_CACHE.delete(file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -630,6 +648,8 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        bm25_index_drop(id)
+        COLLECTION_CACHE.delete(id)
     except Exception as e:
         log.debug(e)
         pass
@@ -663,6 +683,8 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        bm25_index_drop(id)
+        COLLECTION_CACHE.delete(id)
     except Exception as e:
         log.debug(e)
         pass
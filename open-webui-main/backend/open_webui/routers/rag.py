@@ -1,18 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Dict, Annotated, Optional
+from typing import List, Dict, Annotated, Optional, Set
 import os
 import uuid
 import json
-import pickle
+import shutil
+import sqlite3
+import asyncio
+import threading
+import time
 from datetime import datetime
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.document_loaders import PyPDFLoader, TextLoader
-from langchain.vectorstores import FAISS
-from langchain.embeddings import HuggingFaceEmbeddings
-from open_webui.utils.auth import get_current_user
+from langchain.document_loaders import TextLoader
+from open_webui.retrieval.embedding_service import LangchainEmbeddings
+from open_webui.utils.auth import get_admin_user, get_current_user
+from open_webui.utils.executors import get_executor
+from open_webui.utils.rag_pdf import count_pdf_pages, iter_pdf_page_batches
+from open_webui.utils.rag_store import KnowledgeBaseStore, VectorStoreCache, open_store
 from open_webui.models.users import UserModel
+from open_webui.socket.main import get_event_emitter
 
 router = APIRouter()
 
@@ -20,6 +28,15 @@ router = APIRouter()
 STORAGE_DIR = "rag_storage"
 METADATA_FILE = "metadata.json"
 VECTOR_DIR = "vectors"
+# 导入任务状态保存在 SQLite 中，多个 uvicorn worker 共享，轮询落到任意 worker 都能查到
+JOB_DB_FILE = "ingestion_jobs.sqlite"
+
+# 内存中最多同时保留的知识库向量存储数量，超出后按 LRU 淘汰
+VECTOR_STORE_CACHE_SIZE = int(os.environ.get("RAG_VECTOR_STORE_CACHE_SIZE", "32"))
+
+# 文档导入线程池大小，以及已结束任务记录的保留时间（秒）
+INGESTION_WORKERS = int(os.environ.get("RAG_INGESTION_WORKERS", "2"))
+INGESTION_JOB_TTL = int(os.environ.get("RAG_INGESTION_JOB_TTL", "3600"))
 
 # 确保存储目录存在
 os.makedirs(STORAGE_DIR, exist_ok=True)
@@ -27,7 +44,14 @@ os.makedirs(os.path.join(STORAGE_DIR, VECTOR_DIR), exist_ok=True)
 
 # 全局存储 - 实际生产环境建议使用数据库
 user_kbs: Dict[str, Dict[str, Dict]] = {}  # user_id -> kb_id -> kb_info
-vector_stores: Dict[str, FAISS] = {}  # vector_key -> FAISS实例
+ingestion_tasks: Set[asyncio.Task] = set()  # 持有后台任务引用，避免被回收
+
+# 元数据和向量存储创建在工作线程中也会被修改，需要加锁
+metadata_lock = threading.RLock()
+vector_store_create_lock = threading.Lock()
+
+# 文档导入使用全局共享的 file_processing 线程池（有界队列，满载时排队等待）
+ingestion_executor = get_executor("file_processing", INGESTION_WORKERS)
 
 # 初始化文本分割器
 text_splitter = RecursiveCharacterTextSplitter(
@@ -36,11 +60,11 @@ text_splitter = RecursiveCharacterTextSplitter(
     separators=["\n\n", "\n", "。", "，", " ", ""]
 )
 
-# 初始化嵌入模型
-embeddings = HuggingFaceEmbeddings(
+# 初始化嵌入模型：与核心检索（routers/retrieval.py get_ef）共享同一个模型实例，
+# 首次向量化时才加载，并发请求会合并成一次批量前向计算
+embeddings = LangchainEmbeddings(
     model_name="all-MiniLM-L6-v2",
-    model_kwargs={'device': 'cpu'},  # 确保设备一致性
-    encode_kwargs={'normalize_embeddings': True}  # 标准化嵌入向量
+    normalize=True  # 标准化嵌入向量
 )
 
 # 数据模型
@@ -56,8 +80,9 @@ class QueryRequest(BaseModel):
 def save_metadata():
     """保存知识库元数据到文件"""
     metadata_path = os.path.join(STORAGE_DIR, METADATA_FILE)
-    with open(metadata_path, 'w', encoding='utf-8') as f:
-        json.dump(user_kbs, f, ensure_ascii=False, indent=2, default=str)
+    with metadata_lock:
+        with open(metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(user_kbs, f, ensure_ascii=False, indent=2, default=str)
 
 def load_metadata():
     """从文件加载知识库元数据"""
@@ -76,46 +101,40 @@ def load_metadata():
             print(f"加载元数据失败: {e}")
     return {}
 
-def save_vector_store(vector_key: str, vector_store: FAISS):
-    """保存向量存储到文件"""
-    vector_path = os.path.join(STORAGE_DIR, VECTOR_DIR, f"{vector_key}.pkl")
+def get_vector_dir(vector_key: str) -> str:
+    """知识库向量存储目录（faiss 分段 + SQLite 分块存储）"""
+    return os.path.join(STORAGE_DIR, VECTOR_DIR, vector_key)
+
+def get_legacy_vector_path(vector_key: str) -> str:
+    """旧版整库 pickle 文件路径，仅用于迁移"""
+    return os.path.join(STORAGE_DIR, VECTOR_DIR, f"{vector_key}.pkl")
+
+def create_vector_store(vector_key: str) -> KnowledgeBaseStore:
+    """创建空的向量存储，分块在上传时追加写入磁盘"""
+    return KnowledgeBaseStore(get_vector_dir(vector_key), embeddings)
+
+def load_vector_store(vector_key: str) -> Optional[KnowledgeBaseStore]:
+    """从磁盘打开向量存储，旧版 pickle 文件会自动迁移为新格式"""
     try:
-        with open(vector_path, 'wb') as f:
-            pickle.dump(vector_store, f)
+        return open_store(
+            get_vector_dir(vector_key),
+            embeddings,
+            legacy_pickle_path=get_legacy_vector_path(vector_key),
+        )
     except Exception as e:
-        print(f"保存向量存储失败: {e}")
-
-def load_vector_store(vector_key: str) -> Optional[FAISS]:
-    """从文件加载向量存储"""
-    vector_path = os.path.join(STORAGE_DIR, VECTOR_DIR, f"{vector_key}.pkl")
-    if os.path.exists(vector_path):
-        try:
-            with open(vector_path, 'rb') as f:
-                return pickle.load(f)
-        except Exception as e:
-            print(f"加载向量存储失败: {e}")
+        print(f"加载向量存储失败: {e}")
     return None
 
+# 向量存储在首次访问时才加载，并由 LRU 缓存限制常驻数量
+vector_stores = VectorStoreCache(load_vector_store, max_size=VECTOR_STORE_CACHE_SIZE)
+
 # 启动时加载数据
 def initialize_storage():
-    """初始化存储，加载已保存的数据"""
-    global user_kbs, vector_stores
+    """初始化存储，只加载元数据，向量存储按需加载"""
+    global user_kbs
     
     # 加载元数据
     user_kbs = load_metadata()
-    
-    # 加载向量存储
-    for user_id, kbs in user_kbs.items():
-        for kb_id in kbs.keys():
-            vector_key = f"{user_id}_{kb_id}"
-            vector_store = load_vector_store(vector_key)
-            if vector_store:
-                vector_stores[vector_key] = vector_store
-                print(f"已加载向量存储: {vector_key}")
-            else:
-                # 如果没有保存的向量存储，设置为None（等待文档上传）
-                vector_stores[vector_key] = None
-                print(f"向量存储为空: {vector_key}，等待文档上传")
 
 # 在模块加载时初始化
 initialize_storage()
@@ -137,12 +156,7 @@ async def create_knowledge_base(
     kb_dir = os.path.join(base_dir, kb_id)
     os.makedirs(kb_dir, exist_ok=True)
     
-    # 初始化向量存储
-    vector_key = f"{user_id}_{kb_id}"
-    # 不要用空字符串初始化，这会导致问题
-    # vector_stores[vector_key] = FAISS.from_texts([""], embeddings)
-    # 创建空的向量存储，等待文档上传
-    vector_stores[vector_key] = None
+    # 向量存储在首次上传文档时创建
     
     # 记录知识库信息
     if user_id not in user_kbs:
@@ -203,21 +217,22 @@ async def delete_knowledge_base(
     vector_key = f"{user_id}_{kb_id}"
     
     try:
-        # 删除向量存储文件
-        vector_path = os.path.join(STORAGE_DIR, VECTOR_DIR, f"{vector_key}.pkl")
-        if os.path.exists(vector_path):
-            os.remove(vector_path)
-            print(f"已删除向量存储文件: {vector_path}")
+        # 删除向量存储目录
+        vector_dir = get_vector_dir(vector_key)
+        if os.path.exists(vector_dir):
+            shutil.rmtree(vector_dir)
+            print(f"已删除向量存储目录: {vector_dir}")
+        legacy_path = get_legacy_vector_path(vector_key)
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
         
         # 删除知识库目录
         if os.path.exists(kb_info["directory"]):
-            import shutil
             shutil.rmtree(kb_info["directory"])
             print(f"已删除知识库目录: {kb_info['directory']}")
         
         # 从内存中移除
-        if vector_key in vector_stores:
-            del vector_stores[vector_key]
+        vector_stores.pop(vector_key)
         del user_kbs[user_id][kb_id]
         
         # 如果用户没有其他知识库，清理用户记录
@@ -235,7 +250,161 @@ async def delete_knowledge_base(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"删除知识库失败: {str(e)}")
 
-# 文档处理接口
+# 导入任务状态存储
+def connect_job_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(os.path.join(STORAGE_DIR, JOB_DB_FILE), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def init_job_db():
+    with connect_job_db() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+            """
+        )
+
+def save_ingestion_job(job: Dict):
+    with connect_job_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO ingestion_jobs (id, status, created, data) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                job["id"],
+                job["status"],
+                job["created"],
+                json.dumps(job, ensure_ascii=False, default=str),
+            ),
+        )
+
+def load_ingestion_job(job_id: str) -> Optional[Dict]:
+    with connect_job_db() as conn:
+        row = conn.execute(
+            "SELECT data FROM ingestion_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+init_job_db()
+
+# 文档导入后台任务
+def update_ingestion_job(job: Dict, loop: Optional[asyncio.AbstractEventLoop] = None, **fields):
+    """更新任务状态并持久化，同时通过 socket.io 推送进度给上传者"""
+    job.update(fields)
+    job["updated_at"] = datetime.now().isoformat()
+    save_ingestion_job(job)
+
+    if loop is not None:
+        emitter = get_event_emitter({"user_id": job["user_id"]}, update_db=False)
+        asyncio.run_coroutine_threadsafe(
+            emitter({"type": "rag:ingestion", "data": dict(job)}), loop
+        )
+
+def get_or_create_vector_store(vector_key: str) -> KnowledgeBaseStore:
+    """获取向量存储，不存在时创建（加锁避免并发上传重复创建）"""
+    with vector_store_create_lock:
+        vector_store = vector_stores.get(vector_key)
+        if vector_store is None:
+            # 第一次上传文档，创建向量存储
+            print(f"🆕 首次创建向量存储: {vector_key}")
+            vector_store = create_vector_store(vector_key)
+            vector_stores.put(vector_key, vector_store)
+        else:
+            # 向现有向量存储添加文档
+            print(f"➕ 向现有向量存储添加文档: {vector_key}")
+        return vector_store
+
+def ingest_document(job: Dict, file_path: str, loop: asyncio.AbstractEventLoop) -> Dict:
+    """在工作线程中执行：加载 -> 分割 -> 向量化 -> 记录元数据"""
+    user_id = job["user_id"]
+    kb_id = job["kb_id"]
+    vector_key = f"{user_id}_{kb_id}"
+    file_ext = f".{job['file_type']}"
+
+    update_ingestion_job(job, loop, status="processing", stage="loading", progress=0.1)
+    if file_ext == '.pdf':
+        # PDF 按页区间在进程池中并行提取，每批页面提取完即分割、向量化
+        total_pages = count_pdf_pages(file_path)
+        page_batches = iter_pdf_page_batches(file_path)
+    else:
+        loader = TextLoader(file_path, encoding='utf-8')
+        total_pages = 1
+        page_batches = [loader.load()]
+
+    chunk_count = 0
+
+    def split_batches():
+        nonlocal chunk_count
+        pages_done = 0
+        for pages in page_batches:
+            split_docs = text_splitter.split_documents(pages)
+            chunk_count += len(split_docs)
+            pages_done += len(pages)
+            update_ingestion_job(
+                job,
+                loop,
+                stage="embedding",
+                progress=0.1 + 0.8 * pages_done / max(total_pages, 1),
+                pages=pages_done,
+                chunks=chunk_count,
+            )
+            yield split_docs
+
+    # 向量化并存储（只把新分块追加写入磁盘）
+    vector_store = get_or_create_vector_store(vector_key)
+    vector_store.add_document_batches(split_batches(), document_id=job["document_id"])
+
+    # 记录文档信息
+    update_ingestion_job(job, loop, stage="saving", progress=0.9)
+    doc_info = {
+        "id": job["document_id"],
+        "filename": job["filename"],
+        "file_type": job["file_type"],
+        "size": job["size"],
+        "uploaded_at": datetime.now().isoformat(),
+        "chunks": chunk_count
+    }
+    with metadata_lock:
+        if user_id not in user_kbs or kb_id not in user_kbs[user_id]:
+            raise RuntimeError("知识库已被删除")
+        user_kbs[user_id][kb_id]["documents"].append(doc_info)
+        # @CDK: 保存元数据到文件（向量在 add_documents 时已增量落盘）
+        save_metadata()
+
+    return doc_info
+
+async def run_ingestion_job(job: Dict, file_path: str):
+    loop = asyncio.get_running_loop()
+    try:
+        doc_info = await ingestion_executor.run(ingest_document, job, file_path, loop)
+        await run_in_threadpool(
+            update_ingestion_job,
+            job, loop, status="completed", stage="done", progress=1.0, document=doc_info
+        )
+        print(f"✅ 文档导入完成: {job['filename']} ({job['id']})")
+    except Exception as e:
+        print(f"❌ 文档导入失败: {job['filename']} ({job['id']}): {e}")
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        await run_in_threadpool(
+            update_ingestion_job, job, loop, status="failed", error=f"文档处理失败: {str(e)}"
+        )
+
+def prune_ingestion_jobs():
+    """清理已结束且超过保留时间的任务记录"""
+    with connect_job_db() as conn:
+        conn.execute(
+            "DELETE FROM ingestion_jobs WHERE status IN ('completed', 'failed') "
+            "AND created < ?",
+            (time.time() - INGESTION_JOB_TTL,),
+        )
+
+# 文档处理接口：保存文件后立即返回任务 id，解析、分割、向量化在后台线程池执行
 @router.post("/knowledge-bases/{kb_id}/documents", response_model=Dict)
 async def upload_document(
     current_user: Annotated[UserModel, Depends(get_current_user)],
@@ -243,7 +412,6 @@ async def upload_document(
     file: UploadFile = File(...),
 ):
     user_id = current_user.id
-    vector_key = f"{user_id}_{kb_id}"
     
     # 验证知识库存在
     if user_id not in user_kbs or kb_id not in user_kbs[user_id]:
@@ -266,55 +434,62 @@ async def upload_document(
             content = await file.read()
             buffer.write(content)
             file_size = len(content)
-        
-        # 加载文档
-        if file_ext == '.pdf':
-            loader = PyPDFLoader(file_path)
-            documents = loader.load()
-        else:
-            loader = TextLoader(file_path, encoding='utf-8')
-            documents = loader.load()
-        
-        # 文档分割
-        split_docs = text_splitter.split_documents(documents)
-        
-        # 向量化并存储
-        if vector_stores[vector_key] is None:
-            # 第一次上传文档，创建向量存储
-            print(f"🆕 首次创建向量存储: {vector_key}")
-            vector_stores[vector_key] = FAISS.from_documents(split_docs, embeddings)
-        else:
-            # 向现有向量存储添加文档
-            print(f"➕ 向现有向量存储添加文档: {vector_key}")
-            vector_stores[vector_key].add_documents(split_docs)
-
-        # 记录文档信息
-        doc_info = {
-            "id": file_id,
-            "filename": file.filename,
-            "file_type": file_ext[1:],
-            "size": file_size,
-            "uploaded_at": datetime.now().isoformat(),
-            "chunks": len(split_docs)
-        }
-        kb_info["documents"].append(doc_info)
-        
-        # @CDK: 保存元数据和向量存储到文件
-        save_metadata()
-        save_vector_store(vector_key, vector_stores[vector_key])
-        
-        return {
-            "status": "success",
-            "data": doc_info
-        }
-        
     except Exception as e:
         if os.path.exists(file_path):
             os.remove(file_path)
-        raise HTTPException(status_code=500, detail=f"文档处理失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"文件保存失败: {str(e)}")
     finally:
         await file.close()
 
+    await run_in_threadpool(prune_ingestion_jobs)
+
+    job_id = str(uuid.uuid4())
+    job = {
+        "id": job_id,
+        "user_id": user_id,
+        "kb_id": kb_id,
+        "document_id": file_id,
+        "filename": file.filename,
+        "file_type": file_ext[1:],
+        "size": file_size,
+        "status": "pending",
+        "stage": "queued",
+        "progress": 0.0,
+        "pages": 0,
+        "chunks": None,
+        "document": None,
+        "error": None,
+        "created": time.time(),
+        "created_at": datetime.now().isoformat(),
+        "updated_at": datetime.now().isoformat(),
+    }
+    await run_in_threadpool(save_ingestion_job, job)
+
+    task = asyncio.create_task(run_ingestion_job(job, file_path))
+    ingestion_tasks.add(task)
+    task.add_done_callback(ingestion_tasks.discard)
+
+    return {
+        "status": "success",
+        "data": job
+    }
+
+@router.get("/knowledge-bases/{kb_id}/jobs/{job_id}", response_model=Dict)
+async def get_ingestion_job(
+    kb_id: str,
+    job_id: str,
+    current_user: Annotated[UserModel, Depends(get_current_user)]
+):
+    """查询文档导入任务状态"""
+    job = await run_in_threadpool(load_ingestion_job, job_id)
+    if job is None or job["user_id"] != current_user.id or job["kb_id"] != kb_id:
+        raise HTTPException(status_code=404, detail="任务不存在")
+
+    return {
+        "status": "success",
+        "data": job
+    }
+
 @router.get("/knowledge-bases/{kb_id}/documents", response_model=Dict)
 async def get_documents(
     kb_id: str,
@@ -345,20 +520,61 @@ async def delete_document(
     if doc_index is None:
         raise HTTPException(status_code=404, detail="文档不存在")
     
-    # 删除文件
+    # 从向量存储中删除该文档的全部分块
     doc = kb_info["documents"][doc_index]
+    # 未缓存时需要从磁盘加载（可能包含旧格式迁移），放到线程池中执行
+    vector_store = await run_in_threadpool(vector_stores.get, f"{user_id}_{kb_id}")
+    if vector_store is not None:
+        try:
+            # 删除可能触发分段合并（重建全部分段），不能在事件循环中执行
+            deleted = await ingestion_executor.run(
+                vector_store.delete_document, doc["id"], source_hint=doc["id"]
+            )
+            print(f"🗑️ 已从向量存储删除 {deleted} 个分块: {doc['filename']}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"删除文档向量失败: {str(e)}")
+
+    # 删除文件
     file_path = os.path.join(kb_info["directory"], f"{doc['id']}.{doc['file_type']}")
     if os.path.exists(file_path):
         os.remove(file_path)
     
     # 从列表中移除
-    del kb_info["documents"][doc_index]
+    with metadata_lock:
+        del kb_info["documents"][doc_index]
+        save_metadata()
     
     return {
         "status": "success",
         "message": "文档已删除"
     }
 
+# 合并向量存储分段并清理已删除的向量
+@router.post("/knowledge-bases/{kb_id}/compact", response_model=Dict)
+async def compact_knowledge_base(
+    kb_id: str,
+    current_user: Annotated[UserModel, Depends(get_current_user)]
+):
+    user_id = current_user.id
+    if user_id not in user_kbs or kb_id not in user_kbs[user_id]:
+        raise HTTPException(status_code=404, detail="知识库不存在")
+
+    # 未缓存时需要从磁盘加载（可能包含旧格式迁移），放到线程池中执行
+    vector_store = await run_in_threadpool(vector_stores.get, f"{user_id}_{kb_id}")
+    if vector_store is None:
+        return {"status": "empty", "message": "向量存储为空"}
+
+    await ingestion_executor.run(vector_store.compact)
+
+    return {
+        "status": "success",
+        "data": {
+            "doc_count": vector_store.count,
+            "segments": len(vector_store.segments),
+            "tombstone_ratio": vector_store.tombstone_ratio
+        }
+    }
+
 # RAG检索接口
 @router.post("/knowledge-bases/{kb_id}/query", response_model=Dict)
 async def query_knowledge_base(
@@ -372,12 +588,13 @@ async def query_knowledge_base(
     if user_id not in user_kbs or kb_id not in user_kbs[user_id]:
         raise HTTPException(status_code=404, detail="知识库不存在")
     
-    if vector_key not in vector_stores:
-        raise HTTPException(status_code=500, detail="向量存储未初始化")
+    vector_store = await run_in_threadpool(vector_stores.get, vector_key)
+    if vector_store is None:
+        raise HTTPException(status_code=400, detail="向量存储为空，请先上传文档")
     
     try:
         # 检索相关文档
-        docs = vector_stores[vector_key].similarity_search(
+        docs = vector_store.similarity_search(
             request.question, 
             k=request.top_k
         )
@@ -408,15 +625,13 @@ async def check_kb_status(
     if user_id not in user_kbs or kb_id not in user_kbs[user_id]:
         raise HTTPException(status_code=404, detail="知识库不存在")
     
-    vector_store = vector_stores.get(vector_key)
+    vector_store = await run_in_threadpool(vector_stores.get, vector_key)
     
     if vector_store is None:
         return {"status": "empty", "message": "向量存储为空"}
     
     # 检查文档数量
-    doc_count = 0
-    if hasattr(vector_store, 'docstore') and hasattr(vector_store.docstore, '_dict'):
-        doc_count = len(vector_store.docstore._dict)
+    doc_count = vector_store.count
     
     return {
         "status": "active", 
@@ -424,6 +639,16 @@ async def check_kb_status(
         "vector_key": vector_key
     }
 
+# 向量存储缓存统计（命中、未命中、加载耗时）
+@router.get("/vector-store-cache/stats", response_model=Dict)
+async def get_vector_store_cache_stats(
+    current_user: Annotated[UserModel, Depends(get_admin_user)]
+):
+    return {
+        "status": "success",
+        "data": vector_stores.stats()
+    }
+
 # 供内部调用的检索函数（给question_generator使用）
 def retrieve_knowledge(kb_id: str, question: str, top_k: int = 3, user_id: str = None) -> str:
     print(f"\n=== RAG检索调试信息 ===")
@@ -444,13 +669,8 @@ def retrieve_knowledge(kb_id: str, question: str, top_k: int = 3, user_id: str =
     vector_key = f"{user_id}_{kb_id}"
     print(f"向量存储键: {vector_key}")
     
-    if vector_key not in vector_stores:
-        print(f"❌ 向量存储未找到: {vector_key}")
-        print(f"可用的向量存储键: {list(vector_stores.keys())}")
-        return ""
-    
-    # 检查向量存储状态
-    vector_store = vector_stores[vector_key]
+    # 检查向量存储状态（未缓存时从磁盘加载）
+    vector_store = vector_stores.get(vector_key)
     print(f"向量存储类型: {type(vector_store)}")
     
     # 检查向量存储是否有效
@@ -460,25 +680,12 @@ def retrieve_knowledge(kb_id: str, question: str, top_k: int = 3, user_id: str =
     
     # 检查向量存储中的文档数量
     try:
-        # 尝试获取向量存储的基本信息
-        if hasattr(vector_store, 'index_to_docstore_id'):
-            doc_count = len(vector_store.index_to_docstore_id)
-            print(f"向量存储中的文档数量: {doc_count}")
-        else:
-            print("⚠️ 无法获取向量存储文档数量")
-            doc_count = "未知"
-        
-        # 检查向量存储是否为空
-        if hasattr(vector_store, 'docstore') and hasattr(vector_store.docstore, '_dict'):
-            actual_docs = len(vector_store.docstore._dict)
-            print(f"实际存储的文档数量: {actual_docs}")
-            
-            if actual_docs == 0:
-                print("❌ 向量存储为空，没有文档被索引")
-                return ""
-        else:
-            print("⚠️ 无法检查向量存储内容")
-            
+        actual_docs = vector_store.count
+        print(f"实际存储的文档数量: {actual_docs}")
+
+        if actual_docs == 0:
+            print("❌ 向量存储为空，没有文档被索引")
+            return ""
     except Exception as e:
         print(f"⚠️ 检查向量存储状态时出错: {e}")
 
@@ -38,6 +38,13 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import (
+    bm25_index_delete,
+    bm25_index_drop,
+    bm25_index_insert,
+    bm25_index_reset,
+)
+from open_webui.retrieval.collection_cache import COLLECTION_CACHE
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -68,6 +75,15 @@ from open_webui.retrieval.web.sougou import search_sougou
 from open_webui.retrieval.web.firecrawl import search_firecrawl
 from open_webui.retrieval.web.external import search_external
 
+from open_webui.retrieval.embedding_cache import (
+    EMBEDDING_CACHE,
+    QUERY_EMBEDDING_CACHE,
+    embed_with_cache,
+)
+from open_webui.retrieval.embedding_service import (
+    get_embedding_service,
+    get_embedding_services_stats,
+)
 from open_webui.retrieval.utils import (
     get_embedding_function,
     get_reranking_function,
@@ -92,13 +108,12 @@ from open_webui.config import (
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
+    VECTOR_DB,
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
     DOCKER,
-    SENTENCE_TRANSFORMERS_BACKEND,
-    SENTENCE_TRANSFORMERS_MODEL_KWARGS,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS,
 )
@@ -122,18 +137,12 @@ def get_ef(
 ):
     ef = None
     if embedding_model and engine == "":
-        from sentence_transformers import SentenceTransformer
-
-        try:
-            ef = SentenceTransformer(
-                get_model_path(embedding_model, auto_update),
-                device=DEVICE_TYPE,
-                trust_remote_code=RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
-                backend=SENTENCE_TRANSFORMERS_BACKEND,
-                model_kwargs=SENTENCE_TRANSFORMERS_MODEL_KWARGS,
-            )
-        except Exception as e:
-            log.debug(f"Error loading SentenceTransformer: {e}")
+        # Shared with routers/rag.py so each model is only loaded once
+        ef = get_embedding_service(
+            embedding_model,
+            auto_update=auto_update,
+            trust_remote_code=RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
+        )
 
     return ef
 
@@ -274,6 +283,19 @@ class EmbeddingModelUpdateForm(BaseModel):
     embedding_batch_size: Optional[int] = 1
 
 
+@router.get("/embedding/stats")
+async def get_embedding_stats(request: Request, user=Depends(get_admin_user)):
+    return {
+        "status": True,
+        "services": get_embedding_services_stats(),
+        "cache": EMBEDDING_CACHE.stats() if EMBEDDING_CACHE else None,
+        "query_cache": (
+            QUERY_EMBEDDING_CACHE.stats() if QUERY_EMBEDDING_CACHE else None
+        ),
+        "collection_cache": COLLECTION_CACHE.stats(),
+    }
+
+
 @router.post("/embedding/update")
 async def update_embedding_config(
     request: Request, form_data: EmbeddingModelUpdateForm, user=Depends(get_admin_user)
@@ -1251,11 +1273,17 @@ def save_docs_to_vector_db(
                 metadata[key] = str(value)
 
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        collection_exists = VECTOR_DB_CLIENT.has_collection(
+            collection_name=collection_name
+        )
+        if collection_exists:
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                bm25_index_drop(collection_name)
+                COLLECTION_CACHE.delete(collection_name)
+                collection_exists = False
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1292,12 +1320,19 @@ def save_docs_to_vector_db(
                 if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
                 else None
             ),
+            query_cache=False,
         )
 
-        embeddings = embedding_function(
+        embeddings = embed_with_cache(
             list(map(lambda x: x.replace("\n", " "), texts)),
+            lambda batch: embedding_function(
+                batch,
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=user,
+            ),
+            engine=request.app.state.config.RAG_EMBEDDING_ENGINE,
+            model=request.app.state.config.RAG_EMBEDDING_MODEL,
             prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
         )
 
         items = [
@@ -1314,6 +1349,8 @@ def save_docs_to_vector_db(
             collection_name=collection_name,
             items=items,
         )
+        bm25_index_insert(collection_name, items, create=not collection_exists)
+        COLLECTION_CACHE.delete(collection_name)
 
         return True
     except Exception as e:
@@ -1348,6 +1385,8 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                bm25_index_drop(f"file-{file.id}")
+                COLLECTION_CACHE.delete(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -2181,6 +2220,8 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            bm25_index_delete(form_data.collection_name, filter={"hash": hash})
+            COLLECTION_CACHE.delete(form_data.collection_name)
             return {"status": True}
         else:
             return {"status": False}
@@ -2189,9 +2230,46 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
         return {"status": False}
 
 
+class VectorIndexRebuildForm(BaseModel):
+    collection_name: Optional[str] = None
+
+
+def get_pgvector_client():
+    if VECTOR_DB != "pgvector":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Vector index management is only available for pgvector.",
+        )
+    return VECTOR_DB_CLIENT
+
+
+@router.get("/vector/index")
+def get_vector_index_status(user=Depends(get_admin_user)):
+    client = get_pgvector_client()
+    try:
+        return {"status": True, **client.get_index_status()}
+    except Exception as e:
+        log.exception(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ERROR_MESSAGES.DEFAULT(e),
+        )
+
+
+@router.post("/vector/index/rebuild")
+def rebuild_vector_index(
+    form_data: VectorIndexRebuildForm, user=Depends(get_admin_user)
+):
+    # Rebuilds the shared index, or the partial index of one collection, online
+    client = get_pgvector_client()
+    return {"status": True, "build": client.rebuild_index(form_data.collection_name)}
+
+
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    bm25_index_reset()
+    COLLECTION_CACHE.clear()
     Knowledges.delete_all_knowledge()
 
 
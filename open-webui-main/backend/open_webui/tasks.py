@@ -9,6 +9,7 @@ from fastapi import Request
 from typing import Dict, List, Optional
 
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.ttl_cache import handle_invalidation
 
 
 log = logging.getLogger(__name__)
@@ -39,6 +40,8 @@ async def redis_task_command_listener(app):
                 local_task = tasks.get(task_id)
                 if local_task:
                     local_task.cancel()
+            elif command.get("action") == "invalidate_cache":
+                handle_invalidation(command)
         except Exception as e:
             log.exception(f"Error handling distributed task command: {e}")
 
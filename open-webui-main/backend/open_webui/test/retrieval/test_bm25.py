@@ -0,0 +1,124 @@
+import pytest
+
+from open_webui.retrieval.bm25 import BM25Index
+
+
+@pytest.fixture
+def index(tmp_path):
+    return BM25Index(str(tmp_path / "bm25.sqlite3"))
+
+
+def collection_stats(index, collection_name):
+    return index._conn.execute(
+        "SELECT doc_count, total_length FROM bm25_collection WHERE collection = ?",
+        (collection_name,),
+    ).fetchone()
+
+
+def search_ids(index, query, k=10):
+    return [doc.metadata["id"] for doc in index.search("c", query, k, id_key="id")]
+
+
+class TestBM25Index:
+    def test_search_ranks_matching_documents(self, index):
+        index.insert(
+            "c",
+            [
+                {"id": "1", "text": "apple banana", "metadata": {}},
+                {"id": "2", "text": "apple apple cherry", "metadata": {}},
+                {"id": "3", "text": "durian", "metadata": {}},
+            ],
+            create=True,
+        )
+
+        assert search_ids(index, "apple") == ["2", "1"]
+        assert search_ids(index, "durian") == ["3"]
+        assert search_ids(index, "missing") == []
+
+    def test_insert_skips_unindexed_collection(self, index):
+        index.insert("c", [{"id": "1", "text": "apple", "metadata": {}}])
+
+        assert not index.has_collection("c")
+
+    def test_reinsert_replaces_document(self, index):
+        """Re-inserting an id replaces its postings and statistics"""
+        index.insert(
+            "c", [{"id": "1", "text": "apple banana", "metadata": {}}], create=True
+        )
+        index.insert("c", [{"id": "1", "text": "cherry", "metadata": {}}])
+
+        assert collection_stats(index, "c") == (1, 1)
+        assert search_ids(index, "apple") == []
+        assert search_ids(index, "cherry") == ["1"]
+
+    def test_repeated_ids_in_batch_keep_last(self, index):
+        index.insert(
+            "c",
+            [
+                {"id": "1", "text": "apple", "metadata": {}},
+                {"id": "1", "text": "banana cherry", "metadata": {}},
+            ],
+            create=True,
+        )
+
+        assert collection_stats(index, "c") == (1, 2)
+        assert search_ids(index, "apple") == []
+
+    def test_delete_by_ids_and_filter(self, index):
+        index.insert(
+            "c",
+            [
+                {"id": "1", "text": "apple", "metadata": {"hash": "a"}},
+                {"id": "2", "text": "apple pie", "metadata": {"hash": "b"}},
+                {"id": "3", "text": "apple tart", "metadata": {"hash": "b"}},
+            ],
+            create=True,
+        )
+
+        index.delete("c", ids=["1", "1", "missing"])
+        assert collection_stats(index, "c") == (2, 4)
+
+        index.delete("c", filter={"hash": "b"})
+        assert collection_stats(index, "c") == (0, 0)
+        assert search_ids(index, "apple") == []
+
+    def test_repeated_query_terms_add_up(self, index):
+        index.insert(
+            "c",
+            [
+                {"id": "1", "text": "apple x", "metadata": {}},
+                {"id": "2", "text": "banana x", "metadata": {}},
+                {"id": "3", "text": "cherry x", "metadata": {}},
+            ],
+            create=True,
+        )
+
+        assert search_ids(index, "apple banana banana")[0] == "2"
+
+    def test_build_skipped_after_write_to_unindexed_collection(self, index):
+        """An insert between the backfill read and the build discards the build"""
+        generation = index.generation("c")
+        index.insert("c", [{"id": "2", "text": "banana", "metadata": {}}])
+
+        assert not index.build("c", ["1"], ["apple"], [{}], generation=generation)
+        assert not index.has_collection("c")
+
+        generation = index.generation("c")
+        assert index.build(
+            "c", ["1", "2"], ["apple", "banana"], [{}, {}], generation=generation
+        )
+        assert search_ids(index, "banana") == ["2"]
+
+    def test_failed_write_is_rolled_back(self, index, monkeypatch):
+        index.insert("c", [{"id": "1", "text": "apple", "metadata": {}}], create=True)
+
+        def fail(collection_name, items):
+            index._conn.execute("DELETE FROM bm25_doc")
+            raise ValueError("boom")
+
+        monkeypatch.setattr(index, "_add", fail)
+        with pytest.raises(ValueError):
+            index.insert("c", [{"id": "2", "text": "banana", "metadata": {}}])
+
+        assert not index._conn.in_transaction
+        assert search_ids(index, "apple") == ["1"]
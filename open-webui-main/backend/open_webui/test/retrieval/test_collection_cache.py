@@ -0,0 +1,118 @@
+import pytest
+
+from open_webui.retrieval import collection_cache
+from open_webui.retrieval.collection_cache import CollectionSnapshotCache
+from open_webui.retrieval.vector.main import GetResult
+from open_webui.utils import ttl_cache
+
+
+class Fetch:
+    """Counts full collection reads"""
+
+    def __init__(self, ids=("a", "b")):
+        self.ids = list(ids)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return GetResult(
+            ids=[self.ids],
+            documents=[[f"text {id}" for id in self.ids]],
+            metadatas=[[{"id": id} for id in self.ids]],
+        )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(collection_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture(autouse=True)
+def local_only(monkeypatch):
+    monkeypatch.setattr(ttl_cache, "_caches", {})
+    monkeypatch.setattr(collection_cache, "publish_invalidation", lambda *args: None)
+
+
+@pytest.fixture
+def cache():
+    return CollectionSnapshotCache(max_bytes=1024 * 1024, ttl=60)
+
+
+class TestCollectionSnapshotCache:
+    def test_second_read_is_served_from_cache(self, cache):
+        fetch = Fetch()
+
+        cache.get("collection", fetch)
+        result = cache.get("collection", fetch)
+
+        assert fetch.calls == 1
+        assert result.ids == [["a", "b"]]
+        assert cache.stats()["hits"] == 1
+
+    def test_returned_metadata_can_be_mutated(self, cache):
+        fetch = Fetch()
+        cache.get("collection", fetch)
+
+        cache.get("collection", fetch).metadatas[0][0]["score"] = 1.0
+
+        assert cache.get("collection", fetch).metadatas[0][0] == {"id": "a"}
+
+    def test_snapshots_expire_after_ttl(self, cache, clock):
+        """Writes from other workers without Redis are seen once the TTL passes"""
+        fetch = Fetch()
+        cache.get("collection", fetch)
+
+        clock[0] += 59.9
+        cache.get("collection", fetch)
+        clock[0] += 0.1
+        fetch.ids = ["a"]
+        result = cache.get("collection", fetch)
+
+        assert fetch.calls == 2
+        assert result.ids == [["a"]]
+        stats = cache.stats()
+        assert stats["expired"] == 1
+        assert stats["entries"] == 1
+
+    def test_delete_drops_snapshot(self, cache):
+        fetch = Fetch()
+        cache.get("collection", fetch)
+
+        cache.delete("collection")
+        cache.get("collection", fetch)
+
+        assert fetch.calls == 2
+
+    def test_read_racing_with_invalidation_is_not_cached(self, cache):
+        def fetch_during_write():
+            cache.delete("collection")
+            return Fetch()()
+
+        cache.get("collection", fetch_during_write)
+
+        assert cache.stats()["entries"] == 0
+
+    def test_evicts_past_memory_budget(self):
+        fetch = Fetch()
+        size = collection_cache.CollectionSnapshot(fetch(), ttl=60).size
+        cache = CollectionSnapshotCache(max_bytes=size * 2, ttl=60)
+
+        for name in ("a", "b", "c"):
+            cache.get(name, fetch)
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+
+    @pytest.mark.parametrize("max_bytes,ttl", [(0, 60), (1024, 0)])
+    def test_disabled_cache_always_fetches(self, max_bytes, ttl):
+        cache = CollectionSnapshotCache(max_bytes=max_bytes, ttl=ttl)
+        fetch = Fetch()
+
+        cache.get("collection", fetch)
+        cache.get("collection", fetch)
+
+        assert not cache.enabled
+        assert fetch.calls == 2
@@ -0,0 +1,145 @@
+import pytest
+
+from open_webui.retrieval import embedding_cache
+from open_webui.retrieval.embedding_cache import QueryEmbeddingCache
+
+
+class FakeRedis:
+    """The subset of the redis client QueryEmbeddingCache uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.fail = False
+
+    def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+
+    def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("redis down")
+        for key, value, ex in self.commands:
+            self.redis.values[key] = value
+            self.redis.ttls[key] = ex
+
+
+class Embedder:
+    """Counts the texts sent to the embedding model"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestQueryEmbeddingCache:
+    def test_single_query_hits_after_first_call(self):
+        cache = QueryEmbeddingCache(max_entries=10, ttl=60)
+        embed = Embedder()
+
+        first = cache.embed("hello", embed, "engine", "model")
+        second = cache.embed("hello", embed, "engine", "model")
+
+        assert first == second == [5.0, 0.5]
+        assert embed.calls == [["hello"]]
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_list_embeds_only_misses_once(self):
+        cache = QueryEmbeddingCache(max_entries=10, ttl=60)
+        embed = Embedder()
+        cache.embed("a", embed, "engine", "model")
+
+        vectors = cache.embed(["a", "bb", "bb", "ccc"], embed, "engine", "model")
+
+        assert vectors == [[1.0, 0.5], [2.0, 0.5], [2.0, 0.5], [3.0, 0.5]]
+        assert embed.calls == [["a"], ["bb", "ccc"]]
+
+    def test_key_includes_model_and_prefix(self):
+        cache = QueryEmbeddingCache(max_entries=10, ttl=60)
+        embed = Embedder()
+
+        cache.embed("a", embed, "engine", "model")
+        cache.embed("a", embed, "engine", "other")
+        cache.embed("a", embed, "engine", "model", prefix="query: ")
+
+        assert len(embed.calls) == 3
+
+    def test_empty_list_goes_to_model(self):
+        cache = QueryEmbeddingCache(max_entries=10, ttl=60)
+        embed = Embedder()
+
+        assert cache.embed([], embed, "engine", "model") == []
+        assert embed.calls == [[]]
+
+    def test_entries_expire(self, clock):
+        cache = QueryEmbeddingCache(max_entries=10, ttl=60)
+        embed = Embedder()
+        cache.embed("a", embed, "engine", "model")
+
+        clock[0] += 60
+        cache.embed("a", embed, "engine", "model")
+
+        assert embed.calls == [["a"], ["a"]]
+        assert cache.stats()["entries"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = QueryEmbeddingCache(max_entries=2, ttl=60)
+        embed = Embedder()
+        for text in ("a", "b", "a", "c"):
+            cache.embed(text, embed, "engine", "model")
+
+        cache.embed("a", embed, "engine", "model")
+        cache.embed("b", embed, "engine", "model")
+
+        assert embed.calls == [["a"], ["b"], ["c"], ["b"]]
+
+    def test_misses_are_shared_through_redis(self):
+        redis = FakeRedis()
+        writer = QueryEmbeddingCache(max_entries=10, ttl=60, redis=redis)
+        reader = QueryEmbeddingCache(max_entries=10, ttl=60, redis=redis)
+        embed = Embedder()
+
+        writer.embed("hello", embed, "engine", "model")
+        vector = reader.embed("hello", embed, "engine", "model")
+
+        assert vector == [5.0, 0.5]
+        assert embed.calls == [["hello"]]
+        assert reader.stats()["redis_hits"] == 1
+        assert list(redis.ttls.values()) == [60]
+        # Kept locally after the Redis hit
+        assert reader.stats()["entries"] == 1
+
+    def test_redis_errors_fall_back_to_model(self):
+        redis = FakeRedis()
+        redis.fail = True
+        cache = QueryEmbeddingCache(max_entries=10, ttl=60, redis=redis)
+        embed = Embedder()
+
+        assert cache.embed("a", embed, "engine", "model") == [1.0, 0.5]
+        assert cache.embed("a", embed, "engine", "model") == [1.0, 0.5]
+        assert embed.calls == [["a"]]
@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from open_webui.retrieval.embedding_service import EmbeddingService
+
+
+class FakeModel:
+    """Embeds a text as [len(text), normalized], recording each forward pass"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def encode(self, texts, batch_size, normalize_embeddings, prompt=None):
+        self.calls.append((list(texts), prompt))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return [[float(len(text)), float(normalize_embeddings)] for text in texts]
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+def service(model, coalesce_wait_ms=0):
+    return EmbeddingService(
+        model, "fake", batch_size=8, queue_size=16, coalesce_wait_ms=coalesce_wait_ms
+    )
+
+
+def encode_concurrently(service, calls):
+    """Run `service.encode(texts, **kwargs)` for each call at the same time"""
+    barrier = threading.Barrier(len(calls))
+
+    def encode(call):
+        texts, kwargs = call
+        barrier.wait()
+        return service.encode(texts, **kwargs)
+
+    with ThreadPoolExecutor(len(calls)) as pool:
+        return list(pool.map(encode, calls))
+
+
+class TestEmbeddingService:
+    def test_encode_mirrors_sentence_transformer(self, model):
+        embeddings = service(model)
+
+        assert embeddings.encode("abc").tolist() == [3.0, 0.0]
+        assert embeddings.encode(["a", "bb"], normalize_embeddings=True).tolist() == [
+            [1.0, 1.0],
+            [2.0, 1.0],
+        ]
+        assert embeddings.encode([]).shape == (0, 0)
+        assert embeddings.get_sentence_embedding_dimension() == 2
+
+    def test_concurrent_calls_share_a_batch(self, model):
+        embeddings = service(model, coalesce_wait_ms=200)
+
+        results = encode_concurrently(
+            embeddings, [(["a"], {}), (["bb", "ccc"], {}), (["dddd"], {})]
+        )
+
+        assert [result[:, 0].tolist() for result in results] == [
+            [1.0],
+            [2.0, 3.0],
+            [4.0],
+        ]
+        assert len(model.calls) == 1
+        assert embeddings.stats()["batches"] == 1
+
+    def test_batches_are_split_by_prompt(self, model):
+        embeddings = service(model, coalesce_wait_ms=200)
+
+        encode_concurrently(
+            embeddings,
+            [
+                (["a"], {"prompt": "query: "}),
+                (["b"], {}),
+                (["c"], {"prompt": "query: "}),
+            ],
+        )
+
+        assert sorted(
+            (sorted(texts), prompt or "") for texts, prompt in model.calls
+        ) == [
+            (["a", "c"], "query: "),
+            (["b"], ""),
+        ]
+
+    def test_model_error_reaches_caller(self, model):
+        embeddings = service(model)
+        model.fail = True
+
+        with pytest.raises(RuntimeError, match="model failed"):
+            embeddings.encode("a")
+
+        model.fail = False
+        assert embeddings.encode("a").tolist() == [1.0, 0.0]
+
+    def test_worker_survives_errors_outside_the_model(self, model):
+        embeddings = service(model)
+
+        # An unhashable prompt fails while grouping, before the model is called
+        with pytest.raises(TypeError):
+            embeddings.encode("a", prompt=["query: "])
+
+        assert embeddings.encode("a").tolist() == [1.0, 0.0]
+        assert model.calls == [(["a"], None)]
+
+    def test_unknown_arguments_are_rejected(self, model):
+        embeddings = service(model)
+
+        with pytest.raises(TypeError):
+            embeddings.encode("a", convert_to_tensor=True)
+
+        assert model.calls == []
@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from open_webui.retrieval.vector.dbs import local
+from open_webui.retrieval.vector.dbs.local import LocalClient, ORPHAN_AGE
+
+DIMENSION = 8
+COLLECTION = "collection"
+
+
+class InlineExecutor:
+    """Runs background compactions right away so tests can check their result"""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def try_submit(self, fn, *args):
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = InlineExecutor()
+    monkeypatch.setattr(local, "get_executor", lambda name: executor)
+    return executor
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, executor):
+    monkeypatch.setattr(local, "LOCAL_VECTOR_DB_PATH", str(tmp_path / "local"))
+    return LocalClient()
+
+
+def vector(seed):
+    return np.random.default_rng(seed).normal(size=DIMENSION).tolist()
+
+
+def items(start, count, **metadata):
+    return [
+        {
+            "id": f"id-{i}",
+            "text": f"text {i}",
+            "vector": vector(i),
+            "metadata": {"index": i, **metadata},
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def segment_rows(client):
+    return client._conn.execute(
+        "SELECT id, size, deleted FROM segment WHERE collection = ?", (COLLECTION,)
+    ).fetchall()
+
+
+def segment_files(client):
+    directory = client._collection_dir(COLLECTION)
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+class TestLocalClient:
+    def test_insert_and_search(self, client):
+        client.insert(COLLECTION, items(0, 10))
+
+        result = client.search(COLLECTION, [vector(3)], 3)
+
+        assert result.ids[0][0] == "id-3"
+        assert result.distances[0][0] == pytest.approx(1.0, abs=1e-5)
+        assert result.documents[0][0] == "text 3"
+        assert result.metadatas[0][0] == {"index": 3}
+        assert len(result.ids[0]) == 3
+
+    def test_each_write_is_one_segment(self, client):
+        client.insert(COLLECTION, items(0, 5))
+        client.insert(COLLECTION, items(5, 5))
+
+        assert len(segment_rows(client)) == 2
+        assert len(segment_files(client)) == 2
+        assert len(client.get(COLLECTION).ids[0]) == 10
+
+    def test_upsert_leaves_tombstone_in_old_segment(self, client, monkeypatch):
+        monkeypatch.setattr(local, "TOMBSTONE_RATIO", 1.0)
+        client.insert(COLLECTION, items(0, 4))
+
+        replaced = items(0, 1)
+        replaced[0]["text"] = "replaced"
+        client.upsert(COLLECTION, replaced)
+
+        assert sorted(row[1:] for row in segment_rows(client)) == [(1, 0), (4, 1)]
+        result = client.search(COLLECTION, [vector(0)], 4)
+        assert result.ids[0].count("id-0") == 1
+        assert result.documents[0][0] == "replaced"
+
+    def test_repeated_ids_in_one_batch_keep_the_last(self, client):
+        batch = items(0, 1) + items(0, 1)
+        batch[1]["text"] = "last"
+
+        client.insert(COLLECTION, batch)
+
+        assert client.get(COLLECTION).documents == [["last"]]
+
+    def test_dimension_mismatch_is_rejected(self, client):
+        client.insert(COLLECTION, items(0, 1))
+
+        with pytest.raises(ValueError):
+            client.insert(
+                COLLECTION, [{"id": "x", "text": "", "vector": [1.0], "metadata": {}}]
+            )
+        # The segment built for the rejected write is removed
+        assert len(segment_files(client)) == 1
+
+    def test_delete_by_ids(self, client, monkeypatch):
+        monkeypatch.setattr(local, "TOMBSTONE_RATIO", 1.0)
+        client.insert(COLLECTION, items(0, 4))
+
+        client.delete(COLLECTION, ids=["id-1", "id-2"])
+
+        assert client.get(COLLECTION).ids == [["id-0", "id-3"]]
+        assert segment_rows(client)[0][1:] == (4, 2)
+        result = client.search(COLLECTION, [vector(1)], 4)
+        assert sorted(result.ids[0]) == ["id-0", "id-3"]
+
+    def test_delete_by_filter(self, client, monkeypatch):
+        monkeypatch.setattr(local, "TOMBSTONE_RATIO", 1.0)
+        client.insert(COLLECTION, items(0, 3, file_id="a"))
+        client.insert(COLLECTION, items(3, 2, file_id="b"))
+
+        client.delete(COLLECTION, filter={"file_id": "a"})
+
+        assert client.get(COLLECTION).ids == [["id-3", "id-4"]]
+        assert client.query(COLLECTION, {"file_id": "a"}).ids == [[]]
+        assert sorted(row[2] for row in segment_rows(client)) == [0, 3]
+
+    def test_delete_past_tombstone_ratio_compacts(self, client, executor):
+        client.insert(COLLECTION, items(0, 5))
+        client.insert(COLLECTION, items(5, 5))
+
+        client.delete(COLLECTION, ids=["id-0", "id-1", "id-2"])
+
+        assert executor.submitted == 1
+        assert [row[1:] for row in segment_rows(client)] == [(7, 0)]
+        assert len(segment_files(client)) == 1
+        result = client.search(COLLECTION, [vector(7)], 10)
+        assert result.ids[0][0] == "id-7"
+        assert sorted(result.ids[0]) == [f"id-{i}" for i in range(3, 10)]
+
+    def test_compacts_past_max_segments(self, client, monkeypatch):
+        monkeypatch.setattr(local, "LOCAL_VECTOR_DB_MAX_SEGMENTS", 2)
+
+        for start in range(0, 9, 3):
+            client.insert(COLLECTION, items(start, 3))
+
+        assert len(segment_rows(client)) == 1
+        assert len(client.get(COLLECTION).ids[0]) == 9
+        assert client.get_vectors(COLLECTION, ["id-4"])["id-4"] == pytest.approx(
+            (np.array(vector(4)) / np.linalg.norm(vector(4))).tolist(), abs=1e-5
+        )
+
+    def test_skips_compaction_when_pool_is_saturated(
+        self, client, executor, monkeypatch
+    ):
+        monkeypatch.setattr(local, "LOCAL_VECTOR_DB_MAX_SEGMENTS", 1)
+        monkeypatch.setattr(executor, "try_submit", lambda fn, *args: None)
+
+        client.insert(COLLECTION, items(0, 1))
+        client.insert(COLLECTION, items(1, 1))
+
+        assert len(segment_rows(client)) == 2
+        # Retried on the next write
+        assert COLLECTION not in client._compacting
+
+    def test_compaction_keeps_segments_written_meanwhile(self, client, monkeypatch):
+        monkeypatch.setattr(local, "TOMBSTONE_RATIO", 1.0)
+        client.insert(COLLECTION, items(0, 2))
+        client.insert(COLLECTION, items(2, 2))
+
+        build_index = LocalClient._build_index
+        during_build = threading.Event()
+
+        def build_and_write(vectors):
+            # Runs without the lock held, so other writes go through
+            if not during_build.is_set():
+                during_build.set()
+                client.insert(COLLECTION, items(4, 2))
+                client.delete(COLLECTION, ids=["id-0"])
+            return build_index(vectors)
+
+        monkeypatch.setattr(client, "_build_index", build_and_write)
+        client._compact(COLLECTION)
+
+        assert sorted(row[1:] for row in segment_rows(client)) == [(2, 0), (4, 1)]
+        assert sorted(client.get(COLLECTION).ids[0]) == [f"id-{i}" for i in range(1, 6)]
+        result = client.search(COLLECTION, [vector(0)], 10)
+        assert "id-0" not in result.ids[0]
+        assert len(result.ids[0]) == 5
+
+    def test_search_runs_while_segment_is_built(self, client, monkeypatch):
+        client.insert(COLLECTION, items(0, 3))
+
+        building = threading.Event()
+        release = threading.Event()
+        build_index = LocalClient._build_index
+
+        def slow_build(vectors):
+            building.set()
+            release.wait(5)
+            return build_index(vectors)
+
+        monkeypatch.setattr(client, "_build_index", slow_build)
+        writer = threading.Thread(target=client.insert, args=(COLLECTION, items(3, 3)))
+        writer.start()
+        building.wait(5)
+
+        start = time.perf_counter()
+        assert client.search(COLLECTION, [vector(1)], 1).ids == [["id-1"]]
+        assert time.perf_counter() - start < 1
+
+        release.set()
+        writer.join(5)
+        assert len(client.get(COLLECTION).ids[0]) == 6
+
+    def test_reopen_reads_committed_segments(self, client):
+        client.insert(COLLECTION, items(0, 3))
+
+        reopened = LocalClient()
+
+        assert reopened.search(COLLECTION, [vector(2)], 1).ids == [["id-2"]]
+
+    def test_startup_removes_only_stale_uncommitted_files(self, client):
+        client.insert(COLLECTION, items(0, 1))
+        directory = client._collection_dir(COLLECTION)
+        stale = os.path.join(directory, "stale.faiss")
+        recent = os.path.join(directory, "recent.faiss")
+        for path in (stale, recent):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+        old = time.time() - ORPHAN_AGE - 1
+        os.utime(stale, (old, old))
+
+        LocalClient()
+
+        assert not os.path.exists(stale)
+        # May belong to a write in progress in another worker
+        assert os.path.exists(recent)
+        assert len(segment_files(client)) == 2
+
+    def test_delete_collection_and_reset(self, client):
+        client.insert(COLLECTION, items(0, 2))
+        client.insert("other", items(0, 2))
+
+        client.delete_collection(COLLECTION)
+
+        assert not client.has_collection(COLLECTION)
+        assert client.search(COLLECTION, [vector(0)], 1) is None
+        assert segment_files(client) == []
+        assert client.has_collection("other")
+
+        client.reset()
+        assert not client.has_collection("other")
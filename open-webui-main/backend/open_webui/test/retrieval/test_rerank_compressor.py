@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.retrieval.utils import RerankCompressor, VECTOR_ID_KEY
+
+QUERY = [1.0, 0.0, 0.0]
+
+# Vectors the embedding model would produce for each text
+EMBEDDINGS = {
+    "same": [2.0, 0.0, 0.0],
+    "orthogonal": [0.0, 1.0, 0.0],
+    "opposite": [-1.0, 0.0, 0.0],
+    "diagonal": [1.0, 1.0, 0.0],
+}
+
+
+class FakeVectorDB:
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.requests = []
+        self.fail = False
+
+    def get_vectors(self, collection_name, ids):
+        self.requests.append((collection_name, sorted(ids)))
+        if self.fail:
+            raise ConnectionError("vector db down")
+        return {id: self.vectors[id] for id in ids if id in self.vectors}
+
+
+class Embedder:
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, query, prefix=None):
+        if isinstance(query, str):
+            return QUERY
+        self.embedded.extend(query)
+        return [EMBEDDINGS[text] for text in query]
+
+
+@pytest.fixture
+def vector_db(monkeypatch):
+    fake = FakeVectorDB(
+        {
+            "id-same": [3.0, 0.0, 0.0],
+            # Zero padded by the backend to a fixed length
+            "id-padded": [0.0, 2.0, 0.0, 0.0, 0.0],
+            # Stored by a different embedding model
+            "id-other-model": [1.0, 0.0, 0.0, 1.0],
+        }
+    )
+    monkeypatch.setattr("open_webui.retrieval.utils.VECTOR_DB_CLIENT", fake)
+    return fake
+
+
+def doc(text, id=None):
+    return Document(
+        page_content=text, metadata={VECTOR_ID_KEY: id} if id else {"source": text}
+    )
+
+
+def compressor(embedder, collection_name="collection", top_n=10, r_score=0.0):
+    return RerankCompressor(
+        collection_name=collection_name,
+        embedding_function=embedder,
+        top_n=top_n,
+        reranking_function=None,
+        r_score=r_score,
+    )
+
+
+class TestSimilarityScores:
+    def test_uses_stored_vectors(self, vector_db):
+        embedder = Embedder()
+        documents = [doc("same", "id-same"), doc("orthogonal", "id-padded")]
+
+        scores = compressor(embedder).similarity_scores(documents, "query")
+
+        assert scores == pytest.approx([1.0, 0.0])
+        assert embedder.embedded == []
+        assert vector_db.requests == [("collection", ["id-padded", "id-same"])]
+
+    def test_embeds_only_documents_without_stored_vector(self, vector_db):
+        embedder = Embedder()
+        documents = [
+            doc("same", "id-same"),
+            doc("opposite"),
+            doc("diagonal", "id-missing"),
+            doc("opposite", "id-other-model"),
+        ]
+
+        scores = compressor(embedder).similarity_scores(documents, "query")
+
+        assert scores == pytest.approx([1.0, -1.0, np.sqrt(0.5), -1.0])
+        assert embedder.embedded == ["opposite", "diagonal", "opposite"]
+
+    def test_reembeds_when_vector_db_fails(self, vector_db):
+        vector_db.fail = True
+        embedder = Embedder()
+
+        scores = compressor(embedder).similarity_scores(
+            [doc("orthogonal", "id-same")], "query"
+        )
+
+        assert scores == pytest.approx([0.0])
+        assert embedder.embedded == ["orthogonal"]
+
+    def test_without_collection_embeds_everything(self, vector_db):
+        embedder = Embedder()
+
+        scores = compressor(embedder, collection_name=None).similarity_scores(
+            [doc("same", "id-same")], "query"
+        )
+
+        assert scores == pytest.approx([1.0])
+        assert embedder.embedded == ["same"]
+        assert vector_db.requests == []
+
+    def test_no_documents(self, vector_db):
+        assert compressor(Embedder()).similarity_scores([], "query") == []
+
+
+class TestCompressDocuments:
+    def test_ranks_filters_and_strips_vector_id(self, vector_db):
+        documents = [
+            doc("orthogonal", "id-padded"),
+            doc("same", "id-same"),
+            doc("diagonal"),
+        ]
+
+        results = compressor(Embedder(), r_score=0.5, top_n=1).compress_documents(
+            documents, "query"
+        )
+
+        assert [result.page_content for result in results] == ["same"]
+        assert results[0].metadata == {"score": pytest.approx(1.0)}
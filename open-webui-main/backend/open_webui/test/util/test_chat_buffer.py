@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils.chat_buffer import ChatWriteBuffer
+
+
+class FakeChats:
+    """Records the writes ChatWriteBuffer issues, optionally failing them"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+        # Kinds of write that fail, e.g. {"upsert"}
+        self.fail_on = set()
+
+    def _record(self, *call):
+        if self.fail or call[0] in self.fail_on:
+            raise RuntimeError("database unavailable")
+        self.calls.append(call)
+
+    def append_content_to_message_by_id_and_message_id(
+        self, chat_id, message_id, content
+    ):
+        self._record("append", chat_id, message_id, content)
+
+    def upsert_message_to_chat_by_id_and_message_id(self, chat_id, message_id, message):
+        self._record("upsert", chat_id, message_id, message)
+
+    def add_message_status_to_chat_by_id_and_message_id(
+        self, chat_id, message_id, status
+    ):
+        self._record("status", chat_id, message_id, status)
+
+
+@pytest.fixture
+def chats(monkeypatch):
+    fake = FakeChats()
+    monkeypatch.setattr("open_webui.utils.chat_buffer.Chats", fake)
+    return fake
+
+
+@pytest.fixture
+def buffer():
+    # Long interval so only explicit flushes write during a test
+    return ChatWriteBuffer(flush_interval=60, max_pending=100)
+
+
+class TestChatWriteBuffer:
+    @pytest.mark.asyncio
+    async def test_updates_are_coalesced_into_one_write(self, chats, buffer):
+        buffer.upsert_message("chat", "msg", {"role": "assistant", "content": "He"})
+        buffer.append_content("chat", "msg", "llo")
+        buffer.upsert_message("chat", "msg", {"done": True})
+
+        assert chats.calls == []
+        await buffer.flush()
+
+        assert chats.calls == [
+            (
+                "upsert",
+                "chat",
+                "msg",
+                {"role": "assistant", "content": "Hello", "done": True},
+            )
+        ]
+
+    @pytest.mark.asyncio
+    async def test_appends_without_content_are_written_as_append(self, chats, buffer):
+        buffer.append_content("chat", "msg", "a")
+        buffer.append_content("chat", "msg", "b")
+        buffer.add_status("chat", "msg", {"done": False})
+
+        await buffer.flush()
+
+        assert chats.calls == [
+            ("append", "chat", "msg", "ab"),
+            ("status", "chat", "msg", {"done": False}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_full_content_update_discards_earlier_appends(self, chats, buffer):
+        buffer.append_content("chat", "msg", "stale")
+        buffer.upsert_message("chat", "msg", {"content": "fresh"})
+
+        await buffer.flush()
+
+        assert chats.calls == [("upsert", "chat", "msg", {"content": "fresh"})]
+
+    @pytest.mark.asyncio
+    async def test_flush_only_selected_chat(self, chats, buffer):
+        buffer.append_content("a", "msg", "1")
+        buffer.append_content("b", "msg", "2")
+
+        await buffer.flush("a")
+
+        assert chats.calls == [("append", "a", "msg", "1")]
+        assert list(buffer._pending) == [("b", "msg")]
+
+    @pytest.mark.asyncio
+    async def test_max_pending_triggers_flush(self, chats):
+        buffer = ChatWriteBuffer(flush_interval=60, max_pending=3)
+        for token in "abc":
+            buffer.append_content("chat", "msg", token)
+
+        await asyncio.sleep(0.1)
+
+        assert chats.calls == [("append", "chat", "msg", "abc")]
+
+    @pytest.mark.asyncio
+    async def test_background_task_flushes_after_interval(self, chats):
+        buffer = ChatWriteBuffer(flush_interval=0.01, max_pending=100)
+        buffer.append_content("chat", "msg", "a")
+
+        await asyncio.sleep(0.1)
+
+        assert chats.calls == [("append", "chat", "msg", "a")]
+        assert buffer._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_updates(self, chats, buffer):
+        buffer.append_content("chat", "msg", "a")
+        chats.fail = True
+        await buffer.flush()
+
+        # Updates buffered after the failure go on top of the retained ones
+        buffer.append_content("chat", "msg", "b")
+        chats.fail = False
+        await buffer.flush()
+
+        assert chats.calls == [("append", "chat", "msg", "ab")]
+
+    @pytest.mark.asyncio
+    async def test_retry_skips_parts_already_written(self, chats, buffer):
+        buffer.append_content("chat", "msg", "a")
+        buffer.upsert_message("chat", "msg", {"done": True})
+        buffer.add_status("chat", "msg", {"done": False})
+        chats.fail_on = {"upsert"}
+        await buffer.flush()
+
+        chats.fail_on = set()
+        await buffer.flush()
+
+        assert chats.calls == [
+            ("append", "chat", "msg", "a"),
+            ("upsert", "chat", "msg", {"done": True}),
+            ("status", "chat", "msg", {"done": False}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_flush_sync_writes_everything(self, chats, buffer):
+        buffer.append_content("a", "msg", "1")
+        buffer.append_content("b", "msg", "2")
+
+        buffer.flush_sync()
+
+        assert sorted(chats.calls) == [
+            ("append", "a", "msg", "1"),
+            ("append", "b", "msg", "2"),
+        ]
+        assert buffer._pending == {}
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from open_webui.utils.executors import BoundedExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def hold(executor, count=1):
+    """Occupy `count` slots until the returned event is set"""
+    release = threading.Event()
+    for _ in range(count):
+        executor.submit(release.wait, 5)
+    return release
+
+
+class TestBoundedExecutor:
+    def test_submit_and_map(self, executor):
+        assert executor.submit(lambda x: x * 2, 21).result(5) == 42
+        assert executor.map(lambda x, y: x + y, [1, 2], [10, 20]) == [11, 22]
+
+        stats = executor.stats()
+        assert stats["submitted"] == 3
+        assert stats["completed"] == 3
+
+    def test_failures_are_counted(self, executor):
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            executor.submit(fail).result(5)
+        assert executor.stats()["failed"] == 1
+
+    def test_submit_blocks_when_saturated(self, executor):
+        release = hold(executor, 2)
+        submitted = threading.Event()
+
+        def submit():
+            executor.submit(lambda: None).result(5)
+            submitted.set()
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+
+        assert not submitted.wait(0.1)
+        assert executor.stats()["blocked"] == 1
+
+        release.set()
+        thread.join(5)
+        assert submitted.is_set()
+
+    def test_submit_from_own_thread_runs_inline(self, executor):
+        def outer():
+            return executor.submit(threading.current_thread).result()
+
+        assert executor.submit(outer).result(5) is not threading.current_thread()
+        assert executor.stats()["inline"] == 1
+
+    def test_wait_includes_time_blocked_on_a_slot(self):
+        executor = BoundedExecutor("wait", max_workers=1, max_queue=0)
+        release = hold(executor)
+        future = []
+        thread = threading.Thread(
+            target=lambda: future.append(executor.submit(lambda: None))
+        )
+        thread.start()
+        time.sleep(0.2)
+        release.set()
+        thread.join(5)
+        future[0].result(5)
+
+        assert executor.stats()["max_wait"] >= 0.2
+        executor.shutdown(wait=False)
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self, executor):
+        assert await executor.run(lambda x: x + 1, 1) == 2
+
+    @pytest.mark.asyncio
+    async def test_run_waits_without_blocking_the_loop(self, executor):
+        release = hold(executor, 2)
+        task = asyncio.create_task(executor.run(lambda: "done"))
+
+        # The loop keeps running while the task waits for a slot
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        assert executor.stats()["blocked"] == 1
+
+        release.set()
+        assert await asyncio.wait_for(task, 5) == "done"
+
+    @pytest.mark.asyncio
+    async def test_run_admits_waiters_in_order(self):
+        executor = BoundedExecutor("fifo", max_workers=1, max_queue=0)
+        release = hold(executor)
+        order = []
+
+        tasks = []
+        for i in range(5):
+            tasks.append(asyncio.create_task(executor.run(order.append, i)))
+            await asyncio.sleep(0.01)
+
+        release.set()
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+
+        assert order == [0, 1, 2, 3, 4]
+        executor.shutdown(wait=False)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_gives_its_slot_back(self, executor):
+        release = hold(executor, 2)
+        task = asyncio.create_task(executor.run(lambda: None))
+        await asyncio.sleep(0.05)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+
+        # Both slots are free again once the held tasks finish
+        await asyncio.wait_for(
+            asyncio.gather(executor.run(time.sleep, 0), executor.run(time.sleep, 0)),
+            5,
+        )
+        await asyncio.sleep(0.05)
+        assert executor.stats()["queue_depth"] == 0
+        assert executor._slots.acquire(blocking=False)
+        assert executor._slots.acquire(blocking=False)
+        assert not executor._slots.acquire(blocking=False)
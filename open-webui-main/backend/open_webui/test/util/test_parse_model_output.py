@@ -0,0 +1,103 @@
+import json
+
+from open_webui.utils.parseModelOutput import IncrementalQuestionParser
+
+QUESTIONS = [
+    {
+        "type": "choice_question",
+        "question": "Which library handles dates? {datetime}",
+        "options": ["random", "datetime", "time", "date"],
+        "answer": 1,
+        "explanation": 'The answer is "datetime".',
+    },
+    {
+        "type": "true_false_question",
+        "question": "Galois was an American mathematician",
+        "answer": False,
+        "explanation": "He was French.",
+    },
+    {
+        "type": "multiple_choice_question",
+        "question": "Pick 0, 2 and 3",
+        "options": ["a", "b", "c", "d"],
+        "answer": [0, 2, 3],
+        "explanation": "",
+    },
+]
+
+OUTPUT = (
+    "```json\n"
+    + json.dumps(
+        {"questions": {"type": "question", "questions": QUESTIONS}},
+        ensure_ascii=False,
+        indent=2,
+    )
+    + "\n```"
+)
+
+
+def feed_in_chunks(parser, text, size):
+    questions = []
+    for start in range(0, len(text), size):
+        questions.extend(parser.feed(text[start : start + size]))
+    return questions
+
+
+class TestIncrementalQuestionParser:
+    def test_whole_output(self):
+        questions = IncrementalQuestionParser().feed(OUTPUT)
+
+        assert [q["question"] for q in questions] == [q["question"] for q in QUESTIONS]
+        assert [q["answer"] for q in questions] == [1, False, [0, 2, 3]]
+
+    def test_chunk_boundaries_do_not_matter(self):
+        """Objects split across any chunk boundary parse the same"""
+        expected = IncrementalQuestionParser().feed(OUTPUT)
+
+        for size in (1, 2, 7, 64):
+            assert feed_in_chunks(IncrementalQuestionParser(), OUTPUT, size) == expected
+
+    def test_question_returned_as_soon_as_it_closes(self):
+        parser = IncrementalQuestionParser()
+        first_end = OUTPUT.index("}", OUTPUT.index('"explanation"')) + 1
+
+        assert len(parser.feed(OUTPUT[: first_end - 1])) == 0
+        assert len(parser.feed(OUTPUT[first_end - 1 : first_end])) == 1
+
+    def test_braces_and_escaped_quotes_inside_strings(self):
+        questions = IncrementalQuestionParser().feed(OUTPUT)
+
+        assert questions[0]["question"] == "Which library handles dates? {datetime}"
+        assert questions[0]["explanation"] == 'The answer is "datetime".'
+
+    def test_malformed_question_is_skipped(self):
+        text = (
+            '{"questions": {"type": "question", "questions": ['
+            '{"type": "choice_question", "question": "broken", "answer": 1,, }, '
+            '{"type": "choice_question", "question": "ok", "options": ["a"], '
+            '"answer": 0, "explanation": "x"}]}}'
+        )
+
+        questions = IncrementalQuestionParser().feed(text)
+
+        assert [q["question"] for q in questions] == ["ok"]
+
+    def test_python_literals_are_normalized(self):
+        text = (
+            "{'type': 'true_false_question', 'question': 'Is it?', "
+            "'answer': True, 'explanation': 'Yes'}"
+        )
+
+        questions = IncrementalQuestionParser().feed(text)
+
+        assert questions[0]["answer"] is True
+
+    def test_objects_without_question_are_ignored(self):
+        assert IncrementalQuestionParser().feed('{"type": "question"}') == []
+
+    def test_buffer_is_trimmed_between_objects(self):
+        parser = IncrementalQuestionParser()
+        parser.feed('{"question": "a", "answer": 0, "explanation": ""} trailing')
+
+        assert parser.buffer == ""
+        assert parser.pos == 0
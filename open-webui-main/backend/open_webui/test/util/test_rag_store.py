@@ -0,0 +1,299 @@
+import gc
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.utils.rag_store import (
+    KnowledgeBaseStore,
+    VectorStoreCache,
+    SEGMENT_DIR,
+    ORPHAN_AGE,
+)
+
+DIMENSION = 16
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings: identical texts get identical vectors"""
+
+    def _embed(self, text):
+        rng = np.random.default_rng(zlib.crc32(text.encode()))
+        return rng.normal(size=DIMENSION).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def make_docs(prefix, count):
+    return [
+        Document(page_content=f"{prefix} chunk {i}", metadata={"source": prefix})
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KnowledgeBaseStore(str(tmp_path / "kb"), FakeEmbeddings())
+
+
+class TestKnowledgeBaseStore:
+    def test_add_documents_appends_segment(self, store):
+        """Each upload is written as one new segment"""
+        ids = store.add_documents(make_docs("a", 3), document_id="a")
+        store.add_documents(make_docs("b", 2), document_id="b")
+
+        assert len(ids) == 3
+        assert store.count == 5
+        assert len(store.segments) == 2
+        assert len(os.listdir(store.segment_dir)) == 2
+
+    def test_search_returns_exact_match_first(self, store):
+        store.add_documents(make_docs("a", 5))
+
+        results = store.similarity_search_with_score("a chunk 3", k=2)
+
+        assert len(results) == 2
+        assert results[0][0].page_content == "a chunk 3"
+        assert results[0][0].metadata == {"source": "a"}
+        assert results[0][1] == pytest.approx(0.0, abs=1e-5)
+
+    def test_reopen_reads_committed_segments(self, store):
+        store.add_documents(make_docs("a", 3))
+
+        reopened = KnowledgeBaseStore(store.directory, FakeEmbeddings())
+
+        assert reopened.count == 3
+        assert reopened.similarity_search("a chunk 1", k=1)[0].page_content == (
+            "a chunk 1"
+        )
+
+    def test_delete_document_hides_its_chunks(self, store, monkeypatch):
+        # Keep the tombstones instead of compacting right away
+        monkeypatch.setattr("open_webui.utils.rag_store.TOMBSTONE_RATIO", 1.0)
+        store.add_documents(make_docs("a", 3), document_id="a")
+        store.add_documents(make_docs("b", 3), document_id="b")
+
+        assert store.delete_document("a") == 3
+        assert store.count == 3
+        assert store.tombstone_ratio == pytest.approx(0.5)
+
+        results = store.similarity_search("a chunk 0", k=3)
+        assert [doc.metadata["source"] for doc in results] == ["b", "b", "b"]
+
+    def test_delete_unknown_ids(self, store):
+        store.add_documents(make_docs("a", 2))
+
+        assert store.delete(["missing"]) == 0
+        assert store.delete([]) == 0
+        assert store.count == 2
+
+    def test_delete_counts_per_segment_in_batches(self, store, monkeypatch):
+        monkeypatch.setattr("open_webui.utils.rag_store.TOMBSTONE_RATIO", 1.0)
+        monkeypatch.setattr("open_webui.utils.rag_store.ID_BATCH_SIZE", 2)
+        a_ids = store.add_documents(make_docs("a", 3))
+        b_ids = store.add_documents(make_docs("b", 3))
+
+        # Duplicate ids are only counted once
+        assert store.delete(a_ids + b_ids[:1] + a_ids[:1]) == 4
+        assert store.segment_deleted == {1: 3, 2: 1}
+        assert store.count == 2
+
+    def test_compact_merges_segments_and_drops_deleted(self, store, monkeypatch):
+        monkeypatch.setattr("open_webui.utils.rag_store.TOMBSTONE_RATIO", 1.0)
+        for name in ("a", "b", "c"):
+            store.add_documents(make_docs(name, 4), document_id=name)
+        store.delete_document("b")
+
+        store.compact()
+
+        assert len(store.segments) == 1
+        assert store.tombstone_ratio == 0.0
+        assert store.count == 8
+        assert len(os.listdir(store.segment_dir)) == 1
+        assert store.similarity_search("c chunk 2", k=1)[0].page_content == (
+            "c chunk 2"
+        )
+
+        reopened = KnowledgeBaseStore(store.directory, FakeEmbeddings())
+        assert reopened.count == 8
+        assert len(reopened.segments) == 1
+
+    def test_delete_compacts_past_tombstone_ratio(self, store):
+        store.add_documents(make_docs("a", 4), document_id="a")
+        store.add_documents(make_docs("b", 4), document_id="b")
+
+        store.delete_document("a")
+
+        assert len(store.segments) == 1
+        assert store.tombstone_ratio == 0.0
+        assert store.count == 4
+
+    def test_compact_past_max_segments(self, store, monkeypatch):
+        monkeypatch.setattr("open_webui.utils.rag_store.MAX_SEGMENTS", 2)
+
+        for name in ("a", "b", "c"):
+            store.add_documents(make_docs(name, 2))
+
+        assert len(store.segments) == 1
+        assert store.count == 6
+        assert len(os.listdir(os.path.join(store.directory, SEGMENT_DIR))) == 1
+
+    def test_segment_ids_come_from_sqlite(self, store):
+        """Two instances on one directory never write the same segment file"""
+        other = KnowledgeBaseStore(store.directory, FakeEmbeddings())
+
+        store.add_documents(make_docs("a", 2))
+        other.add_documents(make_docs("b", 2))
+
+        assert set(store.segments) == {1}
+        assert set(other.segments) == {2}
+        reopened = KnowledgeBaseStore(store.directory, FakeEmbeddings())
+        assert reopened.count == 4
+        assert set(reopened.segments) == {1, 2}
+
+    def test_open_removes_only_stale_uncommitted_files(self, store):
+        stale = os.path.join(store.segment_dir, "seg_000042.faiss")
+        recent = os.path.join(store.segment_dir, "seg_000043.faiss")
+        for path in (stale, recent):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+        old = time.time() - ORPHAN_AGE - 1
+        os.utime(stale, (old, old))
+
+        KnowledgeBaseStore(store.directory, FakeEmbeddings())
+
+        assert not os.path.exists(stale)
+        # May still be written by another process
+        assert os.path.exists(recent)
+
+
+class FakeStore:
+    """Weak-referenceable stand-in for KnowledgeBaseStore"""
+
+    def __init__(self, key):
+        self.key = key
+
+
+class TestVectorStoreCache:
+    def test_loads_once_and_counts_hits(self):
+        loads = []
+
+        def loader(key):
+            loads.append(key)
+            return FakeStore(key)
+
+        cache = VectorStoreCache(loader, max_size=2)
+
+        assert cache.get("a") is cache.get("a")
+        assert loads == ["a"]
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["load_count"] == 1
+
+    def test_missing_store_is_not_cached(self):
+        cache = VectorStoreCache(lambda key: None)
+
+        assert cache.get("a") is None
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+        assert cache.stats()["load_count"] == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = VectorStoreCache(FakeStore, max_size=2)
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+        gc.collect()
+
+        assert list(cache._stores) == ["a", "c"]
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicted_store_in_use_is_reused(self):
+        """A store still referenced after eviction is never opened twice"""
+        loads = []
+
+        def loader(key):
+            loads.append(key)
+            return FakeStore(key)
+
+        cache = VectorStoreCache(loader, max_size=1)
+        in_use = cache.get("a")
+        cache.get("b")
+
+        assert "a" not in cache._stores
+        assert cache.get("a") is in_use
+        assert loads == ["a", "b"]
+
+    def test_evicted_store_released_is_reloaded(self):
+        cache = VectorStoreCache(FakeStore, max_size=1)
+        cache.get("a")
+        cache.get("b")
+        gc.collect()
+
+        cache.get("a")
+
+        assert cache.stats()["load_count"] == 3
+
+    def test_pop_forgets_store(self):
+        cache = VectorStoreCache(FakeStore)
+        store = cache.get("a")
+
+        assert cache.pop("a") is store
+        assert cache.get("a") is not store
+
+    def test_slow_load_does_not_block_other_keys(self):
+        release = threading.Event()
+        loading = threading.Event()
+
+        def loader(key):
+            if key == "slow":
+                loading.set()
+                release.wait(5)
+            return FakeStore(key)
+
+        cache = VectorStoreCache(loader)
+        thread = threading.Thread(target=cache.get, args=("slow",))
+        thread.start()
+        loading.wait(5)
+
+        assert cache.get("fast").key == "fast"
+
+        release.set()
+        thread.join(5)
+        assert cache.get("slow").key == "slow"
+        assert cache.stats()["load_count"] == 2
+
+    def test_concurrent_gets_load_once(self):
+        loads = []
+        release = threading.Event()
+
+        def loader(key):
+            loads.append(key)
+            release.wait(5)
+            return FakeStore(key)
+
+        cache = VectorStoreCache(loader)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get("a")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert loads == ["a"]
+        assert len({id(store) for store in results}) == 1
@@ -0,0 +1,172 @@
+import json
+
+import pytest
+
+from open_webui.utils import ttl_cache
+from open_webui.utils.ttl_cache import INSTANCE_ID, TTLCache, handle_invalidation
+
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(ttl_cache, "_get_redis", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(monkeypatch, redis):
+    monkeypatch.setattr(ttl_cache, "_caches", {})
+    return TTLCache("test", ttl=10, maxsize=2)
+
+
+class TestTTLCache:
+    def test_get_returns_cached_value(self, cache):
+        cache.set("a", {"name": "a"})
+
+        assert cache.get("a") == {"name": "a"}
+        assert cache.get("missing", "default") == "default"
+
+    def test_values_are_copied(self, cache):
+        """Mutating a value does not change the cached record"""
+        value = {"groups": ["x"]}
+        cache.set("a", value)
+        value["groups"].append("y")
+        cache.get("a")["groups"].append("z")
+
+        assert cache.get("a") == {"groups": ["x"]}
+
+    def test_entries_expire_after_ttl(self, cache, clock):
+        cache.set("a", 1)
+
+        clock[0] += 9.9
+        assert cache.get("a") == 1
+        clock[0] += 0.1
+        assert cache.get("a") is None
+        assert "a" not in cache._entries
+
+    def test_replace_keeps_expiry(self, cache, clock):
+        cache.set("a", 1)
+
+        clock[0] += 5
+        cache.replace("a", 2)
+        cache.replace("missing", 3)
+
+        assert cache.get("a") == 2
+        assert cache.get("missing") is None
+        clock[0] += 5
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self, cache):
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    @pytest.mark.parametrize("ttl,maxsize", [(0, 2), (10, 0)])
+    def test_disabled_cache_stores_nothing(self, ttl, maxsize, monkeypatch):
+        monkeypatch.setattr(ttl_cache, "_caches", {})
+        cache = TTLCache("disabled", ttl=ttl, maxsize=maxsize)
+        cache.set("a", 1)
+
+        assert not cache.enabled
+        assert cache.get("a") is None
+
+    def test_delete_broadcasts_keys(self, cache, redis):
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.delete("a")
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        [(_, message)] = redis.published
+        assert message["action"] == "invalidate_cache"
+        assert message["cache"] == "test"
+        assert message["keys"] == ["a"]
+        assert message["instance_id"] == INSTANCE_ID
+
+    def test_clear_broadcasts_without_keys(self, cache, redis):
+        cache.set("a", 1)
+
+        cache.clear()
+
+        assert cache.get("a") is None
+        assert redis.published[0][1]["keys"] is None
+
+    def test_local_invalidation_is_not_broadcast(self, cache, redis):
+        cache.delete("a", broadcast=False)
+        cache.clear(broadcast=False)
+
+        assert redis.published == []
+
+    def test_broadcast_failure_is_ignored(self, cache, monkeypatch):
+        def fail():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(ttl_cache, "_get_redis", fail)
+        cache.set("a", 1)
+
+        cache.delete("a")
+
+        assert cache.get("a") is None
+
+
+class TestHandleInvalidation:
+    def command(self, keys, instance_id="other-worker", name="test"):
+        return {
+            "action": "invalidate_cache",
+            "cache": name,
+            "keys": keys,
+            "instance_id": instance_id,
+        }
+
+    def test_deletes_keys_from_other_workers(self, cache, redis):
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        handle_invalidation(self.command(["a"]))
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        # Applying a remote invalidation does not broadcast it again
+        assert redis.published == []
+
+    def test_clears_when_no_keys(self, cache):
+        cache.set("a", 1)
+
+        handle_invalidation(self.command(None))
+
+        assert cache.get("a") is None
+
+    def test_ignores_own_broadcasts(self, cache):
+        cache.set("a", 1)
+
+        handle_invalidation(self.command(None, instance_id=INSTANCE_ID))
+
+        assert cache.get("a") == 1
+
+    def test_ignores_unknown_cache(self, cache):
+        cache.set("a", 1)
+
+        handle_invalidation(self.command(None, name="unknown"))
+
+        assert cache.get("a") == 1
@@ -111,12 +111,13 @@ def has_access(
     user_id: str,
     type: str = "write",
     access_control: Optional[dict] = None,
+    user_group_ids: Optional[set[str]] = None,
 ) -> bool:
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    if user_group_ids is None:
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
@@ -126,6 +127,20 @@ def has_access(
     )
 
 
+def filter_accessible(user_id: str, items: list, type: str = "write") -> list:
+    """
+    Items (with `user_id` and `access_control`) owned by or shared with a user.
+    The user's groups are looked up once for the whole list.
+    """
+    user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+    return [
+        item
+        for item in items
+        if item.user_id == user_id
+        or has_access(user_id, type, item.access_control, user_group_ids)
+    ]
+
+
 # Get all users with access to a resource
 def get_users_with_access(
     type: str = "write", access_control: Optional[dict] = None
@@ -138,10 +153,6 @@ def get_users_with_access(
     permitted_user_ids = permission_access.get("user_ids", [])
 
     user_ids_with_access = set(permitted_user_ids)
-
-    for group_id in permitted_group_ids:
-        group_user_ids = Groups.get_group_user_ids_by_id(group_id)
-        if group_user_ids:
-            user_ids_with_access.update(group_user_ids)
+    user_ids_with_access.update(Groups.get_member_ids_by_group_ids(permitted_group_ids))
 
     return Users.get_users_by_user_ids(list(user_ids_with_access))
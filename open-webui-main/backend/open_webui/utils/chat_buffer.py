@@ -0,0 +1,189 @@
+import asyncio
+import atexit
+import logging
+from typing import Optional
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    ENABLE_CHAT_WRITE_BUFFER,
+    CHAT_WRITE_BUFFER_FLUSH_INTERVAL,
+    CHAT_WRITE_BUFFER_MAX_PENDING,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class _PendingMessage:
+    def __init__(self):
+        self.message: dict = {}
+        # Content appended after the last full "content" update
+        self.appended = ""
+        self.statuses: list[dict] = []
+        self.updates = 0
+
+    def merge(self, other: "_PendingMessage"):
+        """Merge newer pending updates (`other`) on top of this one."""
+        if "content" in other.message:
+            self.appended = other.appended
+        elif "content" in self.message:
+            self.message["content"] += other.appended
+        else:
+            self.appended += other.appended
+        self.message = {**self.message, **other.message}
+        self.statuses.extend(other.statuses)
+        self.updates += other.updates
+
+
+class ChatWriteBuffer:
+    """
+    Write-behind buffer for chat message updates issued while a response streams.
+
+    Updates are coalesced in memory per (chat_id, message_id) and written by a
+    background task every `flush_interval` seconds, when a message accumulates
+    `max_pending` updates, or when the stream ends (`flush`). DB writes run in a
+    worker thread so they never block the event loop. A failed flush keeps the
+    updates buffered for the next attempt, and pending updates are written
+    synchronously at interpreter exit, so at most one interval is lost on a crash.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: dict[tuple[str, str], _PendingMessage] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _entry(self, chat_id: str, message_id: str) -> _PendingMessage:
+        key = (chat_id, message_id)
+        if key not in self._pending:
+            self._pending[key] = _PendingMessage()
+        entry = self._pending[key]
+        entry.updates += 1
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._run())
+        return entry
+
+    def _maybe_flush(self, chat_id: str, message_id: str, entry: _PendingMessage):
+        if entry.updates >= self.max_pending:
+            entry.updates = 0
+            asyncio.get_running_loop().create_task(self.flush(chat_id, message_id))
+
+    def upsert_message(self, chat_id: str, message_id: str, message: dict):
+        entry = self._entry(chat_id, message_id)
+        if "content" in message:
+            entry.appended = ""
+        entry.message = {**entry.message, **message}
+        self._maybe_flush(chat_id, message_id, entry)
+
+    def append_content(self, chat_id: str, message_id: str, content: str):
+        entry = self._entry(chat_id, message_id)
+        if "content" in entry.message:
+            entry.message["content"] += content
+        else:
+            entry.appended += content
+        self._maybe_flush(chat_id, message_id, entry)
+
+    def add_status(self, chat_id: str, message_id: str, status: dict):
+        entry = self._entry(chat_id, message_id)
+        entry.statuses.append(status)
+        self._maybe_flush(chat_id, message_id, entry)
+
+    @staticmethod
+    def _write(chat_id: str, message_id: str, entry: _PendingMessage):
+        # Each part is cleared once written, so a retry after a later part
+        # fails does not write it (and append the content) twice
+        if entry.appended:
+            Chats.append_content_to_message_by_id_and_message_id(
+                chat_id, message_id, entry.appended
+            )
+            entry.appended = ""
+        if entry.message:
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                chat_id, message_id, entry.message
+            )
+            entry.message = {}
+        while entry.statuses:
+            Chats.add_message_status_to_chat_by_id_and_message_id(
+                chat_id, message_id, entry.statuses[0]
+            )
+            entry.statuses.pop(0)
+
+    async def flush(self, chat_id: Optional[str] = None, message_id: str = None):
+        """Write pending updates, all of them or only those of one chat/message."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        # Serialized so updates of the same message are written in order
+        async with self._flush_lock:
+            keys = [
+                key
+                for key in self._pending
+                if (chat_id is None or key[0] == chat_id)
+                and (message_id is None or key[1] == message_id)
+            ]
+
+            for key in keys:
+                entry = self._pending.pop(key, None)
+                if entry is None:
+                    continue
+                try:
+                    await asyncio.to_thread(self._write, *key, entry)
+                except Exception as e:
+                    log.exception(f"Error flushing chat message {key}: {e}")
+                    # Keep the updates, newer ones buffered meanwhile go on top
+                    if key in self._pending:
+                        entry.merge(self._pending[key])
+                    self._pending[key] = entry
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.exception(f"Error flushing chat write buffer: {e}")
+
+    def flush_sync(self):
+        """Last-resort flush when no event loop is available (interpreter exit)."""
+        while self._pending:
+            key, entry = self._pending.popitem()
+            try:
+                self._write(*key, entry)
+            except Exception as e:
+                log.exception(f"Error flushing chat message {key}: {e}")
+
+
+class _WriteThrough:
+    """Used when the buffer is disabled: every update is written immediately."""
+
+    def upsert_message(self, chat_id: str, message_id: str, message: dict):
+        Chats.upsert_message_to_chat_by_id_and_message_id(chat_id, message_id, message)
+
+    def append_content(self, chat_id: str, message_id: str, content: str):
+        Chats.append_content_to_message_by_id_and_message_id(
+            chat_id, message_id, content
+        )
+
+    def add_status(self, chat_id: str, message_id: str, status: dict):
+        Chats.add_message_status_to_chat_by_id_and_message_id(
+            chat_id, message_id, status
+        )
+
+    async def flush(self, chat_id: Optional[str] = None, message_id: str = None):
+        pass
+
+    def flush_sync(self):
+        pass
+
+
+CHAT_WRITE_BUFFER = (
+    ChatWriteBuffer(CHAT_WRITE_BUFFER_FLUSH_INTERVAL, CHAT_WRITE_BUFFER_MAX_PENDING)
+    if ENABLE_CHAT_WRITE_BUFFER
+    else _WriteThrough()
+)
+
+atexit.register(CHAT_WRITE_BUFFER.flush_sync)
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    EXECUTOR_POOL_SIZES,
+    EXECUTOR_QUEUE_FACTOR,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Worker threads per pool unless overridden by EXECUTOR_POOL_SIZES
+DEFAULT_POOL_SIZES = {
+    # get_sources_from_items, one task per chat completion with files
+    "retrieval": 16,
+    # (query, collection) searches fanned out by a retrieval task; a separate
+    # pool so retrieval tasks never wait on slots held by themselves
+    "vector_search": 32,
+    # batches sent to remote embedding engines
+    "embedding": 4,
+    # audio chunks sent to the transcription engine
+    "audio": 4,
+    # document ingestion and vector store maintenance
+    "file_processing": 2,
+    # pgvector index builds, one at a time
+    "vector_index": 1,
+}
+
+_local = threading.local()
+
+
+class BoundedExecutor:
+    """
+    Named, fixed-size thread pool shared by the whole process.
+
+    At most `max_workers + max_queue` tasks are in flight; further submits block
+    until one finishes, so bursts queue behind a known number of threads instead
+    of spawning new ones. `run` waits without blocking the event loop, and
+    coroutines waiting for a slot are admitted in arrival order. A task
+    submitted from one of the pool's own threads runs inline, as waiting for a
+    slot there could deadlock the pool.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-pool"
+        )
+        self._slots = threading.Semaphore(max_workers + max_queue)
+        # Queues coroutines waiting in `run`, created on first use in the loop
+        self._admission: Optional[asyncio.Lock] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._active = 0
+        self._stats = {
+            "submitted": 0,
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "inline": 0,
+            "blocked": 0,
+            "rejected": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+            "run_total": 0.0,
+        }
+
+    def _wrap(
+        self, fn: Callable, args: tuple, kwargs: dict, submitted_at: float
+    ) -> Callable:
+        def task():
+            started = time.perf_counter()
+            wait = started - submitted_at
+            with self._lock:
+                self._active += 1
+                self._stats["started"] += 1
+                self._stats["wait_total"] += wait
+                self._stats["wait_max"] = max(self._stats["wait_max"], wait)
+
+            _local.pool = self.name
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _local.pool = None
+                with self._lock:
+                    self._active -= 1
+                    self._stats["run_total"] += time.perf_counter() - started
+
+        return task
+
+    def _submit(
+        self, fn: Callable, args: tuple, kwargs: dict, submitted_at: float
+    ) -> Future:
+        # The caller holds a slot, released once the task is done
+        with self._lock:
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+        try:
+            future = self._executor.submit(self._wrap(fn, args, kwargs, submitted_at))
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Optional[Future]):
+        self._slots.release()
+        with self._lock:
+            self._in_flight -= 1
+            if future is None:
+                return
+            if future.cancelled() or future.exception() is not None:
+                self._stats["failed"] += 1
+            else:
+                self._stats["completed"] += 1
+
+    def _run_inline(self, fn: Callable, args: tuple, kwargs: dict) -> Future:
+        with self._lock:
+            self._stats["inline"] += 1
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if getattr(_local, "pool", None) == self.name:
+            return self._run_inline(fn, args, kwargs)
+
+        # Waiting for a slot counts towards the task's queue wait
+        submitted_at = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["blocked"] += 1
+            self._slots.acquire()
+        return self._submit(fn, args, kwargs, submitted_at)
+
+    def try_submit(self, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """
+        Submit only if a slot is free, otherwise return None. Nothing waits, so
+        this is also safe from the pool's own threads (the task is queued).
+        """
+        submitted_at = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            return None
+        return self._submit(fn, args, kwargs, submitted_at)
+
+    def map(self, fn: Callable, *iterables) -> list:
+        """Like ThreadPoolExecutor.map, but returns the results as a list."""
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return [future.result() for future in futures]
+
+    async def _acquire_slot(self):
+        if self._admission is None:
+            self._admission = asyncio.Lock()
+        if not self._admission.locked() and self._slots.acquire(blocking=False):
+            return
+
+        # One coroutine at a time waits for the next free slot in a thread, the
+        # others queue on the lock in arrival order
+        async with self._admission:
+            if self._slots.acquire(blocking=False):
+                return
+            with self._lock:
+                self._stats["blocked"] += 1
+            acquire = asyncio.get_running_loop().run_in_executor(
+                None, self._slots.acquire
+            )
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                # The thread still gets the slot, hand it back
+                acquire.add_done_callback(lambda _: self._slots.release())
+                raise
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Await `fn` on the pool, waiting off the event loop while it is saturated."""
+        submitted_at = time.perf_counter()
+        await self._acquire_slot()
+        return await asyncio.wrap_future(self._submit(fn, args, kwargs, submitted_at))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = self._in_flight
+            active = self._active
+        started = stats["started"] or 1
+        finished = (stats["started"] - active) or 1
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": active,
+            "queue_depth": in_flight - active,
+            "submitted": stats["submitted"],
+            "completed": stats["completed"],
+            "failed": stats["failed"],
+            "inline": stats["inline"],
+            "blocked": stats["blocked"],
+            "rejected": stats["rejected"],
+            "avg_wait": stats["wait_total"] / started,
+            "max_wait": stats["wait_max"],
+            "avg_run": stats["run_total"] / finished,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_executors: dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str, max_workers: Optional[int] = None) -> BoundedExecutor:
+    """
+    Return the shared pool `name`, created on first use. EXECUTOR_POOL_SIZES
+    takes precedence over `max_workers`, which takes precedence over the
+    defaults above.
+    """
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            workers = EXECUTOR_POOL_SIZES.get(
+                name, max_workers or DEFAULT_POOL_SIZES.get(name, 4)
+            )
+            executor = BoundedExecutor(
+                name, workers, workers * max(0, EXECUTOR_QUEUE_FACTOR)
+            )
+            _executors[name] = executor
+            log.debug(f"Created executor pool {name} with {workers} workers")
+        return executor
+
+
+def get_executors_stats() -> list[dict]:
+    with _executors_lock:
+        return [executor.stats() for executor in _executors.values()]
+
+
+def shutdown_executors(wait: bool = False):
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
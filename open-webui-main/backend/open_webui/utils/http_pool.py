@@ -0,0 +1,77 @@
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_POOL_LIMIT,
+    AIOHTTP_POOL_LIMIT_PER_HOST,
+    AIOHTTP_POOL_KEEPALIVE_TIMEOUT,
+    AIOHTTP_POOL_DNS_CACHE_TTL,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class HTTPSessionPool:
+    """
+    Long-lived aiohttp sessions, one per upstream base URL (scheme://host:port).
+
+    Reusing a session keeps connections alive between requests, so chat turns
+    and model-list fetches do not pay TCP/TLS setup every time. Sessions carry
+    no timeout of their own; callers pass one per request. Responses must be
+    released (not the session closed) when done, which returns the connection
+    to the pool.
+    """
+
+    def __init__(
+        self,
+        limit: int = AIOHTTP_POOL_LIMIT,
+        limit_per_host: int = AIOHTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = AIOHTTP_POOL_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = AIOHTTP_POOL_DNS_CACHE_TTL,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+
+    @staticmethod
+    def _base_url(url: str) -> str:
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        base_url = self._base_url(url)
+        session = self._sessions.get(base_url)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    use_dns_cache=True,
+                ),
+                trust_env=True,
+            )
+            self._sessions[base_url] = session
+            log.debug(f"Created HTTP session pool for {base_url}")
+        return session
+
+    async def close(self):
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
+
+
+HTTP_SESSION_POOL = HTTPSessionPool()
+
+
+def get_session(url: str) -> aiohttp.ClientSession:
+    return HTTP_SESSION_POOL.get_session(url)
+
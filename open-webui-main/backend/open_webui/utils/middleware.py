@@ -15,7 +15,6 @@ import re
 import ast
 
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 
 
 from fastapi import Request, HTTPException
@@ -23,6 +22,8 @@ from starlette.responses import Response, StreamingResponse
 
 
 from open_webui.models.chats import Chats
+from open_webui.utils.chat_buffer import CHAT_WRITE_BUFFER
+from open_webui.utils.executors import get_executor
 from open_webui.models.folders import Folders
 from open_webui.models.users import Users
 from open_webui.socket.main import (
@@ -639,36 +640,33 @@ async def chat_completion_files_handler(
             queries = [get_last_user_message(body["messages"])]
 
         try:
-            # Offload get_sources_from_items to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_items(
-                        request=request,
-                        items=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
-                        k=request.app.state.config.TOP_K,
-                        reranking_function=(
-                            (
-                                lambda sentences: request.app.state.RERANKING_FUNCTION(
-                                    sentences, user=user
-                                )
+            # Offload get_sources_from_items to the shared retrieval pool
+            sources = await get_executor("retrieval").run(
+                lambda: get_sources_from_items(
+                    request=request,
+                    items=files,
+                    queries=queries,
+                    embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                        query, prefix=prefix, user=user
+                    ),
+                    k=request.app.state.config.TOP_K,
+                    reranking_function=(
+                        (
+                            lambda sentences: request.app.state.RERANKING_FUNCTION(
+                                sentences, user=user
                             )
-                            if request.app.state.RERANKING_FUNCTION
-                            else None
-                        ),
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=request.app.state.config.RAG_FULL_CONTEXT,
-                        user=user,
+                        )
+                        if request.app.state.RERANKING_FUNCTION
+                        else None
                     ),
-                )
+                    k_reranker=request.app.state.config.TOP_K_RERANKER,
+                    r=request.app.state.config.RELEVANCE_THRESHOLD,
+                    hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
+                    hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                    full_context=request.app.state.config.RAG_FULL_CONTEXT,
+                    user=user,
+                ),
+            )
         except Exception as e:
             log.exception(e)
 
@@ -1790,7 +1788,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    CHAT_WRITE_BUFFER.upsert_message(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2035,7 +2033,7 @@ async def process_chat_response(
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            CHAT_WRITE_BUFFER.upsert_message(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
@@ -2442,7 +2440,7 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    CHAT_WRITE_BUFFER.upsert_message(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2450,6 +2448,9 @@ async def process_chat_response(
                         },
                     )
 
+                # Final flush so the completed message is persisted before returning
+                await CHAT_WRITE_BUFFER.flush(metadata["chat_id"])
+
                 # Send a webhook notification if the user is not active
                 if not get_active_status_by_user_id(user.id):
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
@@ -2474,13 +2475,19 @@ async def process_chat_response(
                 )
 
                 await background_tasks_handler()
+
+                # Fold the message deltas written while streaming into the chat
+                await CHAT_WRITE_BUFFER.flush(metadata["chat_id"])
+                await asyncio.to_thread(
+                    Chats.compact_message_deltas, metadata["chat_id"]
+                )
             except asyncio.CancelledError:
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "task-cancelled"})
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    CHAT_WRITE_BUFFER.upsert_message(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2488,6 +2495,11 @@ async def process_chat_response(
                         },
                     )
 
+                await CHAT_WRITE_BUFFER.flush(metadata["chat_id"])
+                await asyncio.to_thread(
+                    Chats.compact_message_deltas, metadata["chat_id"]
+                )
+
             if response.background is not None:
                 await response.background()
 
@@ -2,6 +2,7 @@ import time
 import logging
 import asyncio
 import sys
+from typing import Optional
 
 from aiocache import cached
 from fastapi import Request
@@ -19,13 +20,14 @@ from open_webui.utils.plugin import (
     get_function_module_from_cache,
 )
 from open_webui.utils.access_control import has_access
+from open_webui.utils.ttl_cache import publish_invalidation, register_cache
 
 
 from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL, MODELS_CACHE_TTL
 from open_webui.models.users import UserModel
 
 
@@ -76,17 +78,7 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return function_models + openai_models + ollama_models
 
 
-async def get_all_models(request, refresh: bool = False, user: UserModel = None):
-    if (
-        request.app.state.MODELS
-        and request.app.state.BASE_MODELS
-        and (request.app.state.config.ENABLE_BASE_MODELS_CACHE and not refresh)
-    ):
-        base_models = request.app.state.BASE_MODELS
-    else:
-        base_models = await get_all_base_models(request, user=user)
-        request.app.state.BASE_MODELS = base_models
-
+def build_models(request: Request, base_models: list[dict]) -> list[dict]:
     # deep copy the base models to avoid modifying the original list
     models = [model.copy() for model in base_models]
 
@@ -132,94 +124,110 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
     global_action_ids = [
         function.id for function in Functions.get_global_action_functions()
     ]
-    enabled_action_ids = [
-        function.id
+    enabled_actions = {
+        function.id: function
         for function in Functions.get_functions_by_type("action", active_only=True)
-    ]
+    }
 
     global_filter_ids = [
         function.id for function in Functions.get_global_filter_functions()
     ]
-    enabled_filter_ids = [
-        function.id
+    enabled_filters = {
+        function.id: function
         for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
+    }
+
+    # Index the models by id, and Ollama models by their base id as well since
+    # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
+    models_by_id = {}
+    ollama_ids_by_base_id = {}
+    for model in models:
+        models_by_id[model["id"]] = model
+        if model.get("owned_by") == "ollama":
+            ollama_ids_by_base_id.setdefault(model["id"].split(":")[0], []).append(
+                model["id"]
+            )
 
     custom_models = Models.get_all_models()
     for custom_model in custom_models:
-        if custom_model.base_model_id is None:
-            # Applied directly to a base model
-            for model in models:
-                if custom_model.id == model["id"] or (
-                    model.get("owned_by") == "ollama"
-                    and custom_model.id
-                    == model["id"].split(":")[
-                        0
-                    ]  # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        # Set action_ids and filter_ids
-                        action_ids = []
-                        filter_ids = []
-
-                        if "info" in model and "meta" in model["info"]:
-                            action_ids.extend(
-                                model["info"]["meta"].get("actionIds", [])
-                            )
-                            filter_ids.extend(
-                                model["info"]["meta"].get("filterIds", [])
-                            )
-
-                        model["action_ids"] = action_ids
-                        model["filter_ids"] = filter_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
+        if custom_model.base_model_id is not None:
+            continue
+
+        # Applied directly to a base model
+        model_ids = [custom_model.id] + ollama_ids_by_base_id.get(custom_model.id, [])
+        for model_id in model_ids:
+            model = models_by_id.get(model_id)
+            if model is None:
+                continue
+
+            if custom_model.is_active:
+                model["name"] = custom_model.name
+                model["info"] = custom_model.model_dump()
+
+                # Set action_ids and filter_ids
+                action_ids = []
+                filter_ids = []
+
+                if "info" in model and "meta" in model["info"]:
+                    action_ids.extend(model["info"]["meta"].get("actionIds", []))
+                    filter_ids.extend(model["info"]["meta"].get("filterIds", []))
+
+                model["action_ids"] = action_ids
+                model["filter_ids"] = filter_ids
+            else:
+                del models_by_id[model_id]
+
+    # First model matching a base model id, exactly or by its untagged name
+    models_by_base_id = {}
+    for model in models_by_id.values():
+        models_by_base_id.setdefault(model["id"], model)
+        models_by_base_id.setdefault(model["id"].split(":")[0], model)
+
+    for custom_model in custom_models:
+        if (
+            custom_model.base_model_id is None
+            or not custom_model.is_active
+            or custom_model.id in models_by_id
         ):
-            owned_by = "openai"
-            pipe = None
+            continue
 
-            action_ids = []
-            filter_ids = []
+        owned_by = "openai"
+        pipe = None
 
-            for model in models:
-                if (
-                    custom_model.base_model_id == model["id"]
-                    or custom_model.base_model_id == model["id"].split(":")[0]
-                ):
-                    owned_by = model.get("owned_by", "unknown owner")
-                    if "pipe" in model:
-                        pipe = model["pipe"]
-                    break
+        action_ids = []
+        filter_ids = []
 
-            if custom_model.meta:
-                meta = custom_model.meta.model_dump()
+        base_model = models_by_base_id.get(custom_model.base_model_id)
+        if base_model is not None:
+            owned_by = base_model.get("owned_by", "unknown owner")
+            if "pipe" in base_model:
+                pipe = base_model["pipe"]
 
-                if "actionIds" in meta:
-                    action_ids.extend(meta["actionIds"])
+        if custom_model.meta:
+            meta = custom_model.meta.model_dump()
 
-                if "filterIds" in meta:
-                    filter_ids.extend(meta["filterIds"])
+            if "actionIds" in meta:
+                action_ids.extend(meta["actionIds"])
 
-            models.append(
-                {
-                    "id": f"{custom_model.id}",
-                    "name": custom_model.name,
-                    "object": "model",
-                    "created": custom_model.created_at,
-                    "owned_by": owned_by,
-                    "info": custom_model.model_dump(),
-                    "preset": True,
-                    **({"pipe": pipe} if pipe is not None else {}),
-                    "action_ids": action_ids,
-                    "filter_ids": filter_ids,
-                }
-            )
+            if "filterIds" in meta:
+                filter_ids.extend(meta["filterIds"])
+
+        model = {
+            "id": f"{custom_model.id}",
+            "name": custom_model.name,
+            "object": "model",
+            "created": custom_model.created_at,
+            "owned_by": owned_by,
+            "info": custom_model.model_dump(),
+            "preset": True,
+            **({"pipe": pipe} if pipe is not None else {}),
+            "action_ids": action_ids,
+            "filter_ids": filter_ids,
+        }
+        models_by_id[model["id"]] = model
+        models_by_base_id.setdefault(model["id"], model)
+
+    models = list(models_by_id.values())
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -269,46 +277,190 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
         function_module, _, _ = get_function_module_from_cache(request, function_id)
         return function_module
 
+    # Items are resolved once per function and shared by all models using it
+    action_items = {}
+    filter_items = {}
+
     for model in models:
         action_ids = [
             action_id
             for action_id in list(set(model.pop("action_ids", []) + global_action_ids))
-            if action_id in enabled_action_ids
+            if action_id in enabled_actions
         ]
         filter_ids = [
             filter_id
             for filter_id in list(set(model.pop("filter_ids", []) + global_filter_ids))
-            if filter_id in enabled_filter_ids
+            if filter_id in enabled_filters
         ]
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
-
-            function_module = get_function_module_by_id(action_id)
-            model["actions"].extend(
-                get_action_items_from_module(action_function, function_module)
-            )
+            if action_id not in action_items:
+                function_module = get_function_module_by_id(action_id)
+                action_items[action_id] = get_action_items_from_module(
+                    enabled_actions[action_id], function_module
+                )
+            model["actions"].extend(item.copy() for item in action_items[action_id])
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
-            if filter_function is None:
-                raise Exception(f"Filter not found: {filter_id}")
+            if filter_id not in filter_items:
+                function_module = get_function_module_by_id(filter_id)
+                filter_items[filter_id] = (
+                    get_filter_items_from_module(
+                        enabled_filters[filter_id], function_module
+                    )
+                    if getattr(function_module, "toggle", None)
+                    else []
+                )
+            model["filters"].extend(item.copy() for item in filter_items[filter_id])
 
-            function_module = get_function_module_by_id(filter_id)
+    log.debug(f"build_models() returned {len(models)} models")
+    return models
 
-            if getattr(function_module, "toggle", None):
-                model["filters"].extend(
-                    get_filter_items_from_module(filter_function, function_module)
-                )
 
-    log.debug(f"get_all_models() returned {len(models)} models")
+class ModelRegistry:
+    """
+    Single-flight cache of the merged model list kept in app.state.MODELS.
+
+    Concurrent callers share one in-flight rebuild. Once `ttl` seconds have
+    passed the current list keeps being served while a background rebuild
+    re-fetches the upstream connections, so the Ollama/OpenAI fan-out never
+    sits on a user request. Model/function CRUD calls `invalidate`, after which
+    the next caller waits for a rebuild that reuses the upstream models and
+    only reads the local DB again.
+
+    Invalidations are broadcast to the other workers like TTLCache ones (see
+    `invalidate_models`); a broadcast with the "upstream" key also marks the
+    upstream models outdated.
+    """
+
+    name = "models"
+
+    def __init__(self, ttl: Optional[int]):
+        self.ttl = ttl
+        self.updated_at = 0.0
+
+        # Bumped on every invalidation, a build is current if it started after
+        self.version = 0
+        self._built_version = -1
+        self._upstream_stale = True
+
+        self._task: Optional[asyncio.Task] = None
+        self._task_version = -1
+        self._background: Optional[asyncio.Task] = None
+
+        register_cache(self.name, self)
+
+    def invalidate(self, upstream: bool = False):
+        self.version += 1
+        if upstream:
+            self._upstream_stale = True
+
+    def delete(self, *keys, broadcast: bool = True):
+        self.invalidate(upstream="upstream" in keys)
+        if broadcast:
+            publish_invalidation(self.name, list(keys))
+
+    def clear(self, broadcast: bool = True):
+        self.delete(broadcast=broadcast)
+
+    def is_current(self) -> bool:
+        return self._built_version == self.version
+
+    def is_expired(self) -> bool:
+        return self.ttl is not None and time.monotonic() - self.updated_at >= self.ttl
+
+    async def refresh(
+        self, request: Request, user: UserModel = None, upstream: bool = False
+    ) -> list[dict]:
+        if upstream:
+            self._upstream_stale = True
+
+        while self._task is not None and not self._task.done():
+            if self._task_version == self.version and not self._upstream_stale:
+                return await asyncio.shield(self._task)
+            # Started before the latest invalidation, rebuild once it is done
+            await asyncio.wait([self._task])
+
+        upstream = self._upstream_stale or not request.app.state.BASE_MODELS
+        self._upstream_stale = False
+        self._task_version = self.version
+        self._task = asyncio.create_task(
+            self._build(request, user, self._task_version, upstream)
+        )
+        return await asyncio.shield(self._task)
+
+    def refresh_in_background(
+        self, request: Request, user: UserModel = None, upstream: bool = False
+    ):
+        if (self._task is not None and not self._task.done()) or (
+            self._background is not None and not self._background.done()
+        ):
+            return
+
+        async def _refresh():
+            try:
+                await self.refresh(request, user=user, upstream=upstream)
+            except Exception as e:
+                log.exception(f"Error refreshing models: {e}")
+
+        self._background = asyncio.create_task(_refresh())
+
+    async def _build(
+        self, request: Request, user: UserModel, version: int, upstream: bool
+    ) -> list[dict]:
+        try:
+            if upstream:
+                base_models = await get_all_base_models(request, user=user)
+            else:
+                # Only local models changed, keep the upstream connection models
+                base_models = await get_function_models(request) + [
+                    model
+                    for model in request.app.state.BASE_MODELS
+                    if "pipe" not in model
+                ]
+        except Exception:
+            if upstream:
+                self._upstream_stale = True
+            raise
+        request.app.state.BASE_MODELS = base_models
 
-    request.app.state.MODELS = {model["id"]: model for model in models}
-    return models
+        models = build_models(request, base_models)
+
+        request.app.state.MODELS = {model["id"]: model for model in models}
+        self.updated_at = time.monotonic()
+        self._built_version = version
+        return models
+
+
+MODEL_REGISTRY = ModelRegistry(MODELS_CACHE_TTL)
+
+
+def invalidate_models(upstream: bool = False):
+    """
+    Mark the model list outdated on every worker, e.g. after a model or
+    function changed.
+    """
+    MODEL_REGISTRY.delete(*(["upstream"] if upstream else []))
+
+
+async def get_all_models(request, refresh: bool = False, user: UserModel = None):
+    if refresh:
+        return await MODEL_REGISTRY.refresh(request, user=user, upstream=True)
+
+    if request.app.state.MODELS and MODEL_REGISTRY.is_current():
+        if MODEL_REGISTRY.is_expired():
+            # Serve the current list, upstream models are only re-fetched when
+            # the base models cache is disabled
+            MODEL_REGISTRY.refresh_in_background(
+                request,
+                user=user,
+                upstream=not request.app.state.config.ENABLE_BASE_MODELS_CACHE,
+            )
+        return list(request.app.state.MODELS.values())
+
+    return await MODEL_REGISTRY.refresh(request, user=user)
 
 
 def check_model_access(user, model):
@@ -175,6 +175,71 @@ def parse_model_output(output):
         }
     }
 
+class IncrementalQuestionParser:
+    """
+    增量解析流式输出的题目 JSON：
+    逐段 feed 模型输出，每当一个不含嵌套对象的 {...}（即单个题目对象）闭合时立即解析并返回，
+    无需等待完整输出，某个题目的括号错误也不会影响其他题目。
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0  # 下一个待扫描字符的位置
+        self.stack = []  # 未闭合对象：[起始位置, 是否包含子对象]
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text):
+        """追加一段输出，返回本次新闭合的题目列表（已标准化）"""
+        self.buffer += text
+        questions = []
+
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                if self.stack:
+                    self.stack[-1][1] = True
+                self.stack.append([self.pos, False])
+            elif ch == "}" and self.stack:
+                start, has_child = self.stack.pop()
+                if not has_child:
+                    question = self._parse_object(self.buffer[start : self.pos + 1])
+                    if question:
+                        questions.append(question)
+
+            self.pos += 1
+
+        # 没有未闭合对象时丢弃已扫描内容，避免缓冲区无限增长
+        if not self.stack:
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+
+        return questions
+
+    def _parse_object(self, raw_text):
+        try:
+            raw_text = preprocess_json_text(raw_text)
+            raw_text = fix_json_escapes(raw_text)
+            data = json.loads(raw_text)
+        except Exception as e:
+            print(f"题目对象解析失败: {e}, block: {raw_text[:100]}...")
+            return None
+
+        # 只有题目对象才包含 question 字段（外层 {"type": "question", ...} 不是叶子对象）
+        if not isinstance(data, dict) or "question" not in data:
+            return None
+        return normalize_question(data)
+
 if __name__ == "__main__":
     # 注意这里的 JSON 格式已修正
     output = '''
@@ -1,18 +1,41 @@
 # edited & created by @CDK
 # 封装选择题生成逻辑（包括 prompt 构建和大模型调用）
 # - 设计 prompt 模板
-# - 调用本地模型（如 Ollama，使用 `requests.post`）
+# - 调用本地模型（如 Ollama，使用共享连接池的 aiohttp 异步请求）
+# - 题量较大时按题型拆分为多个子 prompt 并发生成，同题型的子 prompt 使用不同的知识片段，再合并去重校验
 # - 解析模型返回，生成标准化 JSON
 
-import requests
+import aiohttp
+import asyncio
+import json
 import os
 import re
 import random
+from collections import Counter
 from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from open_webui.env import AIOHTTP_CLIENT_TIMEOUT
+from open_webui.utils.http_pool import get_session
 from open_webui.utils.parseUserInput import parse_input_demand
-from open_webui.utils.parseModelOutput import parse_model_output
+from open_webui.utils.parseModelOutput import parse_model_output, IncrementalQuestionParser
 from open_webui.routers.rag import retrieve_knowledge
 
+QUESTION_MODEL = "qwen2.5:7b"
+
+# 单个 prompt 最多生成的题目数量，超过时按题型拆分为多个子 prompt 并发生成
+QUESTION_GEN_MAX_PER_PROMPT = int(os.environ.get("QUESTION_GEN_MAX_PER_PROMPT", "5"))
+# 本进程同时发往模型的请求上限（所有用户共享）
+QUESTION_GEN_CONCURRENCY = int(os.environ.get("QUESTION_GEN_CONCURRENCY", "8"))
+
+# 题型 -> (题量字段, 题目 type)
+QUESTION_TYPES = [
+    ("single_num", "choice_question"),
+    ("multi_num", "multiple_choice_question"),
+    ("truefalse_num", "true_false_question"),
+]
+
+_semaphore: asyncio.Semaphore = None
+
 test_json = '''{
      "questions":{
         type: "question",
@@ -170,14 +193,8 @@ https://zh.wikipedia.org/wiki/%E6%A0%B8%E9%85%B8#
 #         # print("Retrieved context:", context)
 #     return context
 
-def build_prompt(request_data):
-    # 获取当前脚本的绝对路径
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # 构建 prompt.txt 的绝对路径
-    prompt_path = os.path.join(script_dir, 'prompt.txt')
-
-    # 获取相关参数
-    difficulty, NumberOfQuestions, user_instruction = parse_input_demand(request_data)
+def get_knowledge(request_data):
+    """根据请求中的知识库ID检索出题所需知识，失败时回退到默认知识"""
     knowledge = test_knowledge
     try:
         # 获取知识库ID和用户ID（从请求参数中）
@@ -195,6 +212,14 @@ def build_prompt(request_data):
         knowledge = test_knowledge
         print(f"{e}")
     print(f"knowledge: {knowledge}")
+    return knowledge
+
+def build_prompt(knowledge, difficulty, NumberOfQuestions, user_instruction):
+    # 获取当前脚本的绝对路径
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    # 构建 prompt.txt 的绝对路径
+    prompt_path = os.path.join(script_dir, 'prompt.txt')
+
     try:
         # 打开并读取模板文件
         with open(prompt_path, 'r', encoding='utf-8') as f:
@@ -219,24 +244,134 @@ def build_prompt(request_data):
     except Exception as e:
         raise Exception(f"读取或格式化 prompt 失败: {e}")
 
-def call_qwen_model(prompt):
+def split_question_numbers(NumberOfQuestions):
+    """
+    将题量拆分为多个子任务，每个子任务只包含一种题型且不超过 QUESTION_GEN_MAX_PER_PROMPT 道题。
+    总题量不超过上限时保持单个 prompt，避免小请求多次调用模型。
+    """
+    total = sum(NumberOfQuestions[key] for key, _ in QUESTION_TYPES)
+    if total <= QUESTION_GEN_MAX_PER_PROMPT:
+        return [dict(NumberOfQuestions)]
+
+    parts = []
+    for key, _ in QUESTION_TYPES:
+        remaining = NumberOfQuestions[key]
+        while remaining > 0:
+            count = min(remaining, QUESTION_GEN_MAX_PER_PROMPT)
+            part = {k: 0 for k, _ in QUESTION_TYPES}
+            part[key] = count
+            parts.append(part)
+            remaining -= count
+    return parts
+
+def split_knowledge(knowledge, n):
+    """
+    把知识切成 n 段互不重叠的片段。
+    优先按段落切分，段落数不足时按字符等分。
+    """
+    if n <= 1:
+        return [knowledge]
+    paragraphs = [p for p in re.split(r"\n\s*\n", knowledge) if p.strip()]
+    if len(paragraphs) >= n:
+        return [
+            "\n\n".join(paragraphs[i * len(paragraphs) // n:(i + 1) * len(paragraphs) // n])
+            for i in range(n)
+        ]
+    size = -(-len(knowledge) // n)
+    return [knowledge[i * size:(i + 1) * size] for i in range(n)]
+
+def assign_knowledge(knowledge, parts):
+    """
+    为每个子任务分配知识。
+    同一题型拆成多个子 prompt 时，如果 prompt 和知识完全相同，模型会返回几乎一样的题目，
+    因此同题型的子任务各自使用一段不同的知识片段。
+    """
+    def part_key(part):
+        return tuple(key for key, _ in QUESTION_TYPES if part[key])
+
+    counts = Counter(part_key(part) for part in parts)
+    slices = {key: iter(split_knowledge(knowledge, n)) for key, n in counts.items()}
+    return [next(slices[part_key(part)]) for part in parts]
+
+def question_stem_key(q):
+    """题干去掉空白和标点后作为去重键"""
+    return re.sub(r"[\W_]+", "", str(q.get("question", ""))).lower()
+
+def dedupe_questions(questions):
+    """按题干去重，保留先出现的题目"""
+    seen = set()
+    unique = []
+    for q in questions:
+        key = question_stem_key(q)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(q)
+    return unique
+
+def get_semaphore():
+    """进程内共享的并发上限，首次调用时在当前事件循环中创建"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(QUESTION_GEN_CONCURRENCY)
+    return _semaphore
+
+async def call_qwen_model(prompt):
     # 假设本地 Ollama/LMDeploy/其他服务已启动，端口和API需根据实际情况调整
     ollama_host = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
     url = f"{ollama_host}/api/generate"
     payload = {
-        "model": "qwen2.5:7b",
+        "model": QUESTION_MODEL,
         "prompt": prompt,
         "stream": False
     }
     try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        data = response.json()
+        # 使用全局 HTTP 连接池（HTTP_SESSION_POOL）中该地址的会话，超时按请求设置
+        session = get_session(url)
+        async with get_semaphore():
+            async with session.post(
+                url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
         return data.get("response", "")  # Ollama 返回文本在 "response" 字段
     except Exception as e:
         print(f"调用模型失败: {e}")
         return ""
 
+async def stream_qwen_model(prompt):
+    """流式调用模型，逐段返回生成的文本（Ollama 按行返回 JSON，文本在 "response" 字段）"""
+    ollama_host = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+    url = f"{ollama_host}/api/generate"
+    payload = {
+        "model": QUESTION_MODEL,
+        "prompt": prompt,
+        "stream": True
+    }
+    try:
+        # 使用全局 HTTP 连接池（HTTP_SESSION_POOL）中该地址的会话，超时按请求设置
+        session = get_session(url)
+        async with get_semaphore():
+            async with session.post(
+                url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        break
+    except Exception as e:
+        print(f"流式调用模型失败: {e}")
+
 def is_valid_question_format(data):
     """
     判断输入数据是否符合最新标准题目 JSON 格式：
@@ -339,7 +474,24 @@ def is_valid_question_format(data):
     print(f"✅ 数据格式正确！共 {len(questions)} 道题目。")
     return True
 
-def generate_question(data):
+async def generate_question_part(knowledge, difficulty, NumberOfQuestions, user_instruction):
+    """生成一个子 prompt 的题目，只保留格式正确的题目"""
+    prompt = build_prompt(knowledge, difficulty, NumberOfQuestions, user_instruction)
+    model_output = await call_qwen_model(prompt)
+    print("Model Raw Output: ", model_output)  # 调试用
+
+    result = parse_model_output(model_output)
+    if not result:
+        return []
+
+    questions = []
+    for q in result["questions"]["questions"]:
+        # 逐题校验，单题格式错误不影响同批其他题目
+        if is_valid_question_format({"questions": {"type": "question", "questions": [q]}}):
+            questions.append(q)
+    return questions
+
+async def generate_question(data):
     """
     生成题目主函数
     返回: 题目列表（list of questions）返回标准格式：{ "questions": [...] }
@@ -347,20 +499,105 @@ def generate_question(data):
     print("generating...")
     # return test_json
 
-    prompt = build_prompt(data)
-    # print("prompt: ",prompt)
-    model_output = call_qwen_model(prompt)
-    # model_output = await call_model_from_request(request, prompt) # 用于调用用户自定义模型版本，TODO：用户信息无法查询
-    print("Model Raw Output: ", model_output)  # 调试用
+    # 难度只解析一次，保证各子 prompt 使用相同难度
+    difficulty, NumberOfQuestions, user_instruction = parse_input_demand(data)
+    # RAG 检索包含向量计算和磁盘读取，放到线程池中避免阻塞事件循环
+    knowledge = await run_in_threadpool(get_knowledge, data)
+
+    parts = split_question_numbers(NumberOfQuestions)
+    print(f"题目生成拆分为 {len(parts)} 个子任务: {parts}")
+    results = await asyncio.gather(
+        *[
+            generate_question_part(part_knowledge, difficulty, part, user_instruction)
+            for part, part_knowledge in zip(parts, assign_knowledge(knowledge, parts))
+        ]
+    )
 
-    result = parse_model_output(model_output)
-    # return model_output
+    # 合并各子任务结果，按题干去重，再按题型排序并截断到请求的数量
+    merged = dedupe_questions([q for part in results for q in part])
+    questions = []
+    for key, q_type in QUESTION_TYPES:
+        typed = [q for q in merged if q["type"] == q_type]
+        questions.extend(typed[: NumberOfQuestions[key]])
+
+    result = {"questions": {"type": "question", "questions": questions}}
     print("Parsed Result:", result)  # 调试用
 
-    if is_valid_question_format(result):
+    if questions and is_valid_question_format(result):
         return result
 
     # ❌ 解析失败，返回默认 test_json（完整结构）
     print("解析失败，返回默认题目")
     return test_json  # 返回完整字典，不是 test_json['questions']，前端需要我返回questions列表，即便只能渲染1个问题
 
+async def stream_question_part(knowledge, difficulty, NumberOfQuestions, user_instruction, queue):
+    """流式生成一个子 prompt 的题目，每个题目对象闭合并校验通过后立即放入队列"""
+    try:
+        prompt = build_prompt(knowledge, difficulty, NumberOfQuestions, user_instruction)
+        parser = IncrementalQuestionParser()
+        async for chunk in stream_qwen_model(prompt):
+            for q in parser.feed(chunk):
+                if is_valid_question_format({"questions": {"type": "question", "questions": [q]}}):
+                    await queue.put(q)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"子任务生成失败: {e}")
+
+async def stream_questions(data):
+    """
+    流式生成题目：
+    每生成一道题就产出 {"type": "question", "data": 题目}，
+    结束时产出 {"type": "done", "data": 完整结果}（与非流式接口的返回值相同）
+    """
+    print("generating (stream)...")
+
+    difficulty, NumberOfQuestions, user_instruction = parse_input_demand(data)
+    knowledge = await run_in_threadpool(get_knowledge, data)
+
+    parts = split_question_numbers(NumberOfQuestions)
+    print(f"题目生成拆分为 {len(parts)} 个子任务: {parts}")
+
+    queue = asyncio.Queue()
+    tasks = [
+        asyncio.create_task(
+            stream_question_part(part_knowledge, difficulty, part, user_instruction, queue)
+        )
+        for part, part_knowledge in zip(parts, assign_knowledge(knowledge, parts))
+    ]
+    # 所有子任务结束后放入 None 作为结束标记
+    finished = asyncio.create_task(asyncio.wait(tasks))
+    finished.add_done_callback(lambda _: queue.put_nowait(None))
+
+    # 每种题型最多输出请求的数量
+    remaining = {q_type: NumberOfQuestions[key] for key, q_type in QUESTION_TYPES}
+    questions = []
+    seen = set()
+    try:
+        while True:
+            q = await queue.get()
+            if q is None:
+                break
+            # 题干重复的题目不再输出
+            key = question_stem_key(q)
+            if remaining.get(q["type"], 0) <= 0 or key in seen:
+                continue
+            seen.add(key)
+            remaining[q["type"]] -= 1
+            questions.append(q)
+            yield {"type": "question", "data": q}
+    finally:
+        # 客户端断开时取消仍在生成的子任务
+        for task in tasks:
+            task.cancel()
+
+    # 与非流式接口一致：按题型排序
+    order = {q_type: i for i, (_, q_type) in enumerate(QUESTION_TYPES)}
+    questions.sort(key=lambda q: order[q["type"]])
+    result = {"questions": {"type": "question", "questions": questions}}
+
+    if questions:
+        yield {"type": "done", "data": result}
+    else:
+        print("流式生成未得到有效题目，返回默认题目")
+        yield {"type": "done", "data": test_json}
@@ -0,0 +1,91 @@
+# created by @CDK
+# PDF 并行分页提取
+#
+# PyPDFLoader 在单线程里逐页提取文本，大教材的导入时间与页数成正比。
+# 这里把页码切成若干区间，交给进程池并行提取，并按页序分批产出 Document，
+# 调用方可以边提取边分割、向量化，不必等整本书解析完。
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+# 每个任务处理的页数，以及进程池大小
+PDF_PAGES_PER_BATCH = int(os.environ.get("RAG_PDF_PAGES_PER_BATCH", "16"))
+PDF_WORKERS = int(os.environ.get("RAG_PDF_WORKERS", str(os.cpu_count() or 1)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """懒加载的进程池，整个进程共享
+
+    使用 spawn 启动子进程：服务进程中已有 torch/SentenceTransformer 线程、
+    向量化工作线程和 asyncio 事件循环，fork 会复制持有中的锁，可能导致子进程死锁。
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def count_pdf_pages(file_path: str) -> int:
+    return len(PdfReader(file_path).pages)
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """提取 [start, end) 页的文本，在子进程中执行，只传路径和页码避免序列化大对象"""
+    reader = PdfReader(file_path)
+    return [(page, reader.pages[page].extract_text() or "") for page in range(start, end)]
+
+
+def _to_documents(file_path: str, pages: List[Tuple[int, str]]) -> List[Document]:
+    # 元数据与 PyPDFLoader 保持一致
+    return [
+        Document(page_content=text, metadata={"source": file_path, "page": page})
+        for page, text in pages
+    ]
+
+
+def iter_pdf_page_batches(
+    file_path: str,
+    pages_per_batch: int = PDF_PAGES_PER_BATCH,
+    executor: Optional[ProcessPoolExecutor] = None,
+) -> Iterator[List[Document]]:
+    """按页序分批产出页面 Document
+
+    所有页区间一次性提交到进程池，按提交顺序取结果，
+    第一批完成后即可开始分割和向量化，后面的批次仍在并行提取。
+    页数不超过一个批次时直接在当前线程提取，省去进程间开销。
+    """
+    total_pages = count_pdf_pages(file_path)
+    if total_pages <= pages_per_batch:
+        yield _to_documents(file_path, extract_page_range(file_path, 0, total_pages))
+        return
+
+    executor = executor or get_pdf_executor()
+    futures = [
+        executor.submit(
+            extract_page_range,
+            file_path,
+            start,
+            min(start + pages_per_batch, total_pages),
+        )
+        for start in range(0, total_pages, pages_per_batch)
+    ]
+
+    try:
+        for future in futures:
+            yield _to_documents(file_path, future.result())
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,608 @@
+# created by @CDK
+# 知识库向量的原生磁盘存储（替代整库 pickle）
+#
+# 目录结构：
+#   rag_storage/vectors/{vector_key}/
+#       segments/seg_000001.faiss   每次上传追加一个分段，使用 faiss.write_index 写入
+#       chunks.sqlite               分块存储（文本 + 元数据 + 分段内位置），只追加写入
+#
+# - 上传只写新分块所在的分段，写入成本为 O(新分块) 而不是 O(知识库大小)
+# - 分段以 IO_FLAG_MMAP 只读方式打开，多个进程可共享页缓存
+# - 以 SQLite 中的 segments 表为准，分段 id 在写事务中分配，崩溃残留的分段文件在打开时清理
+# - 删除只移除 SQLite 中的分块并记录分段墓碑数，墓碑比例过高时重建分段
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+SEGMENT_DIR = "segments"
+CHUNK_DB_FILE = "chunks.sqlite"
+
+# 分段数超过该值时自动合并为单个分段，避免检索时逐段搜索的开销
+MAX_SEGMENTS = int(os.environ.get("RAG_STORE_MAX_SEGMENTS", "16"))
+
+# 已删除向量占比超过该值时自动合并重建，释放内存并恢复检索速度
+TOMBSTONE_RATIO = float(os.environ.get("RAG_STORE_TOMBSTONE_RATIO", "0.2"))
+
+# 按 id 批量操作时每条 SQL 的参数个数，低于 SQLite 的参数上限
+ID_BATCH_SIZE = 500
+
+# 未提交的分段文件超过该时长（秒）才视为崩溃残留，较新的可能属于其他进程正在进行的写入
+ORPHAN_AGE = 600
+
+
+def _segment_file(segment_id: int) -> str:
+    return f"seg_{segment_id:06d}.faiss"
+
+
+def _read_segment(path: str):
+    """以内存映射方式读取分段，不支持 mmap 的索引类型回退为普通读取"""
+    try:
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except Exception:
+        return faiss.read_index(path)
+
+
+def _write_segment(path: str, index) -> None:
+    """先写临时文件再原子替换，保证分段文件要么完整要么不存在"""
+    tmp_path = f"{path}.tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class KnowledgeBaseStore:
+    """单个知识库的向量存储，接口与 langchain FAISS 中用到的部分保持一致"""
+
+    def __init__(self, directory: str, embeddings):
+        self.directory = directory
+        self.embeddings = embeddings
+        self.segment_dir = os.path.join(directory, SEGMENT_DIR)
+        self.db_path = os.path.join(directory, CHUNK_DB_FILE)
+        self.segments: Dict[int, object] = {}  # segment_id -> faiss 索引
+        self.segment_deleted: Dict[int, int] = {}  # segment_id -> 已删除向量数
+        self._lock = threading.RLock()
+
+        os.makedirs(self.segment_dir, exist_ok=True)
+        self._init_db()
+        self._load_segments()
+
+    # ---------- SQLite 分块存储 ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id TEXT PRIMARY KEY,
+                    document_id TEXT,
+                    segment_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    page_content TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+                """
+            )
+            # 早期版本的表缺少删除相关字段
+            self._ensure_column(
+                conn, "segments", "deleted", "INTEGER NOT NULL DEFAULT 0"
+            )
+            self._ensure_column(conn, "chunks", "document_id", "TEXT")
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_chunks_segment_position "
+                "ON chunks (segment_id, position)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chunks_document_id "
+                "ON chunks (document_id)"
+            )
+
+    @staticmethod
+    def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl: str):
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+    def _load_segments(self):
+        with self._connect() as conn:
+            segment_deleted = dict(conn.execute("SELECT id, deleted FROM segments"))
+
+        now = time.time()
+        for filename in os.listdir(self.segment_dir):
+            path = os.path.join(self.segment_dir, filename)
+            segment_id = None
+            if filename.startswith("seg_") and filename.endswith(".faiss"):
+                segment_id = int(filename[len("seg_") : -len(".faiss")])
+
+            if segment_id in segment_deleted:
+                self.segments[segment_id] = _read_segment(path)
+                self.segment_deleted[segment_id] = segment_deleted[segment_id]
+                continue
+
+            try:
+                if now - os.path.getmtime(path) < ORPHAN_AGE:
+                    continue
+                # 未提交到 SQLite 的分段（写入过程中崩溃）直接清理
+                print(f"清理未提交的分段文件: {path}")
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ---------- 写入 ----------
+
+    @staticmethod
+    def _begin_segment_write(conn: sqlite3.Connection) -> int:
+        """开启写事务并分配新的分段 id
+
+        id 以 SQLite 为准，且在持有写锁的事务中分配，同一目录的其他实例或进程
+        在本事务提交前无法分配 id，不会拿到同一个分段文件。
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM segments").fetchone()
+        return row[0]
+
+    def _append_segment(
+        self,
+        vectors: np.ndarray,
+        chunks: List[Tuple[str, str, dict]],
+        document_id: Optional[str] = None,
+    ) -> List[str]:
+        """写入一个新分段：在写事务中分配 id、写 faiss 文件，再提交分块和分段记录"""
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(vectors)
+
+        path = None
+        conn = self._connect()
+        try:
+            with conn:
+                segment_id = self._begin_segment_write(conn)
+                path = os.path.join(self.segment_dir, _segment_file(segment_id))
+                _write_segment(path, index)
+
+                conn.executemany(
+                    "INSERT INTO chunks "
+                    "(id, document_id, segment_id, position, page_content, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            chunk_id,
+                            document_id,
+                            segment_id,
+                            position,
+                            page_content,
+                            json.dumps(metadata, ensure_ascii=False, default=str),
+                        )
+                        for position, (chunk_id, page_content, metadata) in enumerate(
+                            chunks
+                        )
+                    ],
+                )
+                conn.execute(
+                    "INSERT INTO segments (id, size) VALUES (?, ?)",
+                    (segment_id, len(chunks)),
+                )
+        except Exception:
+            # 分段 id 未提交，文件不会被其他实例使用
+            if path and os.path.exists(path):
+                os.remove(path)
+            raise
+        finally:
+            conn.close()
+
+        self.segments[segment_id] = _read_segment(path)
+        self.segment_deleted[segment_id] = 0
+        return [chunk_id for chunk_id, _, _ in chunks]
+
+    def add_documents(
+        self, documents: List[Document], document_id: Optional[str] = None
+    ) -> List[str]:
+        """向量化并追加文档，返回分块 id 列表"""
+        return self.add_document_batches([documents], document_id=document_id)
+
+    def add_document_batches(
+        self, batches: Iterable[List[Document]], document_id: Optional[str] = None
+    ) -> List[str]:
+        """逐批向量化，全部完成后作为一个分段写入，返回分块 id 列表
+
+        document_id 记录在每个分块上，删除文档时据此找到它的全部分块。
+
+        batches 可以是生成器，上游边解析边产出时向量化与解析重叠进行。
+        """
+        vector_batches = []
+        chunks = []
+        for documents in batches:
+            if not documents:
+                continue
+            texts = [doc.page_content for doc in documents]
+            vector_batches.append(
+                np.asarray(self.embeddings.embed_documents(texts), dtype="float32")
+            )
+            chunks.extend(
+                (str(uuid.uuid4()), doc.page_content, doc.metadata or {})
+                for doc in documents
+            )
+
+        if not chunks:
+            return []
+        vectors = np.vstack(vector_batches)
+
+        with self._lock:
+            ids = self._append_segment(vectors, chunks, document_id=document_id)
+            if len(self.segments) > MAX_SEGMENTS:
+                self.compact()
+        return ids
+
+    # ---------- 删除与合并 ----------
+
+    def get_ids_by_document(self, document_id: str) -> List[str]:
+        with self._connect() as conn:
+            return [
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM chunks WHERE document_id = ?", (document_id,)
+                )
+            ]
+
+    def delete(self, ids: List[str]) -> int:
+        """删除分块：从分块存储移除并累计分段墓碑数，返回实际删除数量"""
+        if not ids:
+            return 0
+
+        with self._lock:
+            with self._connect() as conn:
+                # 按批统计每个分段被删除的分块数，再整批删除
+                deleted_per_segment: Dict[int, int] = {}
+                for start in range(0, len(ids), ID_BATCH_SIZE):
+                    batch = ids[start : start + ID_BATCH_SIZE]
+                    where = f"id IN ({','.join('?' * len(batch))})"
+                    for segment_id, count in conn.execute(
+                        f"SELECT segment_id, COUNT(*) FROM chunks WHERE {where} "
+                        "GROUP BY segment_id",
+                        batch,
+                    ):
+                        deleted_per_segment[segment_id] = (
+                            deleted_per_segment.get(segment_id, 0) + count
+                        )
+                    conn.execute(f"DELETE FROM chunks WHERE {where}", batch)
+
+                conn.executemany(
+                    "UPDATE segments SET deleted = deleted + ? WHERE id = ?",
+                    [
+                        (count, segment_id)
+                        for segment_id, count in deleted_per_segment.items()
+                    ],
+                )
+
+            for segment_id, count in deleted_per_segment.items():
+                self.segment_deleted[segment_id] = (
+                    self.segment_deleted.get(segment_id, 0) + count
+                )
+
+            if self.tombstone_ratio > TOMBSTONE_RATIO:
+                self.compact()
+
+            return sum(deleted_per_segment.values())
+
+    def delete_document(self, document_id: str, source_hint: Optional[str] = None) -> int:
+        """删除某个文档的全部分块
+
+        早期上传的分块没有 document_id，此时按元数据中的文件路径（source_hint）匹配。
+        """
+        ids = self.get_ids_by_document(document_id)
+        if not ids and source_hint:
+            with self._connect() as conn:
+                ids = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT id FROM chunks WHERE document_id IS NULL "
+                        "AND metadata LIKE ?",
+                        (f"%{source_hint}%",),
+                    )
+                ]
+        return self.delete(ids)
+
+    @property
+    def tombstone_ratio(self) -> float:
+        total = sum(index.ntotal for index in self.segments.values())
+        if total == 0:
+            return 0.0
+        return sum(self.segment_deleted.values()) / total
+
+    def compact(self):
+        """把所有分段合并成一个分段，同时丢弃已删除的向量"""
+        with self._lock:
+            if len(self.segments) <= 1 and not any(self.segment_deleted.values()):
+                return
+
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT id, segment_id, position, page_content, metadata "
+                    "FROM chunks ORDER BY segment_id, position"
+                ).fetchall()
+
+            old_segment_ids = list(self.segments.keys())
+            if rows:
+                vectors = np.vstack(
+                    [
+                        self.segments[segment_id].reconstruct(position)
+                        for _, segment_id, position, _, _ in rows
+                    ]
+                ).astype("float32")
+                chunks = [
+                    (chunk_id, page_content, json.loads(metadata))
+                    for chunk_id, _, _, page_content, metadata in rows
+                ]
+
+                index = faiss.IndexFlatL2(vectors.shape[1])
+                index.add(vectors)
+
+            path = None
+            conn = self._connect()
+            try:
+                with conn:
+                    segment_id = self._begin_segment_write(conn)
+                    if rows:
+                        path = os.path.join(self.segment_dir, _segment_file(segment_id))
+                        _write_segment(path, index)
+
+                        conn.executemany(
+                            "UPDATE chunks SET segment_id = ?, position = ? WHERE id = ?",
+                            [
+                                (segment_id, position, chunk_id)
+                                for position, (chunk_id, _, _) in enumerate(chunks)
+                            ],
+                        )
+                        conn.execute(
+                            "INSERT INTO segments (id, size) VALUES (?, ?)",
+                            (segment_id, len(chunks)),
+                        )
+                    conn.executemany(
+                        "DELETE FROM segments WHERE id = ?",
+                        [(old_id,) for old_id in old_segment_ids],
+                    )
+            except Exception:
+                if path and os.path.exists(path):
+                    os.remove(path)
+                raise
+            finally:
+                conn.close()
+
+            for old_id in old_segment_ids:
+                del self.segments[old_id]
+                self.segment_deleted.pop(old_id, None)
+                old_path = os.path.join(self.segment_dir, _segment_file(old_id))
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+
+            if rows:
+                self.segments[segment_id] = _read_segment(path)
+                self.segment_deleted[segment_id] = 0
+            print(f"已合并 {len(old_segment_ids)} 个分段: {self.directory}")
+
+    # ---------- 检索 ----------
+
+    @property
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _fetch_chunks(
+        self, positions: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], Document]:
+        if not positions:
+            return {}
+
+        result = {}
+        with self._connect() as conn:
+            for segment_id, position in positions:
+                row = conn.execute(
+                    "SELECT page_content, metadata FROM chunks "
+                    "WHERE segment_id = ? AND position = ?",
+                    (segment_id, position),
+                ).fetchone()
+                if row:
+                    result[(segment_id, position)] = Document(
+                        page_content=row[0], metadata=json.loads(row[1])
+                    )
+        return result
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4
+    ) -> List[Tuple[Document, float]]:
+        """逐分段检索后按 L2 距离合并，分数越低越相似"""
+        if not self.segments or k <= 0:
+            return []
+
+        query_vector = np.asarray(
+            [self.embeddings.embed_query(query)], dtype="float32"
+        )
+
+        hits = []
+        with self._lock:
+            for segment_id, index in self.segments.items():
+                # 多取墓碑数量的结果，保证过滤已删除向量后仍有 k 个
+                fetch_k = min(k + self.segment_deleted.get(segment_id, 0), index.ntotal)
+                distances, positions = index.search(query_vector, fetch_k)
+                for distance, position in zip(distances[0], positions[0]):
+                    if position >= 0:
+                        hits.append((float(distance), segment_id, int(position)))
+
+        hits.sort(key=lambda hit: hit[0])
+
+        chunks = self._fetch_chunks([(segment_id, position) for _, segment_id, position in hits])
+        return [
+            (chunks[(segment_id, position)], distance)
+            for distance, segment_id, position in hits
+            if (segment_id, position) in chunks
+        ][:k]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    # ---------- 旧格式迁移 ----------
+
+    def import_legacy_faiss(self, vector_store) -> int:
+        """把旧的 langchain FAISS 对象（pickle 格式）导入为第一个分段"""
+        index = vector_store.index
+        if index.ntotal == 0:
+            return 0
+
+        vectors = index.reconstruct_n(0, index.ntotal).astype("float32")
+        chunks = []
+        for position in range(index.ntotal):
+            docstore_id = vector_store.index_to_docstore_id[position]
+            doc = vector_store.docstore.search(docstore_id)
+            chunks.append((str(docstore_id), doc.page_content, doc.metadata or {}))
+
+        with self._lock:
+            self._append_segment(vectors, chunks)
+        return len(chunks)
+
+
+def open_store(
+    directory: str, embeddings, legacy_pickle_path: Optional[str] = None
+) -> Optional[KnowledgeBaseStore]:
+    """打开知识库存储；存在旧 pickle 文件时自动迁移，目录不存在时返回 None"""
+    if legacy_pickle_path and os.path.exists(legacy_pickle_path):
+        store = KnowledgeBaseStore(directory, embeddings)
+        if store.count == 0:
+            with open(legacy_pickle_path, "rb") as f:
+                legacy = pickle.load(f)
+            migrated = store.import_legacy_faiss(legacy)
+            print(f"已迁移旧向量存储 {legacy_pickle_path}: {migrated} 个分块")
+        os.replace(legacy_pickle_path, f"{legacy_pickle_path}.migrated")
+        return store
+
+    if not os.path.exists(os.path.join(directory, CHUNK_DB_FILE)):
+        return None
+    return KnowledgeBaseStore(directory, embeddings)
+
+
+class VectorStoreCache:
+    """按需加载的知识库向量存储 LRU 缓存
+
+    - 首次访问时才从磁盘打开，启动时不加载任何知识库
+    - 超过 max_size 时淘汰最久未使用的知识库
+    - 被淘汰但仍在使用中（导入、检索、合并）的存储通过弱引用找回，
+      同一目录在进程内始终只有一个实例
+    - 加载在按知识库区分的锁中进行，冷启动加载（含旧 pickle 迁移）不阻塞其他知识库
+    - 记录命中、未命中和加载耗时，便于观察缓存效果
+    """
+
+    def __init__(self, loader, max_size: int = 32):
+        self.loader = loader  # vector_key -> Optional[KnowledgeBaseStore]
+        self.max_size = max_size
+        self._stores: "OrderedDict[str, KnowledgeBaseStore]" = OrderedDict()
+        # 所有仍被引用的存储，包括已被 LRU 淘汰的
+        self._live: "weakref.WeakValueDictionary[str, KnowledgeBaseStore]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_count = 0
+        self.load_time_total = 0.0
+        self.load_time_max = 0.0
+
+    def _lookup(self, vector_key: str) -> Optional[KnowledgeBaseStore]:
+        store = self._stores.get(vector_key)
+        if store is None:
+            store = self._live.get(vector_key)
+            if store is None:
+                return None
+            # 淘汰后仍在使用，重新放回缓存
+            self._put(vector_key, store)
+        self._stores.move_to_end(vector_key)
+        self.hits += 1
+        return store
+
+    def get(self, vector_key: str) -> Optional[KnowledgeBaseStore]:
+        with self._lock:
+            store = self._lookup(vector_key)
+            if store is not None:
+                return store
+            load_lock = self._load_locks.setdefault(vector_key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # 等待期间可能已被其他线程加载
+                store = self._lookup(vector_key)
+                if store is not None:
+                    return store
+                self.misses += 1
+
+            start = time.perf_counter()
+            store = self.loader(vector_key)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self.load_count += 1
+                self.load_time_total += elapsed
+                self.load_time_max = max(self.load_time_max, elapsed)
+                if store is not None:
+                    self._put(vector_key, store)
+            return store
+
+    def _put(self, vector_key: str, store: KnowledgeBaseStore):
+        self._stores[vector_key] = store
+        self._live[vector_key] = store
+        self._stores.move_to_end(vector_key)
+        while len(self._stores) > self.max_size:
+            evicted_key, _ = self._stores.popitem(last=False)
+            self.evictions += 1
+            print(f"淘汰向量存储缓存: {evicted_key}")
+
+    def put(self, vector_key: str, store: KnowledgeBaseStore):
+        with self._lock:
+            self._put(vector_key, store)
+
+    def pop(self, vector_key: str) -> Optional[KnowledgeBaseStore]:
+        with self._lock:
+            self._live.pop(vector_key, None)
+            self._load_locks.pop(vector_key, None)
+            return self._stores.pop(vector_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._stores),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "load_count": self.load_count,
+                "load_time_avg": (
+                    self.load_time_total / self.load_count if self.load_count else 0.0
+                ),
+                "load_time_max": self.load_time_max,
+            }
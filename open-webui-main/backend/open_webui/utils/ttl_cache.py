@@ -0,0 +1,183 @@
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from uuid import uuid4
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Identifies this worker so it can skip its own invalidation broadcasts
+INSTANCE_ID = str(uuid4())
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded in-process cache with a per-entry TTL.
+
+    Entries are evicted least recently used first. Values are deep copied on
+    the way in and out, so callers may mutate what they get back (several
+    table methods do) without corrupting the cached record.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+        register_cache(name, self)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def replace(self, key, value):
+        """Update a cached entry, if any, without extending its TTL."""
+        if not self.enabled:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                self._entries[key] = (entry[0], value)
+
+    def delete(self, *keys, broadcast: bool = True):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if broadcast:
+            publish_invalidation(self.name, list(keys))
+
+    def clear(self, broadcast: bool = True):
+        with self._lock:
+            self._entries.clear()
+        if broadcast:
+            publish_invalidation(self.name, None)
+
+
+_caches: dict[str, TTLCache] = {}
+
+
+def register_cache(name: str, cache):
+    """
+    Receive invalidations broadcast for `name`. Any object with the
+    `delete(*keys, broadcast)` and `clear(broadcast)` methods of TTLCache works.
+    """
+    _caches[name] = cache
+
+
+####################################
+# Cross-worker invalidation
+#
+# Writes are broadcast on the task command channel, other workers drop the
+# same entries from their local caches (see tasks.redis_task_command_listener).
+####################################
+
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _get_redis():
+    global _redis
+
+    if not REDIS_URL:
+        return None
+
+    with _redis_lock:
+        if _redis is None:
+            from open_webui.utils.redis import (
+                get_redis_connection,
+                get_sentinels_from_env,
+            )
+
+            _redis = get_redis_connection(
+                redis_url=REDIS_URL,
+                redis_sentinels=get_sentinels_from_env(
+                    REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+                ),
+                async_mode=False,
+            )
+        return _redis
+
+
+def publish_invalidation(name: str, keys: Optional[list]):
+    try:
+        redis = _get_redis()
+        if redis is None:
+            return
+
+        from open_webui.tasks import REDIS_PUBSUB_CHANNEL
+
+        redis.publish(
+            REDIS_PUBSUB_CHANNEL,
+            json.dumps(
+                {
+                    "action": "invalidate_cache",
+                    "cache": name,
+                    "keys": keys,
+                    "instance_id": INSTANCE_ID,
+                }
+            ),
+        )
+    except Exception as e:
+        # Other workers fall back to the TTL
+        log.warning(f"Error broadcasting {name} cache invalidation: {e}")
+
+
+def handle_invalidation(command: dict):
+    if command.get("instance_id") == INSTANCE_ID:
+        return
+
+    cache = _caches.get(command.get("cache"))
+    if cache is None:
+        return
+
+    keys = command.get("keys")
+    if keys is None:
+        cache.clear(broadcast=False)
+    else:
+        cache.delete(*keys, broadcast=False)
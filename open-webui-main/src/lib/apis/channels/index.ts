@@ -172,12 +172,16 @@ export const getChannelMessages = async (
 	token: string = '',
 	channel_id: string,
 	skip: number = 0,
-	limit: number = 50
+	limit: number = 50,
+	before: number | null = null,
+	before_id: string | null = null
 ) => {
 	let error = null;
 
 	const res = await fetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?skip=${skip}&limit=${limit}${
+			before !== null ? `&before=${before}` : ''
+		}${before_id !== null ? `&before_id=${before_id}` : ''}`,
 		{
 			method: 'GET',
 			headers: {
@@ -212,12 +216,16 @@ export const getChannelThreadMessages = async (
 	channel_id: string,
 	message_id: string,
 	skip: number = 0,
-	limit: number = 50
+	limit: number = 50,
+	before: number | null = null,
+	before_id: string | null = null
 ) => {
 	let error = null;
 
 	const res = await fetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages/${message_id}/thread?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages/${message_id}/thread?skip=${skip}&limit=${limit}${
+			before !== null ? `&before=${before}` : ''
+		}${before_id !== null ? `&before_id=${before_id}` : ''}`,
 		{
 			method: 'GET',
 			headers: {
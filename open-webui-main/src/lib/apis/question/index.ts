@@ -41,3 +41,56 @@ export const generateQuestion = async (
 
 	return res;
 };
+
+// 流式出题：后端通过 SSE 逐题推送，每收到一道题调用一次 onQuestion，返回最终结果（与 generateQuestion 相同）
+export const generateQuestionStream = async (
+	token: string = '',
+	prompt: string,
+	files: [],
+	kbId: string | null = null,
+	onQuestion: (question: object) => void = () => {}
+) => {
+	const res = await fetch(`${WEBUI_BASE_URL}/api/generate-question/stream`, {
+		method: 'POST',
+		headers: {
+			Accept: 'text/event-stream',
+			'Content-Type': 'application/json',
+			...(token && { Authorization: `Bearer ${token}` })
+		},
+		body: JSON.stringify({
+			prompt: prompt,
+			files: files,
+			kb_id: kbId
+		})
+	});
+
+	if (!res.ok || !res.body) {
+		const err = await res.json().catch(() => ({}));
+		throw err?.detail ?? `生成题目失败: ${res.status}`;
+	}
+
+	const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+	let buffer = '';
+	let result = null;
+
+	while (true) {
+		const { value, done } = await reader.read();
+		if (done) break;
+
+		buffer += value;
+		const events = buffer.split('\n\n');
+		buffer = events.pop() ?? '';
+
+		for (const event of events) {
+			if (!event.startsWith('data: ')) continue;
+			const data = JSON.parse(event.slice(6));
+			if (data.type === 'question') {
+				onQuestion(data.data);
+			} else if (data.type === 'done') {
+				result = data.data;
+			}
+		}
+	}
+
+	return result;
+};
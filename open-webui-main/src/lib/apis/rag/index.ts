@@ -86,12 +86,28 @@ export const getKnowledgeBase = async (token: string, kbId: string): Promise<Kno
     return data.data;
 };
 
-// 上传文档到知识库
+// 文档导入任务
+export interface IngestionJob {
+    id: string;
+    kb_id: string;
+    document_id: string;
+    filename: string;
+    status: 'pending' | 'processing' | 'completed' | 'failed';
+    stage: string;
+    progress: number;
+    chunks: number | null;
+    document: Document | null;
+    error: string | null;
+    created_at: string;
+    updated_at: string;
+}
+
+// 上传文档到知识库（立即返回导入任务，解析和向量化在后台进行）
 export const uploadDocument = async (
     token: string,
     kbId: string,
     file: File
-): Promise<Document> => {
+): Promise<IngestionJob> => {
     const formData = new FormData();
     formData.append('file', file);
 
@@ -112,6 +128,29 @@ export const uploadDocument = async (
     return data.data;
 };
 
+// 查询文档导入任务状态
+export const getIngestionJob = async (
+    token: string,
+    kbId: string,
+    jobId: string
+): Promise<IngestionJob> => {
+    const res = await fetch(`${WEBUI_BASE_URL}/api/v1/rag/knowledge-bases/${kbId}/jobs/${jobId}`, {
+        method: 'GET',
+        headers: {
+            'Accept': 'application/json',
+            'Authorization': `Bearer ${token}`
+        }
+    });
+
+    if (!res.ok) {
+        const error = await res.json();
+        throw new Error(error.detail || '获取导入任务状态失败');
+    }
+
+    const data = await res.json();
+    return data.data;
+};
+
 // 获取知识库中的文档列表
 export const getKnowledgeBaseDocuments = async (token: string, kbId: string): Promise<Document[]> => {
     const res = await fetch(`${WEBUI_BASE_URL}/api/v1/rag/knowledge-bases/${kbId}/documents`, {